@@ -20,6 +20,19 @@ CREATE INDEX IF NOT EXISTS idx_legal_entities_import_batch
 ON legal_entities(import_batch_id)
 WHERE import_batch_id IS NOT NULL;
 
+-- Entity names with whitespace collapsed, as the importer's normalize_name()
+-- does. Unique names on this key let the importer upsert legal entities and
+-- have the database skip names that already exist (even when stored with
+-- different spacing), instead of downloading every name.
+-- If the index fails, find the duplicates first with:
+--   SELECT full_name_key, COUNT(*) FROM legal_entities GROUP BY 1 HAVING COUNT(*) > 1;
+ALTER TABLE legal_entities
+ADD COLUMN IF NOT EXISTS full_name_key TEXT
+GENERATED ALWAYS AS (btrim(regexp_replace("fullName", '\s+', ' ', 'g'))) STORED;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_legal_entities_full_name_key
+ON legal_entities(full_name_key);
+
 -- Verify columns were added
 SELECT
     table_name,
@@ -27,5 +40,5 @@ SELECT
     data_type
 FROM information_schema.columns
 WHERE table_name IN ('inward_reinsurance', 'legal_entities')
-AND column_name IN ('import_batch_id', 'import_source')
+AND column_name IN ('import_batch_id', 'import_source', 'full_name_key')
 ORDER BY table_name, column_name;
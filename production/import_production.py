@@ -17,11 +17,17 @@ Usage:
 
 import os
 import sys
+import re
+import gzip
 import json
 import argparse
 import tempfile
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple, Set
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Set
 from uuid import uuid4
 
 # Load environment variables first
@@ -31,11 +37,12 @@ load_dotenv()
 # Required packages
 try:
     import msoffcrypto
+    import orjson
     from pyxlsb import open_workbook
     from supabase import create_client, Client
 except ImportError as e:
     print(f"Missing required package: {e}")
-    print("Install with: pip install supabase pyxlsb msoffcrypto-tool python-dotenv")
+    print("Install with: pip install supabase pyxlsb msoffcrypto-tool python-dotenv orjson")
     sys.exit(1)
 
 # ==============================================================================
@@ -46,9 +53,20 @@ SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
 EXCEL_FILE = os.getenv("EXCEL_FILE", "Reinsurance_Portfolio.xlsb")
 EXCEL_PASSWORD = os.getenv("EXCEL_PASSWORD", "")
+# Optional direct Postgres connection; when set, records are loaded with COPY
+DATABASE_URL = os.getenv("DATABASE_URL", "")
 
-BATCH_SIZE = 50
+BATCH_SIZE = 1000  # rows per PostgREST insert request
+UPLOAD_WORKERS = 4  # record batches in flight while the next ones are parsed
+PARSE_WORKERS = os.cpu_count() or 1  # sheets parsed in parallel
 BACKUP_DIR = "backups"
+BACKUP_PAGE_SIZE = 1000  # PostgREST returns at most max-rows (1000 by default) per request
+HEADER_SCAN_ROWS = 15
+PREVIEW_RECORDS = 100
+ENTITY_LOOKUP_CHUNK = 100  # names per "fullName=in.(...)" filter, bounded by URL length
+
+# Sheets whose (lowercased) name contains any of these are not data sheets
+SKIP_SHEET_TOKENS = ('template', 'blank', 'summary', 'pivot', 'chart')
 
 # Column mappings (0-indexed Excel columns -> inward_reinsurance snake_case columns)
 TEXT_COLUMNS: Dict[int, str] = {
@@ -81,6 +99,30 @@ NUMERIC_COLUMNS: Dict[int, str] = {
 STRUCTURE_COLUMN = 31
 NOTES_COLUMNS = [2, 3, 6, 8, 9, 10, 13, 17, 18, 20, 21]
 
+# A row with none of these (insured, cedant, contract) is treated as empty
+INSURED_COLUMN = 1
+CEDANT_COLUMN = 5
+CONTRACT_COLUMN = 7
+
+# Thousands separators, currency and percent signs stripped by parse_number
+_NUMBER_NOISE = str.maketrans("", "", ", \u00a0$€%")
+
+# Excel serial day 0 is 1899-12-30
+EXCEL_EPOCH_ORDINAL = date(1899, 12, 30).toordinal()
+
+# Rows are padded to this width so every mapped column can be indexed directly
+ROW_WIDTH = max(
+    *TEXT_COLUMNS, *DATE_COLUMNS, *NUMERIC_COLUMNS, STRUCTURE_COLUMN, *NOTES_COLUMNS
+) + 1
+
+# Four-digit year in a sheet name like 'Inward 2023'
+_YEAR_RE = re.compile(r"20\d{2}")
+
+# Text date layouts accepted by parse_date (ASCII digits, years 1000+)
+_DMY_DOT_RE = re.compile(r"([0-9]{1,2})\.([0-9]{1,2})\.([1-9][0-9]{3})")
+_SLASH_DATE_RE = re.compile(r"([0-9]{1,2})/([0-9]{1,2})/([1-9][0-9]{3})")
+_YMD_RE = re.compile(r"([1-9][0-9]{3})([-/])([0-9]{1,2})\2([0-9]{1,2})")
+
 
 # ==============================================================================
 # Helper Functions
@@ -106,24 +148,55 @@ def decrypt_xlsb(file_path: str, password: str = "") -> str:
     return decrypted_path
 
 
+def write_json(path: str, data: Any) -> None:
+    """Write indented UTF-8 JSON with orjson (manifests, previews)."""
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2, default=str))
+
+
 def get_all_sheets(wb) -> List[str]:
     """Get all sheet names from workbook."""
     return wb.sheets
 
 
-def find_header_row(rows: List, max_rows: int = 15) -> int:
-    """Auto-detect header row by searching for 'Insured' or 'Застрахованный'."""
+def find_header_row(rows: List[List[Any]], max_rows: int = HEADER_SCAN_ROWS) -> int:
+    """Auto-detect header row by searching for 'Insured' or 'Застрахованный'.
+
+    Rows are plain value lists (see ``sheet_values``). Only the first
+    ``max_rows`` rows are inspected, so callers streaming a sheet can pass
+    just that leading slice.
+    """
     for row_idx, row in enumerate(rows):
         if row_idx >= max_rows:
             break
-        for cell in row:
-            if cell.v:
-                cell_str = str(cell.v).lower()
+        for value in row:
+            if value:
+                cell_str = str(value).lower()
                 if "insured" in cell_str or "застрахован" in cell_str:
                     return row_idx
     return 0
 
 
+@lru_cache(maxsize=4096)
+def excel_serial_to_iso(days: int) -> Optional[str]:
+    """Convert an Excel serial day number to an ISO date string.
+
+    Cached because the same inception/expiry dates repeat across many rows.
+    """
+    try:
+        return date.fromordinal(EXCEL_EPOCH_ORDINAL + days).isoformat()
+    except (ValueError, OverflowError):
+        return None
+
+
+def _iso_date(year: str, month: str, day: str) -> Optional[str]:
+    """Build an ISO date string from matched parts, or None if not a real date."""
+    try:
+        return date(int(year), int(month), int(day)).isoformat()
+    except ValueError:
+        return None
+
+
 def parse_date(value: Any) -> Optional[str]:
     """Parse various date formats to ISO string."""
     if value is None:
@@ -134,9 +207,7 @@ def parse_date(value: Any) -> Optional[str]:
 
     if isinstance(value, (int, float)):
         try:
-            excel_epoch = datetime(1899, 12, 30)
-            result = excel_epoch + timedelta(days=int(value))
-            return result.strftime("%Y-%m-%d")
+            return excel_serial_to_iso(int(value))
         except (ValueError, OverflowError):
             return None
 
@@ -145,6 +216,24 @@ def parse_date(value: Any) -> Optional[str]:
         if not value:
             return None
 
+        # Same precedence as the strptime formats below:
+        # DD.MM.YYYY, YYYY-MM-DD, MM/DD/YYYY, DD/MM/YYYY, YYYY/MM/DD
+        match = _DMY_DOT_RE.fullmatch(value)
+        if match:
+            day, month, year = match.groups()
+            return _iso_date(year, month, day)
+
+        match = _YMD_RE.fullmatch(value)
+        if match:
+            year, _, month, day = match.groups()
+            return _iso_date(year, month, day)
+
+        match = _SLASH_DATE_RE.fullmatch(value)
+        if match:
+            first, second, year = match.groups()
+            return _iso_date(year, first, second) or _iso_date(year, second, first)
+
+        # Fallback for anything the patterns above don't cover
         formats = ["%d.%m.%Y", "%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y", "%Y/%m/%d"]
         for fmt in formats:
             try:
@@ -165,8 +254,7 @@ def parse_number(value: Any) -> Optional[float]:
         return float(value)
 
     if isinstance(value, str):
-        cleaned = value.strip().replace(",", "").replace(" ", "")
-        cleaned = cleaned.replace("\u00a0", "").replace("$", "").replace("€", "").replace("%", "")
+        cleaned = value.strip().translate(_NUMBER_NOISE)
 
         if not cleaned or cleaned == "-":
             return None
@@ -179,6 +267,11 @@ def parse_number(value: Any) -> Optional[float]:
     return None
 
 
+def parse_text(value: Any) -> Optional[str]:
+    """Parse a text cell: stripped string, or None for empty cells."""
+    return str(value).strip() if value else None
+
+
 def parse_structure(value: Any) -> str:
     """Parse structure column."""
     if value is None:
@@ -204,12 +297,18 @@ def determine_origin(territory: Optional[str], currency: Optional[str]) -> str:
     return "FOREIGN"
 
 
-def get_cell_value(row: List, col_idx: int) -> Any:
-    """Safely get cell value from row."""
-    if col_idx < len(row):
-        cell = row[col_idx]
-        return cell.v if hasattr(cell, 'v') else cell
-    return None
+def sheet_values(sheet) -> Iterator[List[Any]]:
+    """Yield each row of a pyxlsb sheet as a plain list of cell values.
+
+    Unwrapping the Cell tuples once per row keeps attribute lookups out of
+    the per-column parsing loop. Short rows are padded with None up to
+    ROW_WIDTH so every mapped column can be indexed directly.
+    """
+    for row in sheet.rows():
+        values = [cell.v for cell in row]
+        if len(values) < ROW_WIDTH:
+            values.extend([None] * (ROW_WIDTH - len(values)))
+        yield values
 
 
 def determine_entity_type(name: str, is_cedant: bool = False, is_broker: bool = False) -> str:
@@ -219,7 +318,7 @@ def determine_entity_type(name: str, is_cedant: bool = False, is_broker: bool =
     if is_broker or "broker" in name_lower:
         return "Broker"
 
-    if "insurance" in name_lower or "страхов" in name_lower or "insuranc" in name_lower:
+    if "insuranc" in name_lower or "страхов" in name_lower:
         return "Insurance Company"
 
     if "reinsur" in name_lower or "перестрах" in name_lower:
@@ -231,6 +330,7 @@ def determine_entity_type(name: str, is_cedant: bool = False, is_broker: bool =
     return "Other"
 
 
+@lru_cache(maxsize=16384)
 def normalize_name(name: str) -> str:
     """Normalize entity name for deduplication."""
     if not name:
@@ -240,10 +340,140 @@ def normalize_name(name: str) -> str:
     return normalized.strip()
 
 
+def is_missing_conflict_target(error: Exception) -> bool:
+    """True if an upsert failed because its ON CONFLICT column or unique index is missing."""
+    return "42P10" in str(error) or "42703" in str(error)
+
+
+def insert_with_bisect(
+    supabase: Client,
+    table: str,
+    batch: List[Dict[str, Any]],
+    on_conflict: Optional[str] = None
+) -> Tuple[int, List[Tuple[Dict[str, Any], str]]]:
+    """Insert a batch, splitting it in half on failure to isolate bad rows.
+
+    A batch with a single bad row costs O(log n) extra requests instead of
+    one request per row. With ``on_conflict`` the batch is upserted and rows
+    conflicting on that column are skipped by the database; only the rows
+    actually inserted are counted. A missing unique index for ``on_conflict``
+    is raised rather than bisected, since no split can fix it.
+    Returns (inserted_count, [(record, error), ...]).
+    """
+    try:
+        if on_conflict:
+            response = supabase.table(table).upsert(
+                batch, on_conflict=on_conflict, ignore_duplicates=True
+            ).execute()
+            return len(response.data or []), []
+
+        supabase.table(table).insert(batch).execute()
+        return len(batch), []
+    except Exception as e:
+        if on_conflict and is_missing_conflict_target(e):
+            raise
+        if len(batch) == 1:
+            return 0, [(batch[0], str(e))]
+
+    mid = len(batch) // 2
+    left_inserted, left_failed = insert_with_bisect(supabase, table, batch[:mid], on_conflict)
+    right_inserted, right_failed = insert_with_bisect(supabase, table, batch[mid:], on_conflict)
+    return left_inserted + right_inserted, left_failed + right_failed
+
+
+def copy_records(database_url: str, batches: Iterable[List[Dict[str, Any]]]) -> int:
+    """Load inward_reinsurance records with COPY FROM STDIN in one transaction.
+
+    Used instead of PostgREST inserts when DATABASE_URL is set. Any failure
+    rolls the whole load back, so there is nothing to retry row by row.
+    Returns the number of records copied.
+    """
+    try:
+        import psycopg
+    except ImportError as e:
+        print(f"Missing package for DATABASE_URL: {e}")
+        print("Install with: pip install \"psycopg[binary]\"")
+        sys.exit(1)
+
+    columns = ", ".join(RECORD_COLUMNS)
+    copied = 0
+
+    # The connection block commits on success and rolls back on any error
+    with psycopg.connect(database_url) as conn:
+        with conn.cursor() as cur:
+            with cur.copy(f"COPY inward_reinsurance ({columns}) FROM STDIN") as copy:
+                for batch in batches:
+                    for record in batch:
+                        copy.write_row([record.get(column) for column in RECORD_COLUMNS])
+                    copied += len(batch)
+                    print(f"    Copied {copied} records...")
+
+    return copied
+
+
+def insert_entity_batches(
+    supabase: Client,
+    entities: List[Dict[str, Any]],
+    on_conflict: Optional[str] = None
+) -> Tuple[int, int]:
+    """Insert legal entities in BATCH_SIZE chunks. Returns (inserted, errors)."""
+    entities_inserted = 0
+    entities_errors = 0
+
+    for i in range(0, len(entities), BATCH_SIZE):
+        batch = entities[i:i + BATCH_SIZE]
+        batch_num = (i // BATCH_SIZE) + 1
+        print(f"  Entity batch {batch_num}: {i + 1} - {min(i + BATCH_SIZE, len(entities))}...", end=" ")
+
+        inserted, failed = insert_with_bisect(supabase, "legal_entities", batch, on_conflict)
+        entities_inserted += inserted
+        entities_errors += len(failed)
+        print(f"OK" if not failed else f"{len(failed)} rows FAILED")
+
+        for entity, error in failed:
+            print(f"    Failed: {entity.get('fullName', 'Unknown')[:40]} - {error[:50]}")
+
+    return entities_inserted, entities_errors
+
+
 # ==============================================================================
 # Backup Functions
 # ==============================================================================
 
+def fetch_all_rows(supabase: Client, table: str) -> Iterator[Dict[str, Any]]:
+    """Yield every row of a table, one BACKUP_PAGE_SIZE page at a time.
+
+    Pages are ordered by id so offsets are stable, and the offset advances by
+    the rows actually returned in case the server caps pages lower.
+    """
+    offset = 0
+    while True:
+        response = (
+            supabase.table(table)
+            .select("*")
+            .order("id")
+            .range(offset, offset + BACKUP_PAGE_SIZE - 1)
+            .execute()
+        )
+        rows = response.data or []
+        if not rows:
+            return
+        yield from rows
+        offset += len(rows)
+
+
+def read_backup_records(backup_file: str) -> Iterator[Dict[str, Any]]:
+    """Yield records from a backup file (gzipped JSONL, or an older JSON array)."""
+    if backup_file.endswith(".jsonl.gz"):
+        with gzip.open(backup_file, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield orjson.loads(line)
+    else:
+        with open(backup_file, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+
+
 def create_backup(supabase: Client) -> str:
     """Create backup of current database state."""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -261,26 +491,28 @@ def create_backup(supabase: Client) -> str:
     for table in tables:
         try:
             print(f"  Backing up {table}...", end=" ")
-            response = supabase.table(table).select("*").execute()
-            records = response.data or []
+            count = 0
 
-            backup_file = os.path.join(backup_subdir, f"{table}.json")
-            with open(backup_file, "w", encoding="utf-8") as f:
-                json.dump(records, f, indent=2, ensure_ascii=False, default=str)
+            # One compact JSON record per line, written page by page
+            backup_file = os.path.join(backup_subdir, f"{table}.jsonl.gz")
+            with gzip.open(backup_file, "wb") as f:
+                for record in fetch_all_rows(supabase, table):
+                    f.write(orjson.dumps(record, default=str))
+                    f.write(b"\n")
+                    count += 1
 
             backup_manifest["tables"][table] = {
-                "count": len(records),
-                "file": f"{table}.json"
+                "count": count,
+                "file": f"{table}.jsonl.gz"
             }
-            print(f"{len(records)} records")
+            print(f"{count} records")
         except Exception as e:
             print(f"FAILED: {e}")
             backup_manifest["tables"][table] = {"count": 0, "error": str(e)}
 
     # Save manifest
     manifest_file = os.path.join(backup_subdir, "manifest.json")
-    with open(manifest_file, "w", encoding="utf-8") as f:
-        json.dump(backup_manifest, f, indent=2)
+    write_json(manifest_file, backup_manifest)
 
     print(f"\nBackup complete: {backup_subdir}")
     print(f"Manifest saved: {manifest_file}")
@@ -313,8 +545,8 @@ def restore_from_backup(supabase: Client, backup_name: str) -> bool:
         print(f"ERROR: Backup not found: {backup_path}")
         return False
 
-    with open(manifest_path, "r") as f:
-        manifest = json.load(f)
+    with open(manifest_path, "rb") as f:
+        manifest = orjson.loads(f.read())
 
     print(f"\nRestoring from backup: {backup_name}")
     print(f"Backup timestamp: {manifest.get('timestamp')}")
@@ -341,17 +573,25 @@ def restore_from_backup(supabase: Client, backup_name: str) -> bool:
             # Delete all existing records
             supabase.table(table).delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
 
-            # Load backup data
-            with open(backup_file, "r", encoding="utf-8") as f:
-                records = json.load(f)
-
-            if records:
-                # Insert in batches
-                for i in range(0, len(records), BATCH_SIZE):
-                    batch = records[i:i + BATCH_SIZE]
-                    supabase.table(table).insert(batch).execute()
-
-            print(f"OK ({len(records)} records)")
+            # Stream backup data and insert in batches
+            records = read_backup_records(backup_file)
+            total = 0
+            failed: List[Tuple[Dict[str, Any], str]] = []
+            while True:
+                batch = list(islice(records, BATCH_SIZE))
+                if not batch:
+                    break
+                total += len(batch)
+                _, batch_failed = insert_with_bisect(supabase, table, batch)
+                failed.extend(batch_failed)
+
+            if failed:
+                print(f"FAILED ({len(failed)} of {total} records)")
+                for record, error in failed[:10]:
+                    print(f"    - {record.get('id')}: {error[:100]}")
+                return False
+
+            print(f"OK ({total} records)")
         except Exception as e:
             print(f"FAILED: {e}")
             return False
@@ -374,8 +614,15 @@ def rollback_batch(supabase: Client, batch_id: str) -> bool:
         try:
             print(f"  Checking {table}...", end=" ")
 
-            # Count records with this batch_id
-            count_response = supabase.table(table).select("id", count="exact").eq("import_batch_id", batch_id).execute()
+            # Count records with this batch_id (limit 0: only the count comes
+            # back, served by the import_batch_id index from the migration)
+            count_response = (
+                supabase.table(table)
+                .select("id", count="exact")
+                .eq("import_batch_id", batch_id)
+                .limit(0)
+                .execute()
+            )
             count = count_response.count or 0
 
             if count == 0:
@@ -388,9 +635,9 @@ def rollback_batch(supabase: Client, batch_id: str) -> bool:
                 print("  Skipped")
                 continue
 
-            # Delete records with this batch_id
-            supabase.table(table).delete().eq("import_batch_id", batch_id).execute()
-            print(f"Deleted {count} records")
+            # Delete records with this batch_id and report what was removed
+            delete_response = supabase.table(table).delete(count="exact").eq("import_batch_id", batch_id).execute()
+            print(f"Deleted {delete_response.count or 0} records")
 
         except Exception as e:
             print(f"FAILED: {e}")
@@ -403,38 +650,56 @@ def rollback_batch(supabase: Client, batch_id: str) -> bool:
 # Import Functions
 # ==============================================================================
 
-def parse_row(row: List, row_number: int, sheet_name: str, batch_id: str) -> Optional[Dict[str, Any]]:
-    """Parse a single Excel row into an inward_reinsurance record."""
-    record: Dict[str, Any] = {}
-
-    # Text columns
-    for col_idx, field_name in TEXT_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        record[field_name] = str(value).strip() if value else None
-
-    # Date columns
-    for col_idx, field_name in DATE_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        record[field_name] = parse_date(value)
+# (column, field, parser) for every mapped column, in record key order
+ROW_SCHEMA: Tuple[Tuple[int, str, Callable[[Any], Any]], ...] = (
+    tuple((col_idx, field_name, parse_text) for col_idx, field_name in TEXT_COLUMNS.items())
+    + tuple((col_idx, field_name, parse_date) for col_idx, field_name in DATE_COLUMNS.items())
+    + tuple((col_idx, field_name, parse_number) for col_idx, field_name in NUMERIC_COLUMNS.items())
+    + ((STRUCTURE_COLUMN, 'structure', parse_structure),)
+)
+
+# Every key parse_row sets, in the order written by COPY
+RECORD_COLUMNS: Tuple[str, ...] = tuple(field_name for _, field_name, _ in ROW_SCHEMA) + (
+    'notes', 'origin', 'type', 'status', 'cedant_country',
+    'import_batch_id', 'import_source', 'uw_year',
+)
+
+
+def parse_row(
+    row: List[Any],
+    row_number: int,
+    sheet_name: str,
+    batch_id: str,
+    sheet_year: int,
+    default_dates: Tuple[str, str]
+) -> Optional[Dict[str, Any]]:
+    """Parse a single Excel row into an inward_reinsurance record.
+
+    ``sheet_year`` is the UW year fallback for rows without an inception
+    date, worked out once per sheet by ``extract_year_from_sheet_name``.
+    ``default_dates`` is the (inception, expiry) fallback from
+    ``default_policy_dates``, computed once per import.
+    """
+    # Blank rows (common as padding at the end of a sheet) have no cedant,
+    # contract or insured; skip them before parsing every column
+    if not (row[CEDANT_COLUMN] or row[CONTRACT_COLUMN] or row[INSURED_COLUMN]):
+        return None
 
-    # Numeric columns
-    for col_idx, field_name in NUMERIC_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        record[field_name] = parse_number(value)
+    record: Dict[str, Any] = {}
 
-    # Structure
-    structure_value = get_cell_value(row, STRUCTURE_COLUMN)
-    record['structure'] = parse_structure(structure_value)
+    # Text, date, numeric and structure columns (row is padded to ROW_WIDTH)
+    for col_idx, field_name, parser in ROW_SCHEMA:
+        record[field_name] = parser(row[col_idx])
 
     # Concatenate notes columns
     notes_parts = []
     for col_idx in NOTES_COLUMNS:
-        value = get_cell_value(row, col_idx)
+        value = row[col_idx]
         if value:
             notes_parts.append(str(value).strip())
     record['notes'] = " | ".join(notes_parts) if notes_parts else None
 
-    # Skip empty rows
+    # Skip rows whose key cells held only whitespace
     if not record.get('cedant_name') and not record.get('contract_number') and not record.get('original_insured_name'):
         return None
 
@@ -452,9 +717,9 @@ def parse_row(row: List, row_number: int, sheet_name: str, batch_id: str) -> Opt
             year = int(record['inception_date'][:4])
             record['uw_year'] = year
         except (ValueError, TypeError):
-            record['uw_year'] = extract_year_from_sheet_name(sheet_name)
+            record['uw_year'] = sheet_year
     else:
-        record['uw_year'] = extract_year_from_sheet_name(sheet_name)
+        record['uw_year'] = sheet_year
 
     # Required field fallbacks
     if not record.get('contract_number'):
@@ -469,14 +734,11 @@ def parse_row(row: List, row_number: int, sheet_name: str, batch_id: str) -> Opt
     if not record.get('class_of_cover'):
         record['class_of_cover'] = "All Risks"
 
-    today = datetime.now().strftime("%Y-%m-%d")
-    next_year = (datetime.now() + timedelta(days=365)).strftime("%Y-%m-%d")
-
     if not record.get('inception_date'):
-        record['inception_date'] = today
+        record['inception_date'] = default_dates[0]
 
     if not record.get('expiry_date'):
-        record['expiry_date'] = next_year
+        record['expiry_date'] = default_dates[1]
 
     if not record.get('currency'):
         record['currency'] = 'USD'
@@ -491,58 +753,79 @@ def parse_row(row: List, row_number: int, sheet_name: str, batch_id: str) -> Opt
     return record
 
 
+def default_policy_dates() -> Tuple[str, str]:
+    """Fallback (inception, expiry) dates: today and a year from today."""
+    now = datetime.now()
+    return now.strftime("%Y-%m-%d"), (now + timedelta(days=365)).strftime("%Y-%m-%d")
+
+
 def extract_year_from_sheet_name(sheet_name: str) -> int:
     """Extract year from sheet name like '2024', 'Inward 2023', etc."""
-    import re
-    match = re.search(r'20\d{2}', sheet_name)
+    match = _YEAR_RE.search(sheet_name)
     if match:
         return int(match.group())
     return datetime.now().year
 
 
-def extract_legal_entities(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Extract unique legal entities from import records."""
-    entities: Dict[str, Dict[str, Any]] = {}  # keyed by normalized name
+def _add_entity(
+    entities: Dict[str, Dict[str, Any]],
+    name: str,
+    role: str,
+    country: Optional[str],
+    batch_id: Optional[str]
+) -> None:
+    """Add ``name`` to ``entities`` unless its normalized form is already there.
+
+    ``role`` is "cedant", "broker" or "insured"; the entity type is only
+    worked out for names not seen before.
+    """
+    normalized = normalize_name(name)
+    if not normalized or normalized in entities:
+        return
+
+    if role == "insured":
+        entity_type = "Insured"
+    else:
+        entity_type = determine_entity_type(name, is_cedant=role == "cedant", is_broker=role == "broker")
+
+    full_name = name.strip()
+    entities[normalized] = {
+        "fullName": full_name,
+        "shortName": full_name[:50] if len(name) > 50 else None,
+        "type": entity_type,
+        "country": country,
+        "import_batch_id": batch_id,
+    }
+
+
+def extract_legal_entities(
+    records: List[Dict[str, Any]],
+    entities: Optional[Dict[str, Dict[str, Any]]] = None
+) -> List[Dict[str, Any]]:
+    """Extract unique legal entities from import records.
+
+    Pass the same ``entities`` dict across calls to accumulate entities from
+    a stream of record batches; the first occurrence of a name wins.
+    """
+    if entities is None:
+        entities = {}  # keyed by normalized name
 
     for record in records:
-        # Extract cedant
+        batch_id = record.get('import_batch_id')
+
         cedant_name = record.get('cedant_name')
         if cedant_name and cedant_name != "Unknown Cedant":
-            normalized = normalize_name(cedant_name)
-            if normalized and normalized not in entities:
-                entities[normalized] = {
-                    "fullName": cedant_name.strip(),
-                    "shortName": cedant_name.strip()[:50] if len(cedant_name) > 50 else None,
-                    "type": determine_entity_type(cedant_name, is_cedant=True),
-                    "country": record.get('cedant_country') or record.get('territory'),
-                    "import_batch_id": record.get('import_batch_id'),
-                }
-
-        # Extract broker
+            _add_entity(entities, cedant_name, "cedant",
+                        record.get('cedant_country') or record.get('territory'), batch_id)
+
         broker_name = record.get('broker_name')
         if broker_name:
-            normalized = normalize_name(broker_name)
-            if normalized and normalized not in entities:
-                entities[normalized] = {
-                    "fullName": broker_name.strip(),
-                    "shortName": broker_name.strip()[:50] if len(broker_name) > 50 else None,
-                    "type": determine_entity_type(broker_name, is_broker=True),
-                    "country": None,  # Broker country not typically in the data
-                    "import_batch_id": record.get('import_batch_id'),
-                }
-
-        # Extract original insured
+            # Broker country not typically in the data
+            _add_entity(entities, broker_name, "broker", None, batch_id)
+
         insured_name = record.get('original_insured_name')
         if insured_name:
-            normalized = normalize_name(insured_name)
-            if normalized and normalized not in entities:
-                entities[normalized] = {
-                    "fullName": insured_name.strip(),
-                    "shortName": insured_name.strip()[:50] if len(insured_name) > 50 else None,
-                    "type": "Insured",
-                    "country": record.get('territory'),
-                    "import_batch_id": record.get('import_batch_id'),
-                }
+            _add_entity(entities, insured_name, "insured", record.get('territory'), batch_id)
 
     return list(entities.values())
 
@@ -555,9 +838,14 @@ def check_existing_entities(supabase: Client, entities: List[Dict[str, Any]]) ->
     print("  Checking for existing entities...", end=" ")
 
     try:
-        # Get all existing entity names
-        response = supabase.table("legal_entities").select("fullName").execute()
-        existing_names = {normalize_name(e["fullName"]) for e in (response.data or []) if e.get("fullName")}
+        # Look up only the names we're about to insert, both as written and
+        # whitespace-normalized, in chunks small enough for the request URL
+        candidates = sorted({n for e in entities for n in (e["fullName"], normalize_name(e["fullName"]))})
+        existing_names = set()
+        for i in range(0, len(candidates), ENTITY_LOOKUP_CHUNK):
+            chunk = candidates[i:i + ENTITY_LOOKUP_CHUNK]
+            response = supabase.table("legal_entities").select("fullName").in_("fullName", chunk).execute()
+            existing_names.update(normalize_name(e["fullName"]) for e in (response.data or []) if e.get("fullName"))
 
         # Filter to only new entities
         new_entities = [e for e in entities if normalize_name(e["fullName"]) not in existing_names]
@@ -569,47 +857,114 @@ def check_existing_entities(supabase: Client, entities: List[Dict[str, Any]]) ->
         return entities  # Return all if we can't check
 
 
-def process_all_sheets(wb, batch_id: str) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
-    """Process all sheets in the workbook."""
-    all_records = []
-    sheet_stats = {}
+def parse_sheet(
+    decrypted_path: str,
+    sheet_name: str,
+    batch_id: str,
+    default_dates: Tuple[str, str]
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Parse one sheet into inward_reinsurance records.
+
+    Opens the workbook itself so it can run in a worker process (pyxlsb
+    workbooks can't be pickled). Returns the records parsed and None, or, if
+    the sheet failed part way, no records and the error message; a failed
+    sheet is skipped as a whole rather than imported truncated.
+    """
+    records: List[Dict[str, Any]] = []
+    sheet_year = extract_year_from_sheet_name(sheet_name)
+
+    try:
+        with open_workbook(decrypted_path) as wb, wb.get_sheet(sheet_name) as sheet:
+            rows = sheet_values(sheet)
+            head = list(islice(rows, HEADER_SCAN_ROWS))
+            header_row_idx = find_header_row(head)
+
+            for row_idx, row in enumerate(chain(head, rows)):
+                if row_idx <= header_row_idx:
+                    continue
+
+                row_number = row_idx + 1
+                record = parse_row(row, row_number, sheet_name, batch_id, sheet_year, default_dates)
+
+                if record:
+                    records.append(record)
 
-    sheet_names = get_all_sheets(wb)
+    except Exception as e:
+        return [], str(e)
+
+    return records, None
+
+
+def process_all_sheets(
+    decrypted_path: str,
+    batch_id: str,
+    sheet_stats: Dict[str, int]
+) -> Iterator[List[Dict[str, Any]]]:
+    """Parse all sheets of the workbook, yielding records in BATCH_SIZE chunks.
+
+    Sheets are independent, so they are parsed in parallel across up to
+    PARSE_WORKERS processes. Results are consumed in workbook order, so the
+    records and their batches come out exactly as a serial parse would
+    produce them. Per-sheet record counts are written into ``sheet_stats``.
+    """
+    pending: List[Dict[str, Any]] = []
+
+    with open_workbook(decrypted_path) as wb:
+        sheet_names = get_all_sheets(wb)
     print(f"\nFound {len(sheet_names)} sheets: {sheet_names}")
 
+    data_sheets = []
     for sheet_name in sheet_names:
         # Skip sheets that don't look like data sheets
-        if any(skip in sheet_name.lower() for skip in ['template', 'blank', 'summary', 'pivot', 'chart']):
+        lowered = sheet_name.lower()
+        if any(token in lowered for token in SKIP_SHEET_TOKENS):
             print(f"\n  Skipping sheet: {sheet_name}")
             continue
+        data_sheets.append(sheet_name)
+
+    # Same fallback dates for every sheet and worker in this import
+    default_dates = default_policy_dates()
+
+    workers = min(PARSE_WORKERS, len(data_sheets))
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        futures = deque(
+            pool.submit(parse_sheet, decrypted_path, name, batch_id, default_dates)
+            for name in data_sheets
+        )
+        # Pop each future as it is consumed so a finished sheet's records are
+        # not kept alive by the future until the whole workbook is done
+        results = (futures.popleft().result() for _ in data_sheets)
+    else:
+        pool = None
+        results = (parse_sheet(decrypted_path, name, batch_id, default_dates) for name in data_sheets)
 
-        print(f"\n  Processing sheet: {sheet_name}")
-
-        try:
-            sheet = wb.get_sheet(sheet_name)
-            rows = list(sheet.rows())
-            header_row_idx = find_header_row(rows)
-
-            sheet_records = []
-            for row_idx, row in enumerate(rows):
-                if row_idx <= header_row_idx:
-                    continue
+    try:
+        for sheet_name, (records, error) in zip(data_sheets, results):
+            print(f"\n  Processing sheet: {sheet_name}")
+            if error:
+                print(f"    Error: {error}")
+                sheet_stats[sheet_name] = 0
+                continue
 
-                row_number = row_idx + 1
-                record = parse_row(row, row_number, sheet_name, batch_id)
+            sheet_stats[sheet_name] = len(records)
+            print(f"    Parsed: {len(records)} records")
 
-                if record:
-                    sheet_records.append(record)
+            for record in records:
+                pending.append(record)
 
-            all_records.extend(sheet_records)
-            sheet_stats[sheet_name] = len(sheet_records)
-            print(f"    Parsed: {len(sheet_records)} records")
+                if len(pending) >= BATCH_SIZE:
+                    yield pending
+                    pending = []
 
-        except Exception as e:
-            print(f"    Error: {e}")
-            sheet_stats[sheet_name] = 0
+            # Release this sheet's list before waiting on the next one
+            del records
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
 
-    return all_records, sheet_stats
+    if pending:
+        yield pending
 
 
 # ==============================================================================
@@ -638,6 +993,8 @@ def run_import(dry_run: bool = True):
     print(f"\nConfiguration:")
     print(f"  Supabase URL: {SUPABASE_URL[:50]}...")
     print(f"  Excel File: {EXCEL_FILE}")
+    if DATABASE_URL:
+        print(f"  Records via: COPY (DATABASE_URL)")
 
     # Connect to Supabase
     print("\nConnecting to Supabase...")
@@ -669,17 +1026,80 @@ def run_import(dry_run: bool = True):
         print(f"ERROR: Failed to decrypt: {e}")
         sys.exit(1)
 
-    # Open workbook and process all sheets
+    # Parse all sheets (in parallel worker processes) and stream the records
+    # back in batches. In live mode each batch is handed to a small pool of
+    # upload threads as soon as it arrives, so PostgREST round trips overlap
+    # with parsing; legal entities are accumulated along the way.
     print("\n" + "-" * 70)
     print("STEP 3: Processing all sheets...")
+    if not dry_run:
+        print("  Records are imported into inward_reinsurance as each batch is parsed")
+        if DATABASE_URL:
+            print("  (single COPY transaction: any failure rolls back all records)")
+
+    sheet_stats: Dict[str, int] = {}
+    entities_by_name: Dict[str, Dict[str, Any]] = {}
+    preview_records: List[Dict[str, Any]] = []
+    total_records = 0
+
+    records_inserted = 0
+    records_errors = 0
+    error_records = []
+
+    # (batch_start, batch_end, future) for uploads not yet reported
+    in_flight: Deque[Tuple[int, int, Future]] = deque()
+
+    def finish_record_batch() -> None:
+        nonlocal records_inserted, records_errors
+        batch_start, batch_end, future = in_flight.popleft()
+        inserted, failed = future.result()
+        records_inserted += inserted
+        records_errors += len(failed)
+
+        batch_num = (batch_start // BATCH_SIZE) + 1
+        status = "OK" if not failed else f"{len(failed)} rows FAILED"
+        print(f"    Record batch {batch_num}: {batch_start + 1} - {batch_end}... {status}")
+
+        for record, error in failed:
+            error_records.append({
+                "contract": record.get("contract_number"),
+                "error": error[:100]
+            })
+
+    def parsed_batches() -> Iterator[List[Dict[str, Any]]]:
+        nonlocal total_records
+        for batch in process_all_sheets(decrypted_path, batch_id, sheet_stats):
+            extract_legal_entities(batch, entities_by_name)
+            total_records += len(batch)
+            yield batch
+
     try:
-        wb = open_workbook(decrypted_path)
-        all_records, sheet_stats = process_all_sheets(wb, batch_id)
+        if dry_run:
+            for batch in parsed_batches():
+                if len(preview_records) < PREVIEW_RECORDS:
+                    preview_records.extend(batch[:PREVIEW_RECORDS - len(preview_records)])
+
+        elif DATABASE_URL:
+            records_inserted = copy_records(DATABASE_URL, parsed_batches())
+
+        else:
+            with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as uploader:
+                for batch in parsed_batches():
+                    batch_start = total_records - len(batch)
+                    future = uploader.submit(insert_with_bisect, supabase, "inward_reinsurance", batch)
+                    in_flight.append((batch_start, total_records, future))
+
+                    # Bound the number of parsed batches waiting on the network
+                    if len(in_flight) >= UPLOAD_WORKERS * 2:
+                        finish_record_batch()
+
+                while in_flight:
+                    finish_record_batch()
     except Exception as e:
         print(f"ERROR: Failed to process workbook: {e}")
         sys.exit(1)
 
-    print(f"\n  Total records parsed: {len(all_records)}")
+    print(f"\n  Total records parsed: {total_records}")
     print(f"  Sheet breakdown:")
     for sheet_name, count in sheet_stats.items():
         print(f"    - {sheet_name}: {count} records")
@@ -687,7 +1107,7 @@ def run_import(dry_run: bool = True):
     # Extract legal entities
     print("\n" + "-" * 70)
     print("STEP 4: Extracting legal entities...")
-    all_entities = extract_legal_entities(all_records)
+    all_entities = list(entities_by_name.values())
     print(f"  Found {len(all_entities)} unique entities")
 
     entity_types = {}
@@ -698,11 +1118,6 @@ def run_import(dry_run: bool = True):
     for etype, count in sorted(entity_types.items()):
         print(f"    - {etype}: {count}")
 
-    # In live mode, check for existing entities
-    new_entities = all_entities
-    if not dry_run:
-        new_entities = check_existing_entities(supabase, all_entities)
-
     # Dry Run: Save preview and exit
     if dry_run:
         print("\n" + "=" * 70)
@@ -712,26 +1127,23 @@ def run_import(dry_run: bool = True):
         os.makedirs("previews", exist_ok=True)
 
         # Save sample records
-        with open("previews/records_preview.json", "w", encoding="utf-8") as f:
-            json.dump(all_records[:100], f, indent=2, ensure_ascii=False, default=str)
+        write_json("previews/records_preview.json", preview_records)
 
         # Save entities
-        with open("previews/entities_preview.json", "w", encoding="utf-8") as f:
-            json.dump(all_entities, f, indent=2, ensure_ascii=False, default=str)
+        write_json("previews/entities_preview.json", all_entities)
 
         # Save stats
         stats = {
             "batch_id": batch_id,
-            "total_records": len(all_records),
+            "total_records": total_records,
             "total_entities": len(all_entities),
             "sheet_stats": sheet_stats,
             "entity_types": entity_types,
         }
-        with open("previews/import_stats.json", "w", encoding="utf-8") as f:
-            json.dump(stats, f, indent=2)
+        write_json("previews/import_stats.json", stats)
 
         print(f"\nPreview files saved to ./previews/")
-        print(f"  - records_preview.json (first 100 records)")
+        print(f"  - records_preview.json (first {PREVIEW_RECORDS} records)")
         print(f"  - entities_preview.json (all {len(all_entities)} entities)")
         print(f"  - import_stats.json")
         print(f"\nReview these files, then run with --import flag to execute.")
@@ -746,62 +1158,23 @@ def run_import(dry_run: bool = True):
     print("\n" + "-" * 70)
     print("STEP 5: Importing legal entities...")
 
-    entities_inserted = 0
-    entities_errors = 0
-
-    if new_entities:
-        for i in range(0, len(new_entities), BATCH_SIZE):
-            batch = new_entities[i:i + BATCH_SIZE]
-            batch_num = (i // BATCH_SIZE) + 1
-            print(f"  Entity batch {batch_num}: {i + 1} - {min(i + BATCH_SIZE, len(new_entities))}...", end=" ")
+    # Existing names are skipped by the database via the unique index on
+    # full_name_key ("fullName" with whitespace collapsed, as normalize_name
+    # does); without that index, filter against existing names first.
+    try:
+        entities_inserted, entities_errors = insert_entity_batches(supabase, all_entities, on_conflict="full_name_key")
+    except Exception as e:
+        if not is_missing_conflict_target(e):
+            raise
+        print("\n  No unique index on legal_entities(full_name_key), falling back to client-side check")
+        new_entities = check_existing_entities(supabase, all_entities)
+        entities_inserted, entities_errors = insert_entity_batches(supabase, new_entities)
 
-            try:
-                supabase.table("legal_entities").insert(batch).execute()
-                entities_inserted += len(batch)
-                print(f"OK")
-            except Exception as e:
-                print(f"FAILED: {e}")
-                # Try one by one
-                for entity in batch:
-                    try:
-                        supabase.table("legal_entities").insert(entity).execute()
-                        entities_inserted += 1
-                    except Exception as row_error:
-                        entities_errors += 1
-                        print(f"    Failed: {entity.get('fullName', 'Unknown')[:40]} - {str(row_error)[:50]}")
+    entities_skipped = len(all_entities) - entities_inserted - entities_errors
 
     print(f"\n  Entities inserted: {entities_inserted}")
     print(f"  Entities errors: {entities_errors}")
-
-    print("\n" + "-" * 70)
-    print("STEP 6: Importing inward reinsurance records...")
-
-    records_inserted = 0
-    records_errors = 0
-    error_records = []
-
-    for i in range(0, len(all_records), BATCH_SIZE):
-        batch = all_records[i:i + BATCH_SIZE]
-        batch_num = (i // BATCH_SIZE) + 1
-        print(f"  Record batch {batch_num}: {i + 1} - {min(i + BATCH_SIZE, len(all_records))}...", end=" ")
-
-        try:
-            supabase.table("inward_reinsurance").insert(batch).execute()
-            records_inserted += len(batch)
-            print(f"OK")
-        except Exception as e:
-            print(f"FAILED - retrying row by row...")
-
-            for record in batch:
-                try:
-                    supabase.table("inward_reinsurance").insert(record).execute()
-                    records_inserted += 1
-                except Exception as row_error:
-                    records_errors += 1
-                    error_records.append({
-                        "contract": record.get("contract_number"),
-                        "error": str(row_error)[:100]
-                    })
+    print(f"  Entities already present: {entities_skipped}")
 
     # Summary
     print("\n" + "=" * 70)
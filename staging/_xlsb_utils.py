@@ -0,0 +1,34 @@
+"""
+Shared helpers for the staging .xlsb scripts.
+
+Imported by import_all_sheets.py, import_portfolio.py and
+inspect_outward_sheet.py, which run from this directory.
+"""
+
+import io
+from typing import Union
+
+import msoffcrypto
+
+
+def decrypt_xlsb(file_path: str, password: str = "") -> Union[str, io.BytesIO]:
+    """Decrypt an encrypted .xlsb file into memory using msoffcrypto-tool.
+
+    Returns the original path if the file is not encrypted, otherwise a
+    BytesIO holding the decrypted workbook (open_workbook accepts either).
+    """
+    with open(file_path, "rb") as f:
+        file = msoffcrypto.OfficeFile(f)
+
+        if not file.is_encrypted():
+            print(f"  File is not encrypted, using directly")
+            return file_path
+
+        file.load_key(password=password)
+
+        decrypted = io.BytesIO()
+        file.decrypt(decrypted)
+
+    decrypted.seek(0)
+    print(f"  Decrypted in memory ({len(decrypted.getbuffer()) / 1_048_576:.1f} MB)")
+    return decrypted
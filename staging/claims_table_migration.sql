@@ -18,6 +18,36 @@ CREATE INDEX IF NOT EXISTS idx_claims_source_type ON public.claims(source_type);
 CREATE INDEX IF NOT EXISTS idx_claims_slip_number ON public.claims(slip_number);
 CREATE INDEX IF NOT EXISTS idx_claims_contract_number ON public.claims(contract_number);
 
+-- Bulk insert used by import_claims.py: one request per batch of claims and
+-- their transactions, in a single transaction. Claim ids are generated by the
+-- importer, so transactions arrive already linked through claim_id.
+CREATE OR REPLACE FUNCTION public.import_claims_batch(claims JSONB, transactions JSONB)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO public.claims (
+        id, policy_id, inward_reinsurance_id, claim_number, source_type,
+        slip_number, contract_number, liability_type, status, loss_date,
+        report_date, description, claimant_name, location_country,
+        imported_total_incurred, imported_total_paid, is_deleted
+    )
+    SELECT
+        id, policy_id, inward_reinsurance_id, claim_number, source_type,
+        slip_number, contract_number, liability_type, status, loss_date,
+        report_date, description, claimant_name, location_country,
+        imported_total_incurred, imported_total_paid, is_deleted
+    FROM jsonb_populate_recordset(NULL::public.claims, claims);
+
+    INSERT INTO public.claim_transactions (
+        claim_id, transaction_type, transaction_date, amount_100pct, currency,
+        exchange_rate, our_share_percentage, notes
+    )
+    SELECT
+        claim_id, transaction_type, transaction_date, amount_100pct, currency,
+        exchange_rate, our_share_percentage, notes
+    FROM jsonb_populate_recordset(NULL::public.claim_transactions, transactions);
+$$;
+
 -- Verify changes
 SELECT
     column_name,
@@ -17,13 +17,21 @@ Usage:
     python import_all_sheets.py --all                  # Import all sheets
 """
 
+import io
 import os
+import re
 import sys
 import json
 import argparse
-import tempfile
+import contextlib
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -31,14 +39,22 @@ load_dotenv()
 
 # Required packages
 try:
-    import msoffcrypto
+    import httpx
+    from postgrest.types import ReturnMethod
     from pyxlsb import open_workbook
-    from supabase import create_client, Client
+    from _xlsb_utils import decrypt_xlsb
+    from supabase import create_client, Client, ClientOptions
 except ImportError as e:
     print(f"Missing required package: {e}")
     print("Install with: pip install supabase pyxlsb msoffcrypto-tool python-dotenv")
     sys.exit(1)
 
+# Optional: faster JSON encoding for preview files
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ==============================================================================
 # Configuration
 # ==============================================================================
@@ -47,9 +63,17 @@ SUPABASE_URL = os.getenv("SUPABASE_URL", "https://jwauzanxuwmwvvkojwmx.supabase.
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
 EXCEL_FILE = os.getenv("EXCEL_FILE", "Reinsurance_Portfolio_-2021-2026.xlsb")
 EXCEL_PASSWORD = os.getenv("EXCEL_PASSWORD", "0110")
+# Optional direct Postgres connection; when set, sheets are loaded with COPY
+DATABASE_URL = os.getenv("DATABASE_URL", "")
 
-BATCH_SIZE = 50
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "1000"))  # rows per PostgREST insert request
+INSERT_CONCURRENCY = int(os.getenv("INSERT_CONCURRENCY", "8"))  # insert requests in flight
+MAX_BISECT_DEPTH = 12  # halvings before a failed batch falls back to single rows
+SHEET_WORKERS = int(os.getenv("SHEET_WORKERS", "4"))  # sheets processed in parallel processes
 PREVIEW_ROWS = 10
+HEADER_SCAN_ROWS = 15
+# Any of these in a cell marks the header row
+_HEADER_RE = re.compile(r"insured|policy|договор|застрахован|slip|contract|premium", re.IGNORECASE)
 
 # ==============================================================================
 # Sheet 1: Insurance Contracts → policies (camelCase)
@@ -98,6 +122,12 @@ CONTRACTS_NUMERIC_COLUMNS: Dict[int, str] = {
     35: 'receivedPremiumNational', # AJ: Paid amount (UZS)
 }
 
+# Materialized (column, field) pairs, so the row parsers don't build dict views
+# per row; the other sheets below follow the same pattern
+CONTRACTS_TEXT_ITEMS = tuple(CONTRACTS_TEXT_COLUMNS.items())
+CONTRACTS_DATE_ITEMS = tuple(CONTRACTS_DATE_COLUMNS.items())
+CONTRACTS_NUMERIC_ITEMS = tuple(CONTRACTS_NUMERIC_COLUMNS.items())
+
 # ==============================================================================
 # Sheet 2: Outward → policies (as outward reinsurance rows)
 # ==============================================================================
@@ -151,6 +181,10 @@ OUTWARD_NUMERIC_COLUMNS: Dict[int, str] = {
     62: 'receivedPremiumNational', # Col 62: Оплачена в сумах (Received premium national)
 }
 
+OUTWARD_TEXT_ITEMS = tuple(OUTWARD_TEXT_COLUMNS.items())
+OUTWARD_DATE_ITEMS = tuple(OUTWARD_DATE_COLUMNS.items())
+OUTWARD_NUMERIC_ITEMS = tuple(OUTWARD_NUMERIC_COLUMNS.items())
+
 # ==============================================================================
 # Sheet 3: Outward RE Slips → slips (camelCase)
 # ==============================================================================
@@ -172,6 +206,13 @@ SLIPS_NUMERIC_COLUMNS: Dict[int, str] = {
     5: 'limitNational',            # F: Limit national (extra, will add to notes)
 }
 
+SLIPS_TEXT_ITEMS = tuple(SLIPS_TEXT_COLUMNS.items())
+SLIPS_DATE_ITEMS = tuple(SLIPS_DATE_COLUMNS.items())
+SLIPS_NUMERIC_ITEMS = tuple(SLIPS_NUMERIC_COLUMNS.items())
+SLIPS_LIMIT_NATIONAL_COLUMN = next(
+    col_idx for col_idx, field_name in SLIPS_NUMERIC_ITEMS if field_name == 'limitNational'
+)
+
 # ==============================================================================
 # Sheet 4: Inward → inward_reinsurance (snake_case) - SKIP by default
 # ==============================================================================
@@ -204,65 +245,109 @@ INWARD_NUMERIC_COLUMNS: Dict[int, str] = {
     48: 'net_premium',
 }
 
+INWARD_TEXT_ITEMS = tuple(INWARD_TEXT_COLUMNS.items())
+INWARD_DATE_ITEMS = tuple(INWARD_DATE_COLUMNS.items())
+INWARD_NUMERIC_ITEMS = tuple(INWARD_NUMERIC_COLUMNS.items())
+
 INWARD_STRUCTURE_COLUMN = 31
 INWARD_NOTES_COLUMNS = [2, 3, 6, 8, 9, 10, 13, 17, 18, 20, 21]
 
+# Fallbacks for rows without dates; fixed for the whole run
+_RUN_STARTED = datetime.now()
+INWARD_DEFAULT_UW_YEAR = _RUN_STARTED.year
+INWARD_DEFAULT_INCEPTION = _RUN_STARTED.strftime("%Y-%m-%d")
+INWARD_DEFAULT_EXPIRY = (_RUN_STARTED + timedelta(days=365)).strftime("%Y-%m-%d")
+
+# Widest column any sheet parser reads, plus one; rows are padded to this
+ROW_WIDTH = max(
+    *CONTRACTS_TEXT_COLUMNS, *CONTRACTS_DATE_COLUMNS, *CONTRACTS_NUMERIC_COLUMNS,
+    *OUTWARD_TEXT_COLUMNS, *OUTWARD_DATE_COLUMNS, *OUTWARD_NUMERIC_COLUMNS,
+    *SLIPS_TEXT_COLUMNS, *SLIPS_DATE_COLUMNS, *SLIPS_NUMERIC_COLUMNS,
+    *INWARD_TEXT_COLUMNS, *INWARD_DATE_COLUMNS, *INWARD_NUMERIC_COLUMNS,
+    INWARD_STRUCTURE_COLUMN, *INWARD_NOTES_COLUMNS,
+) + 1
+
 
 # ==============================================================================
 # Helper Functions
 # ==============================================================================
 
-def decrypt_xlsb(file_path: str, password: str = "") -> str:
-    """Decrypt an encrypted .xlsb file using msoffcrypto-tool."""
-    decrypted_path = tempfile.mktemp(suffix=".xlsb")
+def find_sheet_by_pattern(
+    wb,
+    patterns: List[str],
+    sheet_names_lower: Optional[List[Tuple[str, str]]] = None
+) -> Tuple[Any, str, bool]:
+    """Find sheet matching any of the given patterns.
+
+    ``sheet_names_lower`` is the workbook's [(name, name.lower()), ...],
+    built once by the caller; it is derived from ``wb.sheets`` if omitted.
+    """
+    if sheet_names_lower is None:
+        sheet_names_lower = [(name, name.lower()) for name in wb.sheets]
+
+    for position, (name, name_lower) in enumerate(sheet_names_lower, start=1):
+        if any(pattern in name_lower for pattern in patterns):
+            print(f"  Found sheet: {name}")
+            # pyxlsb sheet indexes are 1-based; avoids its name lookup
+            return wb.get_sheet(position), name, True
 
-    with open(file_path, "rb") as f:
-        file = msoffcrypto.OfficeFile(f)
+    return None, "", False
 
-        if not file.is_encrypted():
-            print(f"  File is not encrypted, using directly")
-            return file_path
 
-        file.load_key(password=password)
+def find_header_row(rows: List[List[Any]], max_rows: int = HEADER_SCAN_ROWS) -> int:
+    """Auto-detect header row by searching for common headers.
 
-        with open(decrypted_path, "wb") as out:
-            file.decrypt(out)
+    Only the first ``max_rows`` rows are inspected, so a streaming caller can
+    pass just that leading slice.
+    """
+    search = _HEADER_RE.search
 
-    print(f"  Decrypted to: {decrypted_path}")
-    return decrypted_path
+    for row_idx, row in enumerate(rows):
+        if row_idx >= max_rows:
+            break
+        for value in row:
+            if value and search(str(value)):
+                print(f"  Found header row at index {row_idx}")
+                return row_idx
 
+    print("  Header row not found, assuming row 0")
+    return 0
 
-def find_sheet_by_pattern(wb, patterns: List[str]) -> Tuple[Any, str, bool]:
-    """Find sheet matching any of the given patterns."""
-    sheet_names = wb.sheets
 
-    for name in sheet_names:
-        name_lower = name.lower()
-        for pattern in patterns:
-            if pattern in name_lower:
-                print(f"  Found sheet: {name}")
-                return wb.get_sheet(name), name, True
+@lru_cache(maxsize=4096)
+def excel_serial_to_iso(days: int) -> Optional[str]:
+    """Convert an Excel serial day number (days since 1899-12-30) to ISO."""
+    try:
+        excel_epoch = datetime(1899, 12, 30)
+        result = excel_epoch + timedelta(days=days)
+        return result.strftime("%Y-%m-%d")
+    except (ValueError, OverflowError):
+        return None
 
-    return None, "", False
 
+@lru_cache(maxsize=4096)
+def parse_date_string(value: str) -> Optional[str]:
+    """Parse a stripped, non-empty date string to ISO, or None.
 
-def find_header_row(rows: List, max_rows: int = 15) -> int:
-    """Auto-detect header row by searching for common headers."""
-    keywords = ["insured", "policy", "договор", "застрахован", "slip", "contract", "premium"]
+    Cached per value: the same dates repeat across many rows, and caching the
+    result (rather than trying the last winning format first) keeps the
+    format precedence for ambiguous values like 05/06/2024.
+    """
+    formats = [
+        "%d.%m.%Y",
+        "%Y-%m-%d",
+        "%m/%d/%Y",
+        "%d/%m/%Y",
+        "%Y/%m/%d",
+    ]
 
-    for row_idx, row in enumerate(rows):
-        if row_idx >= max_rows:
-            break
-        for cell in row:
-            if cell.v:
-                cell_str = str(cell.v).lower()
-                for keyword in keywords:
-                    if keyword in cell_str:
-                        print(f"  Found header row at index {row_idx}")
-                        return row_idx
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
 
-    print("  Header row not found, assuming row 0")
-    return 0
+    return None
 
 
 def parse_date(value: Any) -> Optional[str]:
@@ -276,9 +361,7 @@ def parse_date(value: Any) -> Optional[str]:
     # Excel serial number (days since 1899-12-30)
     if isinstance(value, (int, float)):
         try:
-            excel_epoch = datetime(1899, 12, 30)
-            result = excel_epoch + timedelta(days=int(value))
-            return result.strftime("%Y-%m-%d")
+            return excel_serial_to_iso(int(value))
         except (ValueError, OverflowError):
             return None
 
@@ -287,23 +370,35 @@ def parse_date(value: Any) -> Optional[str]:
         if not value:
             return None
 
-        formats = [
-            "%d.%m.%Y",
-            "%Y-%m-%d",
-            "%m/%d/%Y",
-            "%d/%m/%Y",
-            "%Y/%m/%d",
-        ]
+        return parse_date_string(value)
+
+    return None
+
+
+@lru_cache(maxsize=1024)
+def parse_number_string(value: str) -> Optional[float]:
+    """Parse a numeric string such as "1,234.50", "15%" or "-" (cached per value)."""
+    import math
 
-        for fmt in formats:
-            try:
-                return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
-            except ValueError:
-                continue
+    cleaned = value.strip()
+    cleaned = cleaned.replace(",", "")
+    cleaned = cleaned.replace(" ", "")
+    cleaned = cleaned.replace("\u00a0", "")
+    cleaned = cleaned.replace("$", "")
+    cleaned = cleaned.replace("€", "")
+    cleaned = cleaned.replace("%", "")
 
+    if not cleaned or cleaned == "-":
         return None
 
-    return None
+    try:
+        result = float(cleaned)
+        # Check if the converted value is infinity or NaN
+        if math.isinf(result) or math.isnan(result):
+            return None
+        return result
+    except ValueError:
+        return None
 
 
 def parse_number(value: Any) -> Optional[float]:
@@ -320,37 +415,39 @@ def parse_number(value: Any) -> Optional[float]:
         return float(value)
 
     if isinstance(value, str):
-        cleaned = value.strip()
-        cleaned = cleaned.replace(",", "")
-        cleaned = cleaned.replace(" ", "")
-        cleaned = cleaned.replace("\u00a0", "")
-        cleaned = cleaned.replace("$", "")
-        cleaned = cleaned.replace("€", "")
-        cleaned = cleaned.replace("%", "")
-
-        if not cleaned or cleaned == "-":
-            return None
-
-        try:
-            result = float(cleaned)
-            # Check if the converted value is infinity or NaN
-            if math.isinf(result) or math.isnan(result):
-                return None
-            return result
-        except ValueError:
-            return None
+        return parse_number_string(value)
 
     return None
 
 
-def get_cell_value(row: List, col_idx: int) -> Any:
-    """Safely get cell value from row."""
-    if col_idx < len(row):
-        cell = row[col_idx]
-        return cell.v if hasattr(cell, 'v') else cell
-    return None
+def _clean_text(value: Any) -> Optional[str]:
+    """Strip a text cell; empty or falsy cells become None.
+
+    pyxlsb already returns text cells as str, so str() is only called for
+    numbers and other cell types.
+    """
+    if not value:
+        return None
+    if type(value) is str:
+        return value.strip()
+    return str(value).strip()
+
+
+def sheet_values(sheet) -> Iterator[List[Any]]:
+    """Stream a pyxlsb sheet as rows of plain cell values.
 
+    Cells are unwrapped once here so the row parsers work on plain values
+    instead of doing an attribute lookup per column. Rows are padded with
+    None to ROW_WIDTH so the parsers can index any mapped column directly.
+    """
+    for row in sheet.rows():
+        values = [cell.v for cell in row]
+        if len(values) < ROW_WIDTH:
+            values.extend([None] * (ROW_WIDTH - len(values)))
+        yield values
 
+
+@lru_cache(maxsize=64)
 def parse_structure(value: Any) -> str:
     """Parse structure column: '%' -> PROPORTIONAL, 'XL' -> NON_PROPORTIONAL."""
     if value is None:
@@ -363,6 +460,7 @@ def parse_structure(value: Any) -> str:
     return "PROPORTIONAL"
 
 
+@lru_cache(maxsize=256)
 def determine_origin(territory: Optional[str], currency: Optional[str]) -> str:
     """Determine origin based on territory/country and currency."""
     if territory:
@@ -377,192 +475,153 @@ def determine_origin(territory: Optional[str], currency: Optional[str]) -> str:
     return "FOREIGN"
 
 
+def _int_or_none(value: Optional[float]) -> Optional[int]:
+    """Truncate a parsed number to int for INTEGER columns."""
+    return int(value) if value is not None else None
+
+
+def _build_column_reader(
+    name: str,
+    text_items: Tuple[Tuple[int, str], ...],
+    date_items: Tuple[Tuple[int, str], ...],
+    numeric_items: Tuple[Tuple[int, str], ...],
+    integer_fields: Tuple[str, ...] = (),
+):
+    """Generate a straight-line function mapping a padded row to a record dict.
+
+    The column mappings are fixed at import time, so instead of looping over
+    them per row the reader is compiled once as a single dict literal, e.g.
+    ``{'insuredName': _clean_text(row[1]), ...}``. Key order follows the
+    text, date, numeric mappings, as the hand-written loops did.
+    """
+    lines = [f"def _read_{name}_columns(row):", "    return {"]
+    for col_idx, field_name in text_items:
+        lines.append(f"        {field_name!r}: _clean_text(row[{col_idx}]),")
+    for col_idx, field_name in date_items:
+        lines.append(f"        {field_name!r}: parse_date(row[{col_idx}]),")
+    for col_idx, field_name in numeric_items:
+        if field_name in integer_fields:
+            lines.append(f"        {field_name!r}: _int_or_none(parse_number(row[{col_idx}])),")
+        else:
+            lines.append(f"        {field_name!r}: parse_number(row[{col_idx}]),")
+    lines.append("    }")
+
+    namespace: Dict[str, Any] = {}
+    code = compile("\n".join(lines), f"<{name} column reader>", "exec")
+    exec(code, globals(), namespace)
+    return namespace[f"_read_{name}_columns"]
+
+
 # ==============================================================================
 # Sheet Parsers
 # ==============================================================================
 
-def parse_contracts_row(row: List, row_number: int) -> Optional[Dict[str, Any]]:
-    """Parse Insurance Contracts row into policies record."""
-    record: Dict[str, Any] = {}
-
-    # Text columns
-    for col_idx, field_name in CONTRACTS_TEXT_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        record[field_name] = str(value).strip() if value else None
-
-    # Date columns
-    for col_idx, field_name in CONTRACTS_DATE_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        record[field_name] = parse_date(value)
-
-    # Numeric columns
-    for col_idx, field_name in CONTRACTS_NUMERIC_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        parsed = parse_number(value)
-        # Convert insuranceDays to integer (database expects INTEGER)
-        if field_name == 'insuranceDays' and parsed is not None:
-            parsed = int(parsed)
-        record[field_name] = parsed
-
-    # Skip rows where insuredName (Col 1) is empty
-    if not record.get('insuredName'):
+@dataclass
+class ParserSchema:
+    """How one sheet's padded rows map to database records.
+
+    parse_row applies the steps in order: read the mapped columns, run
+    ``extra_columns(row, record)``, skip the row unless one of
+    ``required_any`` is set, add ``constants``, run ``derive(record,
+    row_number)``, then fill ``fallbacks`` for empty fields and
+    ``null_defaults`` for fields that are None.
+    """
+    name: str
+    text_items: Tuple[Tuple[int, str], ...]
+    date_items: Tuple[Tuple[int, str], ...]
+    numeric_items: Tuple[Tuple[int, str], ...]
+    required_any: Tuple[str, ...]
+    integer_fields: Tuple[str, ...] = ()
+    constants: Dict[str, Any] = field(default_factory=dict)
+    fallbacks: Dict[str, Any] = field(default_factory=dict)
+    null_defaults: Dict[str, Any] = field(default_factory=dict)
+    extra_columns: Optional[Callable[[List[Any], Dict[str, Any]], None]] = None
+    derive: Optional[Callable[[Dict[str, Any], int], None]] = None
+    read_columns: Callable[[List[Any]], Dict[str, Any]] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.read_columns = _build_column_reader(
+            self.name, self.text_items, self.date_items, self.numeric_items, self.integer_fields
+        )
+
+
+def parse_row(row: List[Any], row_number: int, schema: ParserSchema) -> Optional[Dict[str, Any]]:
+    """Parse one padded sheet row into a record, or None for an empty row."""
+    # Text, date and numeric columns
+    record = schema.read_columns(row)
+
+    if schema.extra_columns is not None:
+        schema.extra_columns(row, record)
+
+    # Skip empty rows
+    if not any(record.get(field_name) for field_name in schema.required_any):
         return None
 
-    # Derive intermediaryType from brokerName
-    broker_name = record.get('brokerName', '')
-    if broker_name and broker_name.lower() == 'direct':
-        record['intermediaryType'] = 'Direct'
-        record['intermediaryName'] = None
-    else:
-        record['intermediaryType'] = 'Broker'
-        record['intermediaryName'] = broker_name if broker_name else None
+    record.update(schema.constants)
 
-    # Set defaults (use Title Case to match frontend expectations)
-    record['channel'] = 'Direct'
-    record['recordType'] = 'Direct'  # Changed from 'INSURANCE'
-    record['status'] = 'Active'
-    record['isDeleted'] = False
-    record['hasOutwardReinsurance'] = False
+    if schema.derive is not None:
+        schema.derive(record, row_number)
 
-    # Default ourShare to 100 if not set
-    if record.get('ourShare') is None:
-        record['ourShare'] = 100
+    for field_name, default in schema.fallbacks.items():
+        if not record.get(field_name):
+            record[field_name] = default
 
-    if not record.get('currency'):
-        record['currency'] = 'USD'
+    for field_name, default in schema.null_defaults.items():
+        if record.get(field_name) is None:
+            record[field_name] = default
 
     return record
 
 
-def parse_outward_row(row: List, row_number: int) -> Optional[Dict[str, Any]]:
-    """Parse Outward row into policies record (as outward reinsurance)."""
-    record: Dict[str, Any] = {}
-
-    # Text columns
-    for col_idx, field_name in OUTWARD_TEXT_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        record[field_name] = str(value).strip() if value else None
-
-    # Date columns
-    for col_idx, field_name in OUTWARD_DATE_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        record[field_name] = parse_date(value)
-
-    # Numeric columns
-    for col_idx, field_name in OUTWARD_NUMERIC_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        parsed = parse_number(value)
-        # Convert days fields to integer (database expects INTEGER)
-        if field_name in ('reinsuranceDays', 'insuranceDays') and parsed is not None:
-            parsed = int(parsed)
-        record[field_name] = parsed
-
-    # Skip empty rows
-    if not record.get('policyNumber') and not record.get('insuredName') and not record.get('slipNumber'):
-        return None
-
-    # Set defaults (use Title Case to match frontend expectations)
-    record['channel'] = 'Reinsurance'
-    record['recordType'] = 'OUTWARD'
-    record['status'] = 'Active'
-    record['hasOutwardReinsurance'] = True
+def _derive_contracts(record: Dict[str, Any], row_number: int) -> None:
+    """Derive intermediaryType/intermediaryName from brokerName."""
+    broker_name = record.get('brokerName', '')
+    if broker_name and broker_name.lower() == 'direct':
+        record['intermediaryType'] = 'Direct'
+        record['intermediaryName'] = None
+    else:
+        record['intermediaryType'] = 'Broker'
+        record['intermediaryName'] = broker_name if broker_name else None
 
-    if not record.get('currency'):
-        record['currency'] = 'USD'
 
-    # Build reinsurers JSONB if we have reinsurer info
+def _derive_outward(record: Dict[str, Any], row_number: int) -> None:
+    """Build reinsurers JSONB if we have reinsurer info."""
     if record.get('reinsurerName'):
         reinsurer_entry = {
             'name': record['reinsurerName'],
             'share': record.get('cededShare'),
             'premium': record.get('cededPremiumForeign'),
         }
-        record['reinsurers'] = json.dumps([reinsurer_entry])
-
-    return record
-
-
-def parse_slips_row(row: List, row_number: int) -> Optional[Dict[str, Any]]:
-    """Parse Slips row into slips record."""
-    record: Dict[str, Any] = {}
-
-    # Text columns
-    for col_idx, field_name in SLIPS_TEXT_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        record[field_name] = str(value).strip() if value else None
-
-    # Date columns
-    for col_idx, field_name in SLIPS_DATE_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        record[field_name] = parse_date(value)
-
-    # Numeric columns
-    for col_idx, field_name in SLIPS_NUMERIC_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        parsed = parse_number(value)
-        if field_name == 'limitNational':
-            # Add to notes instead of a separate field
-            if parsed:
-                record['notes'] = f"Limit (national): {parsed}"
-        else:
-            record[field_name] = parsed
-
-    # Skip empty rows
-    if not record.get('slipNumber'):
-        return None
-
-    # Set defaults
-    record['isDeleted'] = False
-    record['reinsurers'] = json.dumps([])
-
-    if not record.get('currency'):
-        record['currency'] = 'USD'
-
-    # Remove non-existent field
-    record.pop('limitNational', None)
-
-    return record
+        record['reinsurers'] = [reinsurer_entry]
 
 
-def parse_inward_row(row: List, row_number: int) -> Optional[Dict[str, Any]]:
-    """Parse Inward row into inward_reinsurance record."""
-    record: Dict[str, Any] = {}
+def _slips_extra_columns(row: List[Any], record: Dict[str, Any]) -> None:
+    """Add national limit to notes instead of a separate field."""
+    limit_national = parse_number(row[SLIPS_LIMIT_NATIONAL_COLUMN])
+    if limit_national:
+        record['notes'] = f"Limit (national): {limit_national}"
 
-    # Text columns
-    for col_idx, field_name in INWARD_TEXT_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        record[field_name] = str(value).strip() if value else None
 
-    # Date columns
-    for col_idx, field_name in INWARD_DATE_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        record[field_name] = parse_date(value)
+def _derive_slips(record: Dict[str, Any], row_number: int) -> None:
+    """Start every slip with an empty reinsurers list (a fresh list per row)."""
+    record['reinsurers'] = []
 
-    # Numeric columns
-    for col_idx, field_name in INWARD_NUMERIC_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        record[field_name] = parse_number(value)
 
-    # Structure
-    structure_value = get_cell_value(row, INWARD_STRUCTURE_COLUMN)
-    record['structure'] = parse_structure(structure_value)
+def _inward_extra_columns(row: List[Any], record: Dict[str, Any]) -> None:
+    """Structure column, and notes joined from multiple columns."""
+    record['structure'] = parse_structure(row[INWARD_STRUCTURE_COLUMN])
 
-    # Notes from multiple columns
     notes_parts = []
     for col_idx in INWARD_NOTES_COLUMNS:
-        value = get_cell_value(row, col_idx)
+        value = row[col_idx]
         if value:
             notes_parts.append(str(value).strip())
     record['notes'] = " | ".join(notes_parts) if notes_parts else None
 
-    # Skip empty rows
-    if not record.get('cedant_name') and not record.get('contract_number') and not record.get('original_insured_name'):
-        return None
 
-    # Derived fields
+def _derive_inward(record: Dict[str, Any], row_number: int) -> None:
+    """Origin, cedant country, UW year and contract number fallback."""
     record['origin'] = determine_origin(record.get('territory'), record.get('currency'))
-    record['type'] = 'FAC'
-    record['status'] = 'ACTIVE'
     record['cedant_country'] = record.get('territory')
 
     # UW year from inception
@@ -570,108 +629,319 @@ def parse_inward_row(row: List, row_number: int) -> Optional[Dict[str, Any]]:
         try:
             record['uw_year'] = int(record['inception_date'][:4])
         except (ValueError, TypeError):
-            record['uw_year'] = datetime.now().year
+            record['uw_year'] = INWARD_DEFAULT_UW_YEAR
     else:
-        record['uw_year'] = datetime.now().year
+        record['uw_year'] = INWARD_DEFAULT_UW_YEAR
 
-    # Required field fallbacks
     if not record.get('contract_number'):
         record['contract_number'] = f"IMPORT-{row_number}"
 
-    if not record.get('cedant_name'):
-        record['cedant_name'] = "Unknown Cedant"
 
-    if not record.get('type_of_cover'):
-        record['type_of_cover'] = "Property"
+# Defaults use Title Case to match frontend expectations
+CONTRACTS_SCHEMA = ParserSchema(
+    name="contracts",
+    text_items=CONTRACTS_TEXT_ITEMS,
+    date_items=CONTRACTS_DATE_ITEMS,
+    numeric_items=CONTRACTS_NUMERIC_ITEMS,
+    required_any=('insuredName',),
+    integer_fields=('insuranceDays',),  # database expects INTEGER
+    constants={
+        'channel': 'Direct',
+        'recordType': 'Direct',  # Changed from 'INSURANCE'
+        'status': 'Active',
+        'isDeleted': False,
+        'hasOutwardReinsurance': False,
+    },
+    fallbacks={'currency': 'USD'},
+    null_defaults={'ourShare': 100},
+    derive=_derive_contracts,
+)
+
+OUTWARD_SCHEMA = ParserSchema(
+    name="outward",
+    text_items=OUTWARD_TEXT_ITEMS,
+    date_items=OUTWARD_DATE_ITEMS,
+    numeric_items=OUTWARD_NUMERIC_ITEMS,
+    required_any=('policyNumber', 'insuredName', 'slipNumber'),
+    integer_fields=('reinsuranceDays', 'insuranceDays'),  # database expects INTEGER
+    constants={
+        'channel': 'Reinsurance',
+        'recordType': 'OUTWARD',
+        'status': 'Active',
+        'hasOutwardReinsurance': True,
+    },
+    fallbacks={'currency': 'USD'},
+    derive=_derive_outward,
+)
+
+SLIPS_SCHEMA = ParserSchema(
+    name="slips",
+    text_items=SLIPS_TEXT_ITEMS,
+    date_items=SLIPS_DATE_ITEMS,
+    # limitNational goes into notes rather than its own field
+    numeric_items=tuple(item for item in SLIPS_NUMERIC_ITEMS if item[1] != 'limitNational'),
+    required_any=('slipNumber',),
+    constants={'isDeleted': False},
+    fallbacks={'currency': 'USD'},
+    extra_columns=_slips_extra_columns,
+    derive=_derive_slips,
+)
+
+INWARD_SCHEMA = ParserSchema(
+    name="inward",
+    text_items=INWARD_TEXT_ITEMS,
+    date_items=INWARD_DATE_ITEMS,
+    numeric_items=INWARD_NUMERIC_ITEMS,
+    required_any=('cedant_name', 'contract_number', 'original_insured_name'),
+    constants={'type': 'FAC', 'status': 'ACTIVE'},
+    fallbacks={
+        'cedant_name': "Unknown Cedant",
+        'type_of_cover': "Property",
+        'class_of_cover': "All Risks",
+        'inception_date': INWARD_DEFAULT_INCEPTION,
+        'expiry_date': INWARD_DEFAULT_EXPIRY,
+        'currency': 'USD',
+    },
+    null_defaults={'limit_of_liability': 0, 'gross_premium': 0, 'our_share': 100},
+    extra_columns=_inward_extra_columns,
+    derive=_derive_inward,
+)
+
 
-    if not record.get('class_of_cover'):
-        record['class_of_cover'] = "All Risks"
+# ==============================================================================
+# Import Functions
+# ==============================================================================
 
-    today = datetime.now().strftime("%Y-%m-%d")
-    next_year = (datetime.now() + timedelta(days=365)).strftime("%Y-%m-%d")
+def create_http_client() -> httpx.Client:
+    """Shared keep-alive HTTP client for every PostgREST request.
 
-    if not record.get('inception_date'):
-        record['inception_date'] = today
+    Uses HTTP/2 when the ``h2`` package is installed, otherwise HTTP/1.1
+    with a keep-alive pool large enough for all concurrent inserts.
+    """
+    limits = httpx.Limits(max_keepalive_connections=max(32, INSERT_CONCURRENCY))
+    try:
+        return httpx.Client(timeout=60.0, http2=True, limits=limits)
+    except ImportError:
+        return httpx.Client(timeout=60.0, limits=limits)
 
-    if not record.get('expiry_date'):
-        record['expiry_date'] = next_year
 
-    if not record.get('currency'):
-        record['currency'] = 'USD'
+def _insert_with_bisect(
+    supabase: Client,
+    table_name: str,
+    batch: List[Dict[str, Any]],
+    depth: int = 0
+) -> Tuple[int, List[Tuple[Dict[str, Any], str]]]:
+    """Insert a batch, splitting it in half on failure to isolate bad rows.
 
-    if record.get('limit_of_liability') is None:
-        record['limit_of_liability'] = 0
-    if record.get('gross_premium') is None:
-        record['gross_premium'] = 0
-    if record.get('our_share') is None:
-        record['our_share'] = 100
+    Inserts ask for ``return=minimal``, so PostgREST doesn't echo the rows back.
 
-    return record
+    A few bad rows cost O(k log n) extra requests instead of one request per
+    row. Past MAX_BISECT_DEPTH the remaining rows are inserted one by one.
+    Returns (inserted_count, [(record, error), ...]).
+    """
+    try:
+        supabase.table(table_name).insert(batch, returning=ReturnMethod.minimal).execute()
+        return len(batch), []
+    except Exception as e:
+        if len(batch) == 1:
+            return 0, [(batch[0], str(e))]
 
+    if depth >= MAX_BISECT_DEPTH:
+        inserted_count = 0
+        failed: List[Tuple[Dict[str, Any], str]] = []
+        for record in batch:
+            count, record_failed = _insert_with_bisect(supabase, table_name, [record], depth)
+            inserted_count += count
+            failed.extend(record_failed)
+        return inserted_count, failed
+
+    mid = len(batch) // 2
+    left_inserted, left_failed = _insert_with_bisect(supabase, table_name, batch[:mid], depth + 1)
+    right_inserted, right_failed = _insert_with_bisect(supabase, table_name, batch[mid:], depth + 1)
+    return left_inserted + right_inserted, left_failed + right_failed
+
+
+def insert_batch(
+    supabase: Client,
+    table_name: str,
+    batch: List[Dict[str, Any]]
+) -> Tuple[int, int, List[str]]:
+    """Insert one batch, bisecting it to isolate bad rows if it fails.
+
+    Runs on a worker thread, so log lines are returned rather than printed.
+    Returns (inserted_count, error_count, messages).
+    """
+    try:
+        supabase.table(table_name).insert(batch, returning=ReturnMethod.minimal).execute()
+        return len(batch), 0, [f"OK ({len(batch)} records)"]
+    except Exception as e:
+        messages = ["FAILED", f"      Error: {e}"]
+        batch_error = str(e)
+
+    if len(batch) == 1:
+        inserted_count, failed = 0, [(batch[0], batch_error)]
+    else:
+        messages.append("      Splitting batch to isolate failing rows...")
+        mid = len(batch) // 2
+        left_inserted, left_failed = _insert_with_bisect(supabase, table_name, batch[:mid], 1)
+        right_inserted, right_failed = _insert_with_bisect(supabase, table_name, batch[mid:], 1)
+        inserted_count, failed = left_inserted + right_inserted, left_failed + right_failed
+
+    for record, error in failed:
+        identifier = record.get('policyNumber') or record.get('slipNumber') or record.get('contract_number') or 'unknown'
+        messages.append(f"        Failed: {identifier} - {error[:100]}")
+
+    return inserted_count, len(failed), messages
+
+
+def copy_records(table_name: str, batches: Iterable[List[Dict[str, Any]]]) -> int:
+    """Load record batches with COPY FROM STDIN in a single transaction.
+
+    Each batch is copied with the union of its records' keys as the column
+    list (missing keys load as NULL, as with a PostgREST bulk insert).
+    JSON values such as ``reinsurers`` are serialized for the JSONB column.
+    Any failure rolls back the whole sheet. Returns the number of rows copied.
+    """
+    try:
+        import psycopg
+    except ImportError as e:
+        raise RuntimeError("DATABASE_URL is set but psycopg is missing: pip install 'psycopg[binary]'") from e
+
+    copied = 0
+
+    # The connection block commits on success and rolls back on any error
+    with psycopg.connect(DATABASE_URL) as conn:
+        with conn.cursor() as cur:
+            for batch_num, batch in enumerate(batches, start=1):
+                columns = list(dict.fromkeys(key for record in batch for key in record))
+                column_list = ", ".join(f'"{column}"' for column in columns)
+
+                with cur.copy(f'COPY "{table_name}" ({column_list}) FROM STDIN') as copy:
+                    for record in batch:
+                        copy.write_row([
+                            json.dumps(value) if isinstance(value, (list, dict)) else value
+                            for value in (record.get(column) for column in columns)
+                        ])
+
+                copied += len(batch)
+                print(f"    Batch {batch_num}: copied {copied} rows")
+
+    return copied
 
-# ==============================================================================
-# Import Functions
-# ==============================================================================
 
 def import_sheet(
     supabase: Client,
     table_name: str,
-    records: List[Dict[str, Any]],
+    batches: Iterable[List[Dict[str, Any]]],
     dry_run: bool = True,
     sheet_name: str = ""
 ) -> Tuple[int, int]:
-    """Import records to a table with batch processing."""
+    """Import record batches to a table as they are produced.
+
+    ``batches`` is consumed lazily, so parsing the next batch overlaps with
+    the inserts already in flight. Returns (inserted_count, error_count).
+    """
     if dry_run:
-        preview_file = f"preview_{sheet_name.replace(' ', '_').lower()}.json"
-        preview_data = records[:PREVIEW_ROWS]
-        with open(preview_file, "w", encoding="utf-8") as f:
-            json.dump(preview_data, f, indent=2, ensure_ascii=False, default=str)
-        print(f"  Preview saved: {preview_file} ({len(preview_data)} records)")
-        return len(records), 0
+        preview_data: List[Dict[str, Any]] = []
+        total = 0
+        for batch in batches:
+            total += len(batch)
+            if len(preview_data) < PREVIEW_ROWS:
+                preview_data.extend(batch[:PREVIEW_ROWS - len(preview_data)])
+
+        if total:
+            preview_file = f"preview_{sheet_name.replace(' ', '_').lower()}.json"
+            write_preview_json(preview_file, preview_data)
+            print(f"  Preview saved: {preview_file} ({len(preview_data)} records)")
+        return total, 0
 
     inserted_count = 0
     error_count = 0
+    total = 0
+    started = time.perf_counter()
+
+    # (batch_num, first_row, last_row, future) for inserts not yet reported
+    in_flight: Deque[Tuple[int, int, int, Future]] = deque()
+
+    def report_oldest() -> None:
+        nonlocal inserted_count, error_count
+        batch_num, first_row, last_row, future = in_flight.popleft()
+        inserted, errors, messages = future.result()
+        inserted_count += inserted
+        error_count += errors
+
+        print(f"    Batch {batch_num}: rows {first_row} - {last_row}... {messages[0]}")
+        for message in messages[1:]:
+            print(message)
+
+    # Keep several insert requests in flight; results are reported in batch order
+    with ThreadPoolExecutor(max_workers=INSERT_CONCURRENCY) as executor:
+        for batch_num, batch in enumerate(batches, start=1):
+            future = executor.submit(insert_batch, supabase, table_name, batch)
+            in_flight.append((batch_num, total + 1, total + len(batch), future))
+            total += len(batch)
+
+            # Bound the number of parsed batches waiting on the network
+            if len(in_flight) >= INSERT_CONCURRENCY * 2:
+                report_oldest()
+
+        while in_flight:
+            report_oldest()
+
+    if total:
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed > 0 else 0
+        print(f"  Uploaded {total} records in {elapsed:.1f}s ({rate:.0f} rows/s)")
 
-    for batch_start in range(0, len(records), BATCH_SIZE):
-        batch_end = min(batch_start + BATCH_SIZE, len(records))
-        batch = records[batch_start:batch_end]
-        batch_num = (batch_start // BATCH_SIZE) + 1
+    return inserted_count, error_count
 
-        print(f"    Batch {batch_num}: rows {batch_start + 1} - {batch_end}...", end=" ")
 
-        try:
-            result = supabase.table(table_name).insert(batch).execute()
-            inserted_count += len(batch)
-            print(f"OK ({len(batch)} records)")
-        except Exception as e:
-            print(f"FAILED")
-            print(f"      Error: {e}")
+def write_preview_json(path: str, records: List[Dict[str, Any]]) -> None:
+    """Write preview records as indented UTF-8 JSON, using orjson when installed."""
+    if orjson is not None:
+        data = orjson.dumps(records, option=orjson.OPT_INDENT_2, default=str)
+    else:
+        data = json.dumps(records, indent=2, ensure_ascii=False, default=str).encode("utf-8")
 
-            # Retry row by row
-            print(f"      Retrying row-by-row...")
-            for record in batch:
-                try:
-                    supabase.table(table_name).insert(record).execute()
-                    inserted_count += 1
-                except Exception as row_error:
-                    error_count += 1
-                    identifier = record.get('policyNumber') or record.get('slipNumber') or record.get('contract_number') or 'unknown'
-                    print(f"        Failed: {identifier} - {str(row_error)[:100]}")
+    with open(path, "wb") as f:
+        f.write(data)
 
-    return inserted_count, error_count
+
+def print_record_preview(records: List[Dict[str, Any]]) -> None:
+    """Print the key fields of the first few parsed records."""
+    print(f"\n  Preview of first 3 records:")
+    for i, rec in enumerate(records[:3]):
+        print(f"    Record {i+1}:")
+        print(f"      policyNumber: {rec.get('policyNumber')}")
+        print(f"      insuredName: {rec.get('insuredName')}")
+        print(f"      brokerName: {rec.get('brokerName')}")
+        print(f"      territory: {rec.get('territory')}")
+        print(f"      currency: {rec.get('currency')}")
+        print(f"      sumInsured: {rec.get('sumInsured')}")
+        print(f"      grossPremium: {rec.get('grossPremium')}")
+        print(f"      inceptionDate: {rec.get('inceptionDate')}")
+        print(f"      expiryDate: {rec.get('expiryDate')}")
+    print()
 
 
 def process_sheet(
     wb,
     sheet_patterns: List[str],
-    parse_func,
+    schema: ParserSchema,
     table_name: str,
     supabase: Optional[Client],
     dry_run: bool,
-    header_rows: Optional[int] = None  # If specified, skip this many rows instead of auto-detecting
+    header_rows: Optional[int] = None,  # If specified, skip this many rows instead of auto-detecting
+    batch_size: int = BATCH_SIZE,
+    sheet_names_lower: Optional[List[Tuple[str, str]]] = None
 ) -> Tuple[int, int, int]:
-    """Process a single sheet and import to database."""
-    sheet, sheet_name, found = find_sheet_by_pattern(wb, sheet_patterns)
+    """Process a single sheet and import to database.
+
+    Rows are parsed as they stream out of the workbook and handed to
+    import_sheet in batch_size chunks, so uploads run while the rest of the
+    sheet is still being parsed.
+    """
+    sheet, sheet_name, found = find_sheet_by_pattern(wb, sheet_patterns, sheet_names_lower)
 
     if not found:
         print(f"  Sheet not found for patterns: {sheet_patterns}")
@@ -679,67 +949,148 @@ def process_sheet(
 
     print(f"\nProcessing sheet: {sheet_name}")
 
-    rows = list(sheet.rows())
+    parsed_count = 0
+    skipped_count = 0
 
-    # Use specified header rows or auto-detect
-    if header_rows is not None:
-        header_row_idx = header_rows - 1  # Convert to 0-indexed
-        print(f"  Using specified header rows: {header_rows} (data starts at row {header_rows + 1})")
+    def parsed_batches(sheet) -> Iterator[List[Dict[str, Any]]]:
+        nonlocal parsed_count, skipped_count
+        pending: List[Dict[str, Any]] = []
+        previewed = False
+
+        # Stream rows; only the header scan window is buffered
+        with sheet:
+            rows = sheet_values(sheet)
+
+            # Use specified header rows or auto-detect
+            if header_rows is not None:
+                header_row_idx = header_rows - 1  # Convert to 0-indexed
+                print(f"  Using specified header rows: {header_rows} (data starts at row {header_rows + 1})")
+                head: List[List[Any]] = []
+            else:
+                head = list(islice(rows, HEADER_SCAN_ROWS))
+                header_row_idx = find_header_row(head)
+
+            for row_idx, row in enumerate(chain(head, rows)):
+                if row_idx <= header_row_idx:
+                    continue
+
+                row_number = row_idx + 1
+                record = parse_row(row, row_number, schema)
+
+                if not record:
+                    skipped_count += 1
+                    continue
+
+                parsed_count += 1
+                pending.append(record)
+
+                if len(pending) >= batch_size:
+                    if not previewed:
+                        print_record_preview(pending)
+                        previewed = True
+                    yield pending
+                    pending = []
+
+        if pending:
+            if not previewed:
+                print_record_preview(pending)
+            yield pending
+
+    if not dry_run and DATABASE_URL:
+        print(f"  Loading with COPY (DATABASE_URL)...")
+        try:
+            inserted, errors = copy_records(table_name, parsed_batches(sheet)), 0
+        except Exception as e:
+            # Nothing was committed; re-read the sheet and go through PostgREST
+            print(f"  COPY failed, nothing loaded: {str(e)[:200]}")
+            print(f"  Falling back to PostgREST inserts...")
+            parsed_count = skipped_count = 0
+            inserted, errors = import_sheet(
+                supabase, table_name, parsed_batches(wb.get_sheet(sheet_name)), dry_run, sheet_name
+            )
     else:
-        header_row_idx = find_header_row(rows)
+        inserted, errors = import_sheet(
+            supabase, table_name, parsed_batches(sheet), dry_run, sheet_name
+        )
 
-    parsed_records: List[Dict[str, Any]] = []
-    skipped_count = 0
+    print(f"  Parsed: {parsed_count} records")
+    print(f"  Skipped (empty): {skipped_count} rows")
 
-    for row_idx, row in enumerate(rows):
-        if row_idx <= header_row_idx:
-            continue
+    return inserted if not dry_run else parsed_count, errors, skipped_count
 
-        row_number = row_idx + 1
-        record = parse_func(row, row_number)
 
-        if record:
-            parsed_records.append(record)
-        else:
-            skipped_count += 1
+# ==============================================================================
+# Main
+# ==============================================================================
 
-    print(f"  Parsed: {len(parsed_records)} records")
-    print(f"  Skipped (empty): {skipped_count} rows")
+# sheet type -> (sheet name patterns, parser schema, target table, header rows to skip)
+SHEET_JOBS: Dict[str, Tuple[List[str], ParserSchema, str, Optional[int]]] = {
+    # Insurance Contracts: skip 2 header rows (Row 0 = headers, Row 1 = sub-headers/totals)
+    "contracts": (CONTRACTS_SHEET_PATTERNS, CONTRACTS_SCHEMA, "policies", CONTRACTS_HEADER_ROWS),
+    # Outward: skip 2 header rows (Row 0 = headers, Row 1 = totals/sub-headers)
+    "outward": (OUTWARD_SHEET_PATTERNS, OUTWARD_SCHEMA, "policies", OUTWARD_HEADER_ROWS),
+    "slips": (SLIPS_SHEET_PATTERNS, SLIPS_SCHEMA, "slips", None),
+    "inward": (INWARD_SHEET_PATTERNS, INWARD_SCHEMA, "inward_reinsurance", None),
+}
 
-    if not parsed_records:
-        return 0, 0, skipped_count
 
-    # Preview first 3 records before import
-    print(f"\n  Preview of first 3 records:")
-    for i, rec in enumerate(parsed_records[:3]):
-        print(f"    Record {i+1}:")
-        print(f"      policyNumber: {rec.get('policyNumber')}")
-        print(f"      insuredName: {rec.get('insuredName')}")
-        print(f"      brokerName: {rec.get('brokerName')}")
-        print(f"      territory: {rec.get('territory')}")
-        print(f"      currency: {rec.get('currency')}")
-        print(f"      sumInsured: {rec.get('sumInsured')}")
-        print(f"      grossPremium: {rec.get('grossPremium')}")
-        print(f"      inceptionDate: {rec.get('inceptionDate')}")
-        print(f"      expiryDate: {rec.get('expiryDate')}")
-    print()
+def connect_supabase() -> Client:
+    """Create the Supabase client with a pooled keep-alive HTTP client."""
+    # One pooled HTTP client is reused by every batch and retry
+    return create_client(
+        SUPABASE_URL,
+        SUPABASE_SERVICE_KEY,
+        options=ClientOptions(httpx_client=create_http_client()),
+    )
+
 
-    inserted, errors = import_sheet(
-        supabase, table_name, parsed_records, dry_run, sheet_name
+def run_sheet(
+    wb,
+    sheet_type: str,
+    supabase: Optional[Client],
+    dry_run: bool,
+    batch_size: int,
+    sheet_names_lower: Optional[List[Tuple[str, str]]] = None
+) -> Tuple[int, int, int]:
+    """Process one sheet type from SHEET_JOBS. Returns (inserted, errors, skipped)."""
+    sheet_patterns, schema, table_name, header_rows = SHEET_JOBS[sheet_type]
+    return process_sheet(
+        wb, sheet_patterns, schema, table_name, supabase, dry_run,
+        header_rows=header_rows, batch_size=batch_size, sheet_names_lower=sheet_names_lower
     )
 
-    return inserted if not dry_run else len(parsed_records), errors, skipped_count
 
+# Decrypted workbook for sheet worker processes, set by _init_sheet_worker
+_worker_workbook_source: Union[str, bytes] = ""
+
+
+def _init_sheet_worker(workbook_source: Union[str, bytes]) -> None:
+    global _worker_workbook_source
+    _worker_workbook_source = workbook_source
+
+
+def _run_sheet_in_worker(sheet_type: str, dry_run: bool, batch_size: int) -> Tuple[str, int, int, int]:
+    """Process one sheet in a worker process.
+
+    pyxlsb workbooks and Supabase clients can't be pickled, so each worker
+    opens its own. Output is captured and returned so the parent can print
+    each sheet's log in one piece. Returns (log, inserted, errors, skipped).
+    """
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        source = _worker_workbook_source
+        wb = open_workbook(io.BytesIO(source) if isinstance(source, bytes) else source)
+        supabase = None if dry_run else connect_supabase()
+        inserted, errors, skipped = run_sheet(wb, sheet_type, supabase, dry_run, batch_size)
+    return log.getvalue(), inserted, errors, skipped
 
-# ==============================================================================
-# Main
-# ==============================================================================
 
 def main():
     parser = argparse.ArgumentParser(description="Import Excel sheets to staging database")
     parser.add_argument("--dry-run", action="store_true", help="Preview mode, no database changes")
     parser.add_argument("--sheet", choices=["contracts", "outward", "slips", "inward"], help="Import specific sheet only")
     parser.add_argument("--all", action="store_true", help="Import all sheets (except inward)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help=f"Rows per insert request (default: {BATCH_SIZE})")
     args = parser.parse_args()
 
     print("=" * 60)
@@ -768,12 +1119,16 @@ def main():
     print(f"  Supabase URL: {SUPABASE_URL[:50]}...")
     print(f"  Excel File: {EXCEL_FILE}")
     print(f"  Mode: {'DRY RUN (preview only)' if dry_run else 'IMPORT'}")
+    if not dry_run:
+        print(f"  Batch Size: {args.batch_size}")
+        if DATABASE_URL:
+            print(f"  Load Path: COPY via DATABASE_URL (PostgREST fallback)")
     print()
 
     # Decrypt Excel
     print("Step 1: Decrypting Excel file...")
     try:
-        decrypted_path = decrypt_xlsb(EXCEL_FILE, EXCEL_PASSWORD)
+        workbook_source = decrypt_xlsb(EXCEL_FILE, EXCEL_PASSWORD)
     except Exception as e:
         print(f"ERROR: Failed to decrypt file: {e}")
         sys.exit(1)
@@ -781,8 +1136,9 @@ def main():
     # Open workbook
     print("\nStep 2: Opening workbook...")
     try:
-        wb = open_workbook(decrypted_path)
-        print(f"  Available sheets: {wb.sheets}")
+        wb = open_workbook(workbook_source)
+        sheet_names_lower = [(name, name.lower()) for name in wb.sheets]
+        print(f"  Available sheets: {[name for name, _ in sheet_names_lower]}")
     except Exception as e:
         print(f"ERROR: Failed to open workbook: {e}")
         sys.exit(1)
@@ -792,7 +1148,7 @@ def main():
     if not dry_run:
         print("\nStep 3: Connecting to Supabase...")
         try:
-            supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+            supabase = connect_supabase()
         except Exception as e:
             print(f"ERROR: Failed to connect to Supabase: {e}")
             sys.exit(1)
@@ -815,33 +1171,39 @@ def main():
 
     print(f"\nStep {'4' if not dry_run else '3'}: Processing sheets...")
 
-    for sheet_type in sheets_to_process:
-        if sheet_type == "contracts":
-            # Insurance Contracts: skip 2 header rows (Row 0 = headers, Row 1 = sub-headers/totals)
-            inserted, errors, skipped = process_sheet(
-                wb, CONTRACTS_SHEET_PATTERNS, parse_contracts_row, "policies", supabase, dry_run,
-                header_rows=CONTRACTS_HEADER_ROWS
-            )
-        elif sheet_type == "outward":
-            # Outward: skip 2 header rows (Row 0 = headers, Row 1 = totals/sub-headers)
-            inserted, errors, skipped = process_sheet(
-                wb, OUTWARD_SHEET_PATTERNS, parse_outward_row, "policies", supabase, dry_run,
-                header_rows=OUTWARD_HEADER_ROWS
-            )
-        elif sheet_type == "slips":
-            inserted, errors, skipped = process_sheet(
-                wb, SLIPS_SHEET_PATTERNS, parse_slips_row, "slips", supabase, dry_run
-            )
-        elif sheet_type == "inward":
-            inserted, errors, skipped = process_sheet(
-                wb, INWARD_SHEET_PATTERNS, parse_inward_row, "inward_reinsurance", supabase, dry_run
+    workers = min(SHEET_WORKERS, len(sheets_to_process))
+    if workers > 1:
+        # Sheets share nothing but the read-only workbook, so each one is
+        # parsed and uploaded in its own process
+        print(f"  Running {len(sheets_to_process)} sheets in {workers} processes")
+        source = workbook_source.getvalue() if isinstance(workbook_source, io.BytesIO) else workbook_source
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_sheet_worker, initargs=(source,)
+        ) as executor:
+            futures = [
+                (sheet_type, executor.submit(_run_sheet_in_worker, sheet_type, dry_run, args.batch_size))
+                for sheet_type in sheets_to_process
+            ]
+            # Logs are printed in sheet order as each one completes
+            for sheet_type, future in futures:
+                try:
+                    log, inserted, errors, skipped = future.result()
+                except Exception as e:
+                    print(f"\nERROR: Sheet '{sheet_type}' failed: {e}")
+                    total_errors += 1
+                    continue
+                print(log, end="")
+                total_inserted += inserted
+                total_errors += errors
+                total_skipped += skipped
+    else:
+        for sheet_type in sheets_to_process:
+            inserted, errors, skipped = run_sheet(
+                wb, sheet_type, supabase, dry_run, args.batch_size, sheet_names_lower
             )
-        else:
-            continue
-
-        total_inserted += inserted
-        total_errors += errors
-        total_skipped += skipped
+            total_inserted += inserted
+            total_errors += errors
+            total_skipped += skipped
 
     # Summary
     print("\n" + "=" * 60)
@@ -855,10 +1217,6 @@ def main():
         print("\n  Mode: DRY RUN - No changes made to database")
         print("  Review preview files, then run with --sheet or --all to import")
 
-    # Cleanup
-    if decrypted_path != EXCEL_FILE and os.path.exists(decrypted_path):
-        os.remove(decrypted_path)
-
 
 if __name__ == "__main__":
     main()
@@ -17,13 +17,20 @@ Usage:
     python import_claims.py              # Real import
 """
 
+import io
 import os
+import re
 import sys
 import json
 import argparse
-import tempfile
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -39,6 +46,12 @@ except ImportError as e:
     print("Install with: pip install supabase xlrd msoffcrypto-tool python-dotenv")
     sys.exit(1)
 
+# Optional: faster JSON encoding for the preview file
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ==============================================================================
 # Configuration
 # ==============================================================================
@@ -47,9 +60,58 @@ SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
 EXCEL_FILE = os.getenv("CLAIMS_FILE", "INWARD_CLAIMS_PORTFOLIO.xls")
 EXCEL_PASSWORD = os.getenv("EXCEL_PASSWORD", "0110")
+# Optional direct Postgres connection; when set, claims are loaded with COPY
+DATABASE_URL = os.getenv("DATABASE_URL", "")
 
 BATCH_SIZE = 50
+INSERT_CONCURRENCY = int(os.getenv("INSERT_CONCURRENCY", "8"))  # insert requests in flight
+LOOKUP_PAGE_SIZE = 1000  # PostgREST returns at most max-rows (1000 by default) per request
 PREVIEW_ROWS = 20
+DATA_START_ROW = 2  # row 0 = headers, row 1 = sub-headers
+ROW_WIDTH = 47  # columns A..AU; shorter rows are padded with None
+
+# Fallback for claims/transactions without dates; fixed for the whole run
+TODAY_ISO = datetime.now().strftime("%Y-%m-%d")
+
+# Sheet columns used by parse_claim_row, fetched per group with one itemgetter
+# call. Not imported: G slip date (6), P/Q sum insured USD/national (15, 16),
+# AI reserve national (34), AL-AN our share of loss (37-39), AQ paid national (42)
+CLAIM_TEXT_COLUMNS = itemgetter(
+    3,   # D: Claim number
+    4,   # E: Broker / reinsurer
+    5,   # F: Slip number
+    7,   # H: Claimant
+    8,   # I: Reinsured
+    9,   # J: Insurance type
+    10,  # K: Risk description
+    11,  # L: Country
+    12,  # M: City
+    13,  # N: Contract number
+    14,  # O: Currency
+    46,  # AU: Description
+)
+CLAIM_DATE_COLUMNS = itemgetter(
+    1,   # B: Loss date
+    2,   # C: Report date
+    43,  # AR: Payment date
+)
+CLAIM_NUMERIC_COLUMNS = itemgetter(
+    25,  # Z: Our share (decimal)
+    33,  # AH: Reserve (foreign currency)
+    35,  # AJ: Total loss
+    40,  # AO: Paid (foreign currency)
+    41,  # AP: Exchange rate
+    44,  # AS: Outstanding
+)
+
+# Date strings in the formats parse_date accepts (ASCII digits, years 1000+),
+# checked before strptime
+_DMY_DOT_RE = re.compile(r"([0-9]{1,2})\.([0-9]{1,2})\.([1-9][0-9]{3})")
+_SLASH_DATE_RE = re.compile(r"([0-9]{1,2})/([0-9]{1,2})/([1-9][0-9]{3})")
+_YMD_RE = re.compile(r"([1-9][0-9]{3})([-/])([0-9]{1,2})\2([0-9]{1,2})")
+
+# Thousands separators, currency and percent signs stripped by parse_number
+_NUMBER_NOISE = str.maketrans("", "", ", \u00a0$€%")
 
 # Claim source type mappings
 SOURCE_TYPE_MAP = {
@@ -60,28 +122,113 @@ SOURCE_TYPE_MAP = {
     "local outward": "outward",
 }
 
+# ==============================================================================
+# Parsed Records
+# ==============================================================================
+
+@dataclass(slots=True)
+class Claim:
+    """One parsed claim row; converted to a dict only when it is sent."""
+    claim_number: str
+    source_type: str
+    slip_number: Optional[str]
+    contract_number: Optional[str]
+    liability_type: str
+    status: str
+    loss_date: Optional[str]
+    report_date: str
+    description: Optional[str]
+    claimant_name: Optional[str]
+    location_country: Optional[str]
+    imported_total_incurred: float
+    imported_total_paid: float
+    policy_id: Optional[str] = None
+    inward_reinsurance_id: Optional[str] = None
+
+    def to_record(self) -> Dict[str, Any]:
+        """Row for the claims table; parent references only when matched."""
+        record = {
+            "claim_number": self.claim_number,
+            "source_type": self.source_type,
+            "slip_number": self.slip_number,
+            "contract_number": self.contract_number,
+            "liability_type": self.liability_type,
+            "status": self.status,
+            "loss_date": self.loss_date,
+            "report_date": self.report_date,
+            "description": self.description,
+            "claimant_name": self.claimant_name,
+            "location_country": self.location_country,
+            "imported_total_incurred": self.imported_total_incurred,
+            "imported_total_paid": self.imported_total_paid,
+            "is_deleted": False,
+        }
+        if self.policy_id:
+            record["policy_id"] = self.policy_id
+        if self.inward_reinsurance_id:
+            record["inward_reinsurance_id"] = self.inward_reinsurance_id
+        return record
+
+
+@dataclass(slots=True)
+class ClaimTransaction:
+    """One parsed reserve or payment transaction of a claim."""
+    transaction_type: str
+    transaction_date: str
+    amount_100pct: float
+    currency: str
+    exchange_rate: float
+    our_share_percentage: float
+    notes: str
+
+    def to_record(self, claim_id: Optional[str] = None) -> Dict[str, Any]:
+        """Row for the claim_transactions table, linked to claim_id if given."""
+        record = {
+            "transaction_type": self.transaction_type,
+            "transaction_date": self.transaction_date,
+            "amount_100pct": self.amount_100pct,
+            "currency": self.currency,
+            "exchange_rate": self.exchange_rate,
+            "our_share_percentage": self.our_share_percentage,
+            "notes": self.notes,
+        }
+        if claim_id is not None:
+            record["claim_id"] = claim_id
+        return record
+
 # ==============================================================================
 # Helper Functions
 # ==============================================================================
 
-def decrypt_xls(file_path: str, password: str = "") -> str:
-    """Decrypt an encrypted .xls file using msoffcrypto-tool."""
-    decrypted_path = tempfile.mktemp(suffix=".xls")
+def decrypt_xls(file_path: str, password: str = "") -> bytes:
+    """Decrypt an encrypted .xls file into memory using msoffcrypto-tool.
 
+    Returns the workbook bytes for xlrd's file_contents (the file as-is if it
+    is not encrypted), so nothing is written to disk.
+    """
     with open(file_path, "rb") as f:
         file = msoffcrypto.OfficeFile(f)
 
         if not file.is_encrypted():
             print(f"  File is not encrypted, using directly")
-            return file_path
+            f.seek(0)
+            return f.read()
 
         file.load_key(password=password)
 
-        with open(decrypted_path, "wb") as out:
-            file.decrypt(out)
+        decrypted = io.BytesIO()
+        file.decrypt(decrypted)
+
+    print(f"  Decrypted in memory ({len(decrypted.getbuffer()) / 1_048_576:.1f} MB)")
+    return decrypted.getvalue()
 
-    print(f"  Decrypted to: {decrypted_path}")
-    return decrypted_path
+
+def _iso_date(year: str, month: str, day: str) -> Optional[str]:
+    """Build an ISO date string from matched parts, or None if not a real date."""
+    try:
+        return date(int(year), int(month), int(day)).isoformat()
+    except ValueError:
+        return None
 
 
 def parse_date(value: Any) -> Optional[str]:
@@ -110,6 +257,24 @@ def parse_date(value: Any) -> Optional[str]:
         if not value:
             return None
 
+        # Same precedence as the strptime formats below:
+        # DD.MM.YYYY, YYYY-MM-DD, MM/DD/YYYY, DD/MM/YYYY, YYYY/MM/DD
+        match = _DMY_DOT_RE.fullmatch(value)
+        if match:
+            day, month, year = match.groups()
+            return _iso_date(year, month, day)
+
+        match = _YMD_RE.fullmatch(value)
+        if match:
+            year, _, month, day = match.groups()
+            return _iso_date(year, month, day)
+
+        match = _SLASH_DATE_RE.fullmatch(value)
+        if match:
+            first, second, year = match.groups()
+            return _iso_date(year, first, second) or _iso_date(year, second, first)
+
+        # Fallback for anything the patterns above don't cover
         formats = [
             "%d.%m.%Y",
             "%Y-%m-%d",
@@ -138,13 +303,7 @@ def parse_number(value: Any) -> Optional[float]:
         return float(value)
 
     if isinstance(value, str):
-        cleaned = value.strip()
-        cleaned = cleaned.replace(",", "")
-        cleaned = cleaned.replace(" ", "")
-        cleaned = cleaned.replace("\u00a0", "")
-        cleaned = cleaned.replace("$", "")
-        cleaned = cleaned.replace("€", "")
-        cleaned = cleaned.replace("%", "")
+        cleaned = value.strip().translate(_NUMBER_NOISE)
 
         if not cleaned or cleaned == "-":
             return None
@@ -157,25 +316,43 @@ def parse_number(value: Any) -> Optional[float]:
     return None
 
 
-def get_cell_value(sheet, row_idx: int, col_idx: int) -> Any:
-    """Safely get cell value from xlrd sheet."""
-    try:
-        cell = sheet.cell(row_idx, col_idx)
-        if cell.ctype == xlrd.XL_CELL_EMPTY:
-            return None
-        if cell.ctype == xlrd.XL_CELL_DATE:
-            try:
-                dt = xlrd.xldate_as_datetime(cell.value, sheet.book.datemode)
-                return dt
-            except:
-                return cell.value
-        return cell.value
-    except IndexError:
-        return None
+def sheet_rows(sheet, start_row: int = DATA_START_ROW) -> Iterator[Tuple[int, List[Any]]]:
+    """Yield (Excel row number, plain cell values) for each row from ``start_row``.
 
+    Fetches whole rows with row_values()/row_types() instead of building an
+    xlrd Cell per column. Empty cells become None and date cells datetime
+    (left as the raw serial if xlrd can't convert them); rows are padded
+    with None to ROW_WIDTH so the parser can index any column directly.
+    Rows whose column A (source type) is empty are skipped from the cell
+    types alone, since parse_claim_row would discard them anyway.
+    """
+    datemode = sheet.book.datemode
+    empty = xlrd.XL_CELL_EMPTY
+    blank = xlrd.XL_CELL_BLANK
+    date = xlrd.XL_CELL_DATE
+
+    for row_idx in range(start_row, sheet.nrows):
+        types = sheet.row_types(row_idx)
+        if not types or types[0] == empty or types[0] == blank:
+            continue
+
+        values = sheet.row_values(row_idx)
+        for col_idx, ctype in enumerate(types):
+            if ctype == empty:
+                values[col_idx] = None
+            elif ctype == date:
+                try:
+                    values[col_idx] = xlrd.xldate_as_datetime(values[col_idx], datemode)
+                except Exception:
+                    pass
+        if len(values) < ROW_WIDTH:
+            values.extend([None] * (ROW_WIDTH - len(values)))
+        yield row_idx + 1, values
 
+
+@lru_cache(maxsize=256)
 def determine_source_type(col0_value: Any) -> str:
-    """Determine source type from column 0 value."""
+    """Determine source type from column 0 value (cached per distinct value)."""
     if col0_value is None:
         return "unknown"
 
@@ -188,18 +365,18 @@ def determine_source_type(col0_value: Any) -> str:
     return "unknown"
 
 
-def determine_liability_type(reserve: Optional[float], paid: Optional[float]) -> str:
-    """Determine if claim is ACTIVE or INFORMATIONAL."""
-    if (reserve and reserve > 0) or (paid and paid > 0):
+def determine_liability_type(has_reserve: bool, has_paid: bool) -> str:
+    """Determine if claim is ACTIVE or INFORMATIONAL from its positive amounts."""
+    if has_reserve or has_paid:
         return "ACTIVE"
     return "INFORMATIONAL"
 
 
-def determine_status(paid: Optional[float], outstanding: Optional[float]) -> str:
-    """Determine claim status: OPEN or CLOSED."""
-    if outstanding and outstanding > 0:
+def determine_status(has_paid: bool, has_outstanding: bool) -> str:
+    """Determine claim status: OPEN or CLOSED from its positive amounts."""
+    if has_outstanding:
         return "OPEN"
-    if paid and paid > 0:
+    if has_paid:
         return "CLOSED"
     return "OPEN"
 
@@ -208,6 +385,29 @@ def determine_status(paid: Optional[float], outstanding: Optional[float]) -> str
 # Parent Record Matching
 # ==============================================================================
 
+def fetch_all_rows(supabase: Client, table: str, columns: str) -> Iterator[Dict[str, Any]]:
+    """Yield every row of a table, one LOOKUP_PAGE_SIZE page at a time.
+
+    A single select is silently capped at PostgREST's max-rows. Pages are
+    ordered by id so offsets are stable, and the offset advances by the rows
+    actually returned in case the server caps pages lower.
+    """
+    offset = 0
+    while True:
+        response = (
+            supabase.table(table)
+            .select(columns)
+            .order("id")
+            .range(offset, offset + LOOKUP_PAGE_SIZE - 1)
+            .execute()
+        )
+        rows = response.data or []
+        if not rows:
+            return
+        yield from rows
+        offset += len(rows)
+
+
 def build_lookup_maps(supabase: Client) -> Tuple[Dict, Dict, Dict]:
     """
     Query existing records and build lookup maps for matching.
@@ -220,8 +420,7 @@ def build_lookup_maps(supabase: Client) -> Tuple[Dict, Dict, Dict]:
     policies_by_slip: Dict[str, str] = {}
 
     try:
-        result = supabase.table("policies").select("id, \"policyNumber\", \"slipNumber\"").execute()
-        policies = result.data or []
+        policies = list(fetch_all_rows(supabase, "policies", "id, \"policyNumber\", \"slipNumber\""))
 
         for p in policies:
             if p.get("policyNumber"):
@@ -237,8 +436,7 @@ def build_lookup_maps(supabase: Client) -> Tuple[Dict, Dict, Dict]:
     inward_by_contract: Dict[str, str] = {}
 
     try:
-        result = supabase.table("inward_reinsurance").select("id, contract_number").execute()
-        inward_records = result.data or []
+        inward_records = list(fetch_all_rows(supabase, "inward_reinsurance", "id, contract_number"))
 
         for ir in inward_records:
             if ir.get("contract_number"):
@@ -253,22 +451,21 @@ def build_lookup_maps(supabase: Client) -> Tuple[Dict, Dict, Dict]:
 
 def match_parent(
     source_type: str,
-    slip_number: Optional[str],
-    contract_number: Optional[str],
+    slip_key: str,
+    contract_key: str,
     policies_by_number: Dict[str, str],
     policies_by_slip: Dict[str, str],
     inward_by_contract: Dict[str, str]
 ) -> Tuple[Optional[str], Optional[str]]:
     """
     Match claim to parent record based on source type.
+    slip_key/contract_key are stripped, lowercased numbers ("" if missing),
+    normalized the same way as the lookup map keys.
     Returns: (policy_id, inward_reinsurance_id)
     """
     policy_id = None
     inward_id = None
 
-    slip_key = str(slip_number).strip().lower() if slip_number else ""
-    contract_key = str(contract_number).strip().lower() if contract_number else ""
-
     if source_type in ["inward-foreign", "inward-domestic"]:
         # Match to inward_reinsurance by slip/contract number
         if slip_key and slip_key in inward_by_contract:
@@ -296,57 +493,33 @@ def match_parent(
 # ==============================================================================
 
 def parse_claim_row(
-    sheet,
-    row_idx: int,
+    row: List[Any],
     row_number: int,
     policies_by_number: Dict[str, str],
     policies_by_slip: Dict[str, str],
     inward_by_contract: Dict[str, str]
-) -> Tuple[Optional[Dict], List[Dict]]:
+) -> Tuple[Optional[Claim], List[ClaimTransaction]]:
     """
-    Parse a single claim row.
+    Parse a single claim row (as yielded by sheet_rows).
     Returns: (claim_record, list_of_transactions)
     """
     # Get key values
-    col0 = get_cell_value(sheet, row_idx, 0)  # Source type
+    col0 = row[0]  # Source type
     source_type = determine_source_type(col0)
 
     # Skip if empty row
     if source_type == "unknown" and not col0:
         return None, []
 
-    # Extract all columns
-    loss_date = parse_date(get_cell_value(sheet, row_idx, 1))
-    report_date = parse_date(get_cell_value(sheet, row_idx, 2))
-    claim_number_raw = get_cell_value(sheet, row_idx, 3)
-    broker_reinsurer = get_cell_value(sheet, row_idx, 4)
-    slip_number = get_cell_value(sheet, row_idx, 5)
-    slip_date = get_cell_value(sheet, row_idx, 6)
-    claimant_name = get_cell_value(sheet, row_idx, 7)
-    reinsured = get_cell_value(sheet, row_idx, 8)
-    insurance_type = get_cell_value(sheet, row_idx, 9)
-    risk_description = get_cell_value(sheet, row_idx, 10)
-    location_country = get_cell_value(sheet, row_idx, 11)
-    city = get_cell_value(sheet, row_idx, 12)
-    contract_number = get_cell_value(sheet, row_idx, 13)
-    currency = get_cell_value(sheet, row_idx, 14)
+    # Extract columns, each group in one pass
+    (claim_number_raw, broker_reinsurer, slip_number, claimant_name, reinsured,
+     insurance_type, risk_description, location_country, city, contract_number,
+     currency, description) = CLAIM_TEXT_COLUMNS(row)
+    loss_date, report_date, payment_date = map(parse_date, CLAIM_DATE_COLUMNS(row))
 
     # Financial columns
-    sum_insured_usd = parse_number(get_cell_value(sheet, row_idx, 15))
-    sum_insured = parse_number(get_cell_value(sheet, row_idx, 16))
-    our_share_decimal = parse_number(get_cell_value(sheet, row_idx, 25))
-    reserve_fc = parse_number(get_cell_value(sheet, row_idx, 33))
-    reserve_nc = parse_number(get_cell_value(sheet, row_idx, 34))
-    total_loss = parse_number(get_cell_value(sheet, row_idx, 35))
-    our_share_loss_decimal = parse_number(get_cell_value(sheet, row_idx, 37))
-    our_share_loss_fc = parse_number(get_cell_value(sheet, row_idx, 38))
-    our_share_loss_nc = parse_number(get_cell_value(sheet, row_idx, 39))
-    paid_fc = parse_number(get_cell_value(sheet, row_idx, 40))
-    exchange_rate = parse_number(get_cell_value(sheet, row_idx, 41))
-    paid_nc = parse_number(get_cell_value(sheet, row_idx, 42))
-    payment_date = parse_date(get_cell_value(sheet, row_idx, 43))
-    outstanding = parse_number(get_cell_value(sheet, row_idx, 44))
-    description = get_cell_value(sheet, row_idx, 46)
+    (our_share_decimal, reserve_fc, total_loss, paid_fc, exchange_rate,
+     outstanding) = map(parse_number, CLAIM_NUMERIC_COLUMNS(row))
 
     # Convert our_share from decimal to percentage (0.005 -> 0.5)
     our_share_percentage = None
@@ -356,19 +529,28 @@ def parse_claim_row(
     # Generate claim number if missing
     claim_number = str(claim_number_raw).strip() if claim_number_raw else f"IMP-CLM-{row_number}"
 
+    # Stringify slip/contract numbers once for matching and the record
+    slip_str = str(slip_number).strip() if slip_number else None
+    contract_str = str(contract_number).strip() if contract_number else None
+
     # Match to parent record
     policy_id, inward_id = match_parent(
         source_type,
-        slip_number,
-        contract_number,
+        slip_str.lower() if slip_str else "",
+        contract_str.lower() if contract_str else "",
         policies_by_number,
         policies_by_slip,
         inward_by_contract
     )
 
+    # Sign checks shared by liability type, status and the transactions
+    has_reserve = reserve_fc is not None and reserve_fc > 0
+    has_paid = paid_fc is not None and paid_fc > 0
+    has_outstanding = outstanding is not None and outstanding > 0
+
     # Determine liability type and status
-    liability_type = determine_liability_type(reserve_fc, paid_fc)
-    status = determine_status(paid_fc, outstanding)
+    liability_type = determine_liability_type(has_reserve, has_paid)
+    status = determine_status(has_paid, has_outstanding)
 
     # Calculate imported totals
     imported_total_incurred = max(total_loss or 0, reserve_fc or 0)
@@ -388,60 +570,313 @@ def parse_claim_row(
         notes_parts.append(f"City: {city}")
     notes = " | ".join(notes_parts) if notes_parts else None
 
-    # Build claim record
-    claim: Dict[str, Any] = {
-        "claim_number": claim_number,
-        "source_type": source_type,
-        "slip_number": str(slip_number).strip() if slip_number else None,
-        "contract_number": str(contract_number).strip() if contract_number else None,
-        "liability_type": liability_type,
-        "status": status,
-        "loss_date": loss_date,
-        "report_date": report_date or datetime.now().strftime("%Y-%m-%d"),
-        "description": str(description)[:1000] if description else notes,
-        "claimant_name": str(claimant_name).strip() if claimant_name else None,
-        "location_country": str(location_country).strip() if location_country else None,
-        "imported_total_incurred": imported_total_incurred,
-        "imported_total_paid": imported_total_paid,
-        "is_deleted": False,
-    }
-
-    # Add parent references (nullable)
-    if policy_id:
-        claim["policy_id"] = policy_id
-    if inward_id:
-        claim["inward_reinsurance_id"] = inward_id
+    # Build claim record (parent references are nullable)
+    claim = Claim(
+        claim_number=claim_number,
+        source_type=source_type,
+        slip_number=slip_str,
+        contract_number=contract_str,
+        liability_type=liability_type,
+        status=status,
+        loss_date=loss_date,
+        report_date=report_date or TODAY_ISO,
+        description=str(description)[:1000] if description else notes,
+        claimant_name=str(claimant_name).strip() if claimant_name else None,
+        location_country=str(location_country).strip() if location_country else None,
+        imported_total_incurred=imported_total_incurred,
+        imported_total_paid=imported_total_paid,
+        policy_id=policy_id,
+        inward_reinsurance_id=inward_id,
+    )
 
     # Build transactions
-    transactions: List[Dict] = []
+    transactions: List[ClaimTransaction] = []
+    if has_reserve or has_paid:
+        currency_code = str(currency).strip().upper() if currency else "USD"
+        exchange_rate = exchange_rate or 1
+        our_share_percentage = our_share_percentage or 100
 
     # Reserve transaction
-    if reserve_fc and reserve_fc > 0:
-        transactions.append({
-            "transaction_type": "RESERVE_SET",
-            "transaction_date": loss_date or datetime.now().strftime("%Y-%m-%d"),
-            "amount_100pct": total_loss or reserve_fc,
-            "currency": str(currency).strip().upper() if currency else "USD",
-            "exchange_rate": exchange_rate or 1,
-            "our_share_percentage": our_share_percentage or 100,
-            "notes": "Imported from Excel portfolio (reserve)",
-        })
+    if has_reserve:
+        transactions.append(ClaimTransaction(
+            transaction_type="RESERVE_SET",
+            transaction_date=loss_date or TODAY_ISO,
+            amount_100pct=total_loss or reserve_fc,
+            currency=currency_code,
+            exchange_rate=exchange_rate,
+            our_share_percentage=our_share_percentage,
+            notes="Imported from Excel portfolio (reserve)",
+        ))
 
     # Payment transaction
-    if paid_fc and paid_fc > 0:
-        transactions.append({
-            "transaction_type": "PAYMENT",
-            "transaction_date": payment_date or loss_date or datetime.now().strftime("%Y-%m-%d"),
-            "amount_100pct": paid_fc,
-            "currency": str(currency).strip().upper() if currency else "USD",
-            "exchange_rate": exchange_rate or 1,
-            "our_share_percentage": our_share_percentage or 100,
-            "notes": "Imported from Excel portfolio (payment)",
-        })
+    if has_paid:
+        transactions.append(ClaimTransaction(
+            transaction_type="PAYMENT",
+            transaction_date=payment_date or loss_date or TODAY_ISO,
+            amount_100pct=paid_fc,
+            currency=currency_code,
+            exchange_rate=exchange_rate,
+            our_share_percentage=our_share_percentage,
+            notes="Imported from Excel portfolio (payment)",
+        ))
 
     return claim, transactions
 
 
+# ==============================================================================
+# Database Loading
+# ==============================================================================
+
+def insert_claim_batch(supabase: Client, batch: List[Claim]) -> Tuple[List[Optional[str]], List[str]]:
+    """Insert one batch of claims, retrying row by row if it fails.
+
+    Runs on a worker thread, so log lines are returned rather than printed.
+    Returns (inserted id or None for each claim in the batch, messages).
+    """
+    records = [claim.to_record() for claim in batch]
+    try:
+        result = supabase.table("claims").insert(records).execute()
+        return [record["id"] for record in result.data], [f"OK ({len(batch)} claims)"]
+    except Exception as e:
+        messages = ["FAILED", f"    Error: {e}", "    Retrying row-by-row..."]
+
+    claim_ids: List[Optional[str]] = []
+    for claim, record in zip(batch, records):
+        try:
+            result = supabase.table("claims").insert(record).execute()
+            claim_ids.append(result.data[0]["id"])
+        except Exception as row_error:
+            claim_ids.append(None)
+            messages.append(f"      Failed: {claim.claim_number} - {str(row_error)[:100]}")
+
+    return claim_ids, messages
+
+
+def insert_claims(
+    supabase: Client,
+    claims: List[Claim],
+    claim_txns: List[List[ClaimTransaction]]
+) -> Tuple[int, List[Dict]]:
+    """Insert claims through PostgREST in BATCH_SIZE batches.
+
+    Up to INSERT_CONCURRENCY batches are in flight at once; results are
+    logged in batch order. claim_txns holds each claim's transactions at the
+    claim's index. Returns (claims inserted, transactions linked to them).
+    """
+    inserted_claims = 0
+    transactions_to_insert: List[Dict] = []
+    batch_starts = range(0, len(claims), BATCH_SIZE)
+
+    with ThreadPoolExecutor(max_workers=INSERT_CONCURRENCY) as executor:
+        results = executor.map(
+            lambda batch_start: insert_claim_batch(supabase, claims[batch_start:batch_start + BATCH_SIZE]),
+            batch_starts
+        )
+        for batch_start, (claim_ids, messages) in zip(batch_starts, results):
+            batch_end = min(batch_start + BATCH_SIZE, len(claims))
+            batch_num = (batch_start // BATCH_SIZE) + 1
+            print(f"  Batch {batch_num}: claims {batch_start + 1} - {batch_end}... {messages[0]}")
+            for message in messages[1:]:
+                print(message)
+
+            # Link this batch's transactions to the inserted claim IDs
+            inserted_claims += sum(claim_id is not None for claim_id in claim_ids)
+            transactions_to_insert.extend(link_transactions(claim_txns[batch_start:batch_end], claim_ids))
+
+    return inserted_claims, transactions_to_insert
+
+
+def insert_transaction_batch(supabase: Client, batch: List[Dict]) -> Tuple[int, List[str]]:
+    """Insert one batch of transactions, retrying row by row if it fails.
+
+    Returns (inserted_count, messages).
+    """
+    try:
+        supabase.table("claim_transactions").insert(batch).execute()
+        return len(batch), [f"OK ({len(batch)} transactions)"]
+    except Exception as e:
+        messages = ["FAILED", f"    Error: {e}"]
+
+    inserted = 0
+    for txn in batch:
+        try:
+            supabase.table("claim_transactions").insert(txn).execute()
+            inserted += 1
+        except Exception as row_error:
+            messages.append(f"      Failed: {str(row_error)[:100]}")
+
+    return inserted, messages
+
+
+def insert_transactions(supabase: Client, transactions: List[Dict]) -> int:
+    """Insert claim transactions through PostgREST in BATCH_SIZE batches.
+
+    Batches run concurrently like insert_claims. Returns the inserted count.
+    """
+    inserted_transactions = 0
+    batch_starts = range(0, len(transactions), BATCH_SIZE)
+
+    with ThreadPoolExecutor(max_workers=INSERT_CONCURRENCY) as executor:
+        results = executor.map(
+            lambda batch_start: insert_transaction_batch(supabase, transactions[batch_start:batch_start + BATCH_SIZE]),
+            batch_starts
+        )
+        for batch_start, (inserted, messages) in zip(batch_starts, results):
+            batch_end = min(batch_start + BATCH_SIZE, len(transactions))
+            batch_num = (batch_start // BATCH_SIZE) + 1
+            print(f"  Batch {batch_num}: transactions {batch_start + 1} - {batch_end}... {messages[0]}")
+            for message in messages[1:]:
+                print(message)
+            inserted_transactions += inserted
+
+    return inserted_transactions
+
+
+def link_transactions(
+    claim_txns: List[List[ClaimTransaction]],
+    claim_ids: List[Optional[str]]
+) -> List[Dict]:
+    """
+    Return a copy of each transaction whose claim was inserted, with claim_id set.
+    claim_txns and claim_ids are aligned by claim (None = claim not inserted).
+    The parsed transactions are left untouched, so linking can be retried.
+    """
+    return [
+        txn.to_record(claim_id)
+        for claim_id, transactions in zip(claim_ids, claim_txns)
+        if claim_id is not None
+        for txn in transactions
+    ]
+
+
+def claims_rpc_available(supabase: Client) -> bool:
+    """Check whether the import_claims_batch function (claims_table_migration.sql) exists.
+
+    Calls it with empty arrays, which inserts nothing.
+    """
+    try:
+        supabase.rpc("import_claims_batch", {"claims": [], "transactions": []}).execute()
+        return True
+    except Exception:
+        return False
+
+
+def insert_claim_batch_rpc(
+    supabase: Client,
+    batch: List[Claim],
+    batch_txns: List[List[ClaimTransaction]]
+) -> Tuple[int, int, int, List[str]]:
+    """Insert one batch of claims with their transactions in a single request.
+
+    Claim ids are generated here (uuid4) so the transactions can be linked
+    before sending. If the request fails, the batch falls back to the
+    separate claim and transaction inserts, row by row where needed.
+    Returns (claims inserted, transactions inserted, transactions linked, messages).
+    """
+    claim_rows = [{"id": str(uuid.uuid4()), **claim.to_record()} for claim in batch]
+    transactions = link_transactions(batch_txns, [row["id"] for row in claim_rows])
+    try:
+        supabase.rpc("import_claims_batch", {"claims": claim_rows, "transactions": transactions}).execute()
+        return len(claim_rows), len(transactions), len(transactions), [
+            f"OK ({len(claim_rows)} claims, {len(transactions)} transactions)"
+        ]
+    except Exception as e:
+        messages = ["FAILED", f"    Error: {e}", "    Retrying with separate inserts..."]
+
+    claim_ids, claim_messages = insert_claim_batch(supabase, batch)
+    messages.append(f"    Claims: {claim_messages[0]}")
+    messages.extend(claim_messages[1:])
+
+    transactions = link_transactions(batch_txns, claim_ids)
+    inserted_transactions = 0
+    if transactions:
+        inserted_transactions, txn_messages = insert_transaction_batch(supabase, transactions)
+        messages.append(f"    Transactions: {txn_messages[0]}")
+        messages.extend(txn_messages[1:])
+
+    inserted_claims = sum(claim_id is not None for claim_id in claim_ids)
+    return inserted_claims, inserted_transactions, len(transactions), messages
+
+
+def insert_claims_with_transactions(
+    supabase: Client,
+    claims: List[Claim],
+    claim_txns: List[List[ClaimTransaction]]
+) -> Tuple[int, int, int]:
+    """Insert claims and their transactions through import_claims_batch.
+
+    One request per BATCH_SIZE claims instead of a claims wave followed by a
+    transactions wave; batches run concurrently like insert_claims.
+    Returns (claims inserted, transactions inserted, transactions linked).
+    """
+    inserted_claims = 0
+    inserted_transactions = 0
+    linked_transactions = 0
+    batch_starts = range(0, len(claims), BATCH_SIZE)
+
+    with ThreadPoolExecutor(max_workers=INSERT_CONCURRENCY) as executor:
+        results = executor.map(
+            lambda batch_start: insert_claim_batch_rpc(
+                supabase,
+                claims[batch_start:batch_start + BATCH_SIZE],
+                claim_txns[batch_start:batch_start + BATCH_SIZE]
+            ),
+            batch_starts
+        )
+        for batch_start, (batch_claims, batch_transactions, batch_linked, messages) in zip(batch_starts, results):
+            batch_end = min(batch_start + BATCH_SIZE, len(claims))
+            batch_num = (batch_start // BATCH_SIZE) + 1
+            print(f"  Batch {batch_num}: claims {batch_start + 1} - {batch_end}... {messages[0]}")
+            for message in messages[1:]:
+                print(message)
+            inserted_claims += batch_claims
+            inserted_transactions += batch_transactions
+            linked_transactions += batch_linked
+
+    return inserted_claims, inserted_transactions, linked_transactions
+
+
+def copy_table(cur, table_name: str, records: List[Dict]) -> None:
+    """COPY records into a table; missing keys load as NULL, as with PostgREST."""
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    column_list = ", ".join(f'"{column}"' for column in columns)
+
+    with cur.copy(f'COPY "{table_name}" ({column_list}) FROM STDIN') as copy:
+        for record in records:
+            copy.write_row([record.get(column) for column in columns])
+
+
+def copy_claims(
+    claims: List[Claim],
+    claim_txns: List[List[ClaimTransaction]]
+) -> Tuple[int, List[Dict]]:
+    """Load claims and their transactions with COPY in a single transaction.
+
+    Claim ids are generated here (uuid4) so transactions can be linked
+    without reading the inserted rows back. Any failure rolls back both
+    tables. Returns (claims copied, transactions copied with their claim_id).
+    """
+    try:
+        import psycopg
+    except ImportError as e:
+        raise RuntimeError("DATABASE_URL is set but psycopg is missing: pip install 'psycopg[binary]'") from e
+
+    claim_rows = [{"id": str(uuid.uuid4()), **claim.to_record()} for claim in claims]
+    transactions = link_transactions(claim_txns, [row["id"] for row in claim_rows])
+
+    # The connection block commits on success and rolls back on any error
+    with psycopg.connect(DATABASE_URL) as conn:
+        with conn.cursor() as cur:
+            if claim_rows:
+                copy_table(cur, "claims", claim_rows)
+            print(f"  Copied {len(claim_rows)} claims")
+            if transactions:
+                copy_table(cur, "claim_transactions", transactions)
+            print(f"  Copied {len(transactions)} transactions")
+
+    return len(claim_rows), transactions
+
+
 # ==============================================================================
 # Main Import Logic
 # ==============================================================================
@@ -474,7 +909,7 @@ def main():
     # Step 1: Decrypt Excel file
     print("Step 1: Decrypting Excel file...")
     try:
-        decrypted_path = decrypt_xls(EXCEL_FILE, EXCEL_PASSWORD)
+        workbook_contents = decrypt_xls(EXCEL_FILE, EXCEL_PASSWORD)
     except Exception as e:
         print(f"ERROR: Failed to decrypt file: {e}")
         sys.exit(1)
@@ -482,7 +917,8 @@ def main():
     # Step 2: Open workbook with xlrd
     print("\nStep 2: Opening workbook...")
     try:
-        workbook = xlrd.open_workbook(decrypted_path)
+        # on_demand: only the claims sheet is parsed, not every sheet in the file
+        workbook = xlrd.open_workbook(file_contents=workbook_contents, on_demand=True)
         sheet_names = workbook.sheet_names()
         print(f"  Available sheets: {sheet_names}")
 
@@ -515,8 +951,9 @@ def main():
 
     # Step 4: Parse all claim rows
     print("\nStep 4: Parsing claims...")
-    claims: List[Dict] = []
-    all_transactions: List[Tuple[int, Dict]] = []  # (claim_index, transaction)
+    claims: List[Claim] = []
+    claim_txns: List[List[ClaimTransaction]] = []  # transactions of claims[i] at index i
+    transaction_count = 0
 
     # Track matching statistics
     match_stats = {
@@ -527,39 +964,38 @@ def main():
         "by_source_type": {},
     }
 
-    # Data starts at row 2 (row 0 = headers, row 1 = sub-headers)
-    data_start_row = 2
-
-    for row_idx in range(data_start_row, sheet.nrows):
-        row_number = row_idx + 1
-
+    for row_number, row in sheet_rows(sheet):
         claim, transactions = parse_claim_row(
-            sheet, row_idx, row_number,
+            row, row_number,
             policies_by_number, policies_by_slip, inward_by_contract
         )
 
         if claim:
             claims.append(claim)
-            claim_idx = len(claims) - 1
-
-            # Store transactions with claim index for later
-            for txn in transactions:
-                all_transactions.append((claim_idx, txn))
+            claim_txns.append(transactions)
+            transaction_count += len(transactions)
 
             # Track statistics
             match_stats["total"] += 1
-            source_type = claim.get("source_type", "unknown")
+            source_type = claim.source_type
             match_stats["by_source_type"][source_type] = match_stats["by_source_type"].get(source_type, 0) + 1
 
-            if claim.get("policy_id"):
+            if claim.policy_id:
                 match_stats["matched_policy"] += 1
-            elif claim.get("inward_reinsurance_id"):
+            elif claim.inward_reinsurance_id:
                 match_stats["matched_inward"] += 1
             else:
                 match_stats["unmatched"] += 1
 
+    # The sheet's cells and the decrypted bytes are no longer needed once
+    # every row is parsed; free them before the insert phase. release_resources()
+    # alone keeps the loaded sheet (and all its cells) alive.
+    workbook.unload_sheet(sheet.name)
+    workbook.release_resources()
+    del sheet, workbook, workbook_contents
+
     print(f"\n  Parsed: {len(claims)} claims")
-    print(f"  Transactions to create: {len(all_transactions)}")
+    print(f"  Transactions to create: {transaction_count}")
     print(f"\n  Match Statistics:")
     print(f"    Matched to policies: {match_stats['matched_policy']}")
     print(f"    Matched to inward_reinsurance: {match_stats['matched_inward']}")
@@ -575,20 +1011,33 @@ def main():
         print("=" * 60)
 
         preview_data = {
-            "claims": claims[:PREVIEW_ROWS],
-            "transactions_sample": [
-                {"claim_index": idx, "transaction": txn}
-                for idx, txn in all_transactions[:20]
-            ],
+            "claims": [claim.to_record() for claim in claims[:PREVIEW_ROWS]],
+            "transactions_sample": list(islice(
+                (
+                    {"claim_index": idx, "transaction": txn.to_record()}
+                    for idx, transactions in enumerate(claim_txns)
+                    for txn in transactions
+                ),
+                20
+            )),
             "match_statistics": match_stats,
         }
 
-        with open("claims_preview.json", "w", encoding="utf-8") as f:
-            json.dump(preview_data, f, indent=2, ensure_ascii=False, default=str)
+        if orjson is not None:
+            data = orjson.dumps(
+                preview_data,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                default=str,
+            )
+        else:
+            data = json.dumps(preview_data, indent=2, ensure_ascii=False, default=str).encode("utf-8")
+
+        with open("claims_preview.json", "wb") as f:
+            f.write(data)
 
         print(f"\nPreview saved: claims_preview.json")
         print(f"  Claims: {min(len(claims), PREVIEW_ROWS)} of {len(claims)}")
-        print(f"  Transactions: {min(len(all_transactions), 20)} of {len(all_transactions)}")
+        print(f"  Transactions: {min(transaction_count, 20)} of {transaction_count}")
         print("\nReview the preview, then run without --dry-run to import")
         print("\nIMPORTANT: Run this SQL in Supabase SQL Editor FIRST:")
         print("-" * 60)
@@ -600,97 +1049,49 @@ ALTER TABLE public.claims ADD COLUMN IF NOT EXISTS slip_number TEXT;
 ALTER TABLE public.claims ADD COLUMN IF NOT EXISTS contract_number TEXT;
         """)
         print("-" * 60)
-
-        # Cleanup
-        if decrypted_path != EXCEL_FILE and os.path.exists(decrypted_path):
-            os.remove(decrypted_path)
-
         return
 
-    # Step 5: Insert claims
-    print("\nStep 5: Inserting claims...")
-    inserted_claims = 0
-    claim_id_map: Dict[int, str] = {}  # Map claim index to inserted UUID
-
-    for batch_start in range(0, len(claims), BATCH_SIZE):
-        batch_end = min(batch_start + BATCH_SIZE, len(claims))
-        batch = claims[batch_start:batch_end]
-        batch_num = (batch_start // BATCH_SIZE) + 1
-
-        print(f"  Batch {batch_num}: claims {batch_start + 1} - {batch_end}...", end=" ")
-
+    loaded = False
+    if DATABASE_URL:
+        # Step 5: Load claims and transactions directly into Postgres
+        print("\nStep 5: Loading claims and transactions with COPY (DATABASE_URL)...")
         try:
-            result = supabase.table("claims").insert(batch).execute()
-
-            # Store claim IDs for transaction linking
-            for i, record in enumerate(result.data):
-                claim_id_map[batch_start + i] = record["id"]
-
-            inserted_claims += len(batch)
-            print(f"OK ({len(batch)} claims)")
+            inserted_claims, transactions_to_insert = copy_claims(claims, claim_txns)
+            inserted_transactions = linked_transactions = len(transactions_to_insert)
+            loaded = True
         except Exception as e:
-            print(f"FAILED")
-            print(f"    Error: {e}")
-
-            # Retry row by row
-            print(f"    Retrying row-by-row...")
-            for i, claim in enumerate(batch):
-                try:
-                    result = supabase.table("claims").insert(claim).execute()
-                    claim_id_map[batch_start + i] = result.data[0]["id"]
-                    inserted_claims += 1
-                except Exception as row_error:
-                    print(f"      Failed: {claim.get('claim_number')} - {str(row_error)[:100]}")
-
-    # Step 6: Insert transactions
-    print("\nStep 6: Inserting claim transactions...")
-    inserted_transactions = 0
-
-    # Build transactions with claim_id
-    transactions_to_insert: List[Dict] = []
-    for claim_idx, txn in all_transactions:
-        if claim_idx in claim_id_map:
-            txn["claim_id"] = claim_id_map[claim_idx]
-            transactions_to_insert.append(txn)
-
-    for batch_start in range(0, len(transactions_to_insert), BATCH_SIZE):
-        batch_end = min(batch_start + BATCH_SIZE, len(transactions_to_insert))
-        batch = transactions_to_insert[batch_start:batch_end]
-        batch_num = (batch_start // BATCH_SIZE) + 1
+            print(f"  COPY failed, nothing loaded: {str(e)[:200]}")
+            print(f"  Falling back to PostgREST inserts...")
+
+    if not loaded and claims_rpc_available(supabase):
+        # Step 5: Insert claims and their transactions, one request per batch
+        print("\nStep 5: Inserting claims with their transactions (import_claims_batch)...")
+        inserted_claims, inserted_transactions, linked_transactions = insert_claims_with_transactions(
+            supabase, claims, claim_txns
+        )
+        loaded = True
 
-        print(f"  Batch {batch_num}: transactions {batch_start + 1} - {batch_end}...", end=" ")
+    if not loaded:
+        # Step 5: Insert claims
+        print("\nStep 5: Inserting claims...")
+        inserted_claims, transactions_to_insert = insert_claims(supabase, claims, claim_txns)
 
-        try:
-            supabase.table("claim_transactions").insert(batch).execute()
-            inserted_transactions += len(batch)
-            print(f"OK ({len(batch)} transactions)")
-        except Exception as e:
-            print(f"FAILED")
-            print(f"    Error: {e}")
-
-            # Retry row by row
-            for txn in batch:
-                try:
-                    supabase.table("claim_transactions").insert(txn).execute()
-                    inserted_transactions += 1
-                except Exception as row_error:
-                    print(f"      Failed: {str(row_error)[:100]}")
+        # Step 6: Insert transactions
+        print("\nStep 6: Inserting claim transactions...")
+        inserted_transactions = insert_transactions(supabase, transactions_to_insert)
+        linked_transactions = len(transactions_to_insert)
 
     # Summary
     print("\n" + "=" * 60)
     print("IMPORT COMPLETE")
     print("=" * 60)
     print(f"  Claims Inserted: {inserted_claims} of {len(claims)}")
-    print(f"  Transactions Inserted: {inserted_transactions} of {len(transactions_to_insert)}")
+    print(f"  Transactions Inserted: {inserted_transactions} of {linked_transactions}")
     print(f"\n  Match Statistics:")
     print(f"    Matched to policies: {match_stats['matched_policy']}")
     print(f"    Matched to inward_reinsurance: {match_stats['matched_inward']}")
     print(f"    Unmatched: {match_stats['unmatched']}")
 
-    # Cleanup
-    if decrypted_path != EXCEL_FILE and os.path.exists(decrypted_path):
-        os.remove(decrypted_path)
-
 
 if __name__ == "__main__":
     main()
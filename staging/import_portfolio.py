@@ -9,12 +9,19 @@ Usage:
     3. DRY_RUN=false python import_portfolio.py  # Real import
 """
 
+import io
 import os
+import re
 import sys
 import json
-import tempfile
+import calendar
+import contextlib
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
 # Load environment variables first
 from dotenv import load_dotenv
@@ -22,14 +29,20 @@ load_dotenv()
 
 # Required packages
 try:
-    import msoffcrypto
     from pyxlsb import open_workbook
+    from _xlsb_utils import decrypt_xlsb
     from supabase import create_client, Client
 except ImportError as e:
     print(f"Missing required package: {e}")
     print("Install with: pip install supabase pyxlsb msoffcrypto-tool python-dotenv")
     sys.exit(1)
 
+# Optional: faster JSON encoding for the preview file
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ==============================================================================
 # Configuration
 # ==============================================================================
@@ -39,9 +52,15 @@ SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
 EXCEL_FILE = os.getenv("EXCEL_FILE", "Reinsurance_Portfolio.xlsb")
 EXCEL_PASSWORD = os.getenv("EXCEL_PASSWORD", "")
 DRY_RUN = os.getenv("DRY_RUN", "true").lower() == "true"
+# Optional direct Postgres connection; when set, records are loaded with COPY
+DATABASE_URL = os.getenv("DATABASE_URL", "")
 
 BATCH_SIZE = 50
+INSERT_CONCURRENCY = int(os.getenv("INSERT_CONCURRENCY", "8"))  # insert requests in flight
 PREVIEW_ROWS = 20
+HEADER_SCAN_ROWS = 15  # leading rows searched for the header
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 1)))  # 1 = parse in-process
+PARSE_CHUNK_ROWS = 2000  # rows sent to a parse worker at a time
 
 # Column mappings (0-indexed Excel columns -> inward_reinsurance snake_case columns)
 TEXT_COLUMNS: Dict[int, str] = {
@@ -74,31 +93,54 @@ NUMERIC_COLUMNS: Dict[int, str] = {
 STRUCTURE_COLUMN = 31  # "%" -> PROPORTIONAL, "XL" -> NON_PROPORTIONAL
 NOTES_COLUMNS = [2, 3, 6, 8, 9, 10, 13, 17, 18, 20, 21]  # Extra info -> notes field
 
+# A row is skipped when all of these columns are empty
+KEY_COLUMNS = tuple(
+    col for col, field in TEXT_COLUMNS.items()
+    if field in ("cedant_name", "contract_number", "original_insured_name")
+)
 
-# ==============================================================================
-# Helper Functions
-# ==============================================================================
+# Widest column parse_row reads, plus one; rows are padded to this
+ROW_WIDTH = max(*TEXT_COLUMNS, *DATE_COLUMNS, *NUMERIC_COLUMNS, STRUCTURE_COLUMN, *NOTES_COLUMNS) + 1
 
-def decrypt_xlsb(file_path: str, password: str = "") -> str:
-    """Decrypt an encrypted .xlsb file using msoffcrypto-tool."""
-    decrypted_path = tempfile.mktemp(suffix=".xlsb")
+# Field order of a parsed record (parse_row builds lists in this order)
+FIELD_ORDER: Tuple[str, ...] = (
+    # Text columns
+    'original_insured_name', 'broker_name', 'cedant_name', 'contract_number',
+    'type_of_cover', 'class_of_cover', 'risk_description', 'industry',
+    'territory', 'currency',
+    # Date columns
+    'inception_date', 'expiry_date',
+    # Numeric columns
+    'limit_of_liability', 'deductible', 'our_share', 'gross_premium',
+    'commission_percent', 'net_premium',
+    # Derived
+    'structure', 'notes', 'origin', 'type', 'status', 'cedant_country', 'uw_year',
+)
 
-    with open(file_path, "rb") as f:
-        file = msoffcrypto.OfficeFile(f)
+# Fallbacks for rows without dates; fixed for the whole run
+_RUN_STARTED = datetime.now()
+DEFAULT_UW_YEAR = _RUN_STARTED.year
+DEFAULT_INCEPTION = _RUN_STARTED.strftime("%Y-%m-%d")
+DEFAULT_EXPIRY = (_RUN_STARTED + timedelta(days=365)).strftime("%Y-%m-%d")
 
-        # Check if file is actually encrypted
-        if not file.is_encrypted():
-            print(f"  File is not encrypted, using directly")
-            return file_path
+# Thousands separators, currency and percent signs stripped by parse_number
+_NUMBER_NOISE = str.maketrans("", "", ", \u00a0$€%")
 
-        file.load_key(password=password)
+# Excel serials for 0001-01-01 and 9999-12-31 (the datetime range)
+EXCEL_SERIAL_MIN = -693593
+EXCEL_SERIAL_MAX = 2958465
 
-        with open(decrypted_path, "wb") as out:
-            file.decrypt(out)
+# Common date string shapes (ASCII digits, years 1000+), matched before
+# falling back to strptime for anything else
+_DMY_DOT_RE = re.compile(r"([0-9]{1,2})\.([0-9]{1,2})\.([1-9][0-9]{3})")
+_SLASH_DATE_RE = re.compile(r"([0-9]{1,2})/([0-9]{1,2})/([1-9][0-9]{3})")
+_YMD_RE = re.compile(r"([1-9][0-9]{3})([-/])([0-9]{1,2})\2([0-9]{1,2})")
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
 
-    print(f"  Decrypted to: {decrypted_path}")
-    return decrypted_path
 
+# ==============================================================================
+# Helper Functions
+# ==============================================================================
 
 def find_sheet(wb) -> Tuple[Any, str]:
     """Find the sheet containing Inward reinsurance data."""
@@ -106,7 +148,8 @@ def find_sheet(wb) -> Tuple[Any, str]:
 
     # Look for sheet with "Inward" or "Входящ" (Russian) in name
     for name in sheet_names:
-        if "inward" in name.lower() or "входящ" in name.lower():
+        lowered = name.lower()
+        if "inward" in lowered or "входящ" in lowered:
             print(f"  Found sheet: {name}")
             return wb.get_sheet(name), name
 
@@ -119,14 +162,19 @@ def find_sheet(wb) -> Tuple[Any, str]:
     raise ValueError("No sheets found in workbook")
 
 
-def find_header_row(sheet, max_rows: int = 15) -> int:
-    """Auto-detect header row by searching for 'Insured' or 'Застрахованный'."""
-    for row_idx, row in enumerate(sheet.rows()):
+def find_header_row(rows: List[List[Any]], max_rows: int = HEADER_SCAN_ROWS) -> int:
+    """Auto-detect header row by searching for 'Insured' or 'Застрахованный'.
+
+    Only the first ``max_rows`` rows are inspected, so a streaming caller can
+    pass just that leading slice.
+    """
+    for row_idx, row in enumerate(rows):
         if row_idx >= max_rows:
             break
         for cell in row:
-            if cell.v:
-                cell_str = str(cell.v).lower()
+            value = cell.v
+            if value:
+                cell_str = str(value).lower()
                 if "insured" in cell_str or "застрахован" in cell_str:
                     print(f"  Found header row at index {row_idx}")
                     return row_idx
@@ -135,8 +183,96 @@ def find_header_row(sheet, max_rows: int = 15) -> int:
     return 0
 
 
+@lru_cache(maxsize=4096)
+def excel_serial_to_iso(days: int) -> Optional[str]:
+    """Convert an Excel serial day number (days since 1899-12-30) to ISO.
+
+    Integer-only Julian day conversion (Fliegel & Van Flandern), so no
+    datetime/timedelta objects are built. Serials outside years 1-9999
+    return None, as the datetime arithmetic did.
+    """
+    if not EXCEL_SERIAL_MIN <= days <= EXCEL_SERIAL_MAX:
+        return None
+
+    l = days + 2415019 + 68569  # Julian day number of the serial, offset
+    n = 4 * l // 146097
+    l -= (146097 * n + 3) // 4
+    i = 4000 * (l + 1) // 1461001
+    l = l - 1461 * i // 4 + 31
+    j = 80 * l // 2447
+    day = l - 2447 * j // 80
+    l = j // 11
+    month = j + 2 - 12 * l
+    year = 100 * (n - 49) + i + l
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+def _iso_date(year: str, month: str, day: str) -> Optional[str]:
+    """Build an ISO date string from matched parts, or None if not a real date.
+
+    Validated and formatted directly rather than through a date object; the
+    patterns only match four-digit years from 1000.
+    """
+    y, m, d = int(year), int(month), int(day)
+    if not 1 <= m <= 12 or d < 1:
+        return None
+    if d > _DAYS_IN_MONTH[m - 1] and not (m == 2 and d == 29 and calendar.isleap(y)):
+        return None
+    return f"{y}-{m:02d}-{d:02d}"
+
+
+@lru_cache(maxsize=4096)
+def parse_date_string(value: str) -> Optional[str]:
+    """Parse a stripped, non-empty date string to ISO, or None.
+
+    Cached per value: inception/expiry dates repeat across many contracts,
+    so each distinct string is parsed only once.
+    """
+    # Same precedence as the strptime formats below:
+    # DD.MM.YYYY, YYYY-MM-DD, MM/DD/YYYY, DD/MM/YYYY, YYYY/MM/DD
+    match = _DMY_DOT_RE.fullmatch(value)
+    if match:
+        day, month, year = match.groups()
+        return _iso_date(year, month, day)
+
+    match = _YMD_RE.fullmatch(value)
+    if match:
+        year, _, month, day = match.groups()
+        return _iso_date(year, month, day)
+
+    match = _SLASH_DATE_RE.fullmatch(value)
+    if match:
+        first, second, year = match.groups()
+        return _iso_date(year, first, second) or _iso_date(year, second, first)
+
+    # Fallback for anything the patterns above don't cover
+    formats = [
+        "%d.%m.%Y",  # 31.12.2025
+        "%Y-%m-%d",  # 2025-12-31
+        "%m/%d/%Y",  # 12/31/2025
+        "%d/%m/%Y",  # 31/12/2025
+        "%Y/%m/%d",  # 2025/12/31
+    ]
+
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+
+    return None
+
+
 def parse_date(value: Any) -> Optional[str]:
     """Parse various date formats to ISO string."""
+    # Excel serial number (days since 1899-12-30); pyxlsb returns these as
+    # floats, so they are checked first
+    if isinstance(value, (int, float)):
+        try:
+            return excel_serial_to_iso(int(value))
+        except (ValueError, OverflowError):
+            return None
+
     if value is None:
         return None
 
@@ -144,45 +280,26 @@ def parse_date(value: Any) -> Optional[str]:
     if isinstance(value, datetime):
         return value.strftime("%Y-%m-%d")
 
-    # Excel serial number (days since 1899-12-30)
-    if isinstance(value, (int, float)):
-        try:
-            # Excel epoch is Dec 30, 1899
-            excel_epoch = datetime(1899, 12, 30)
-            result = excel_epoch + timedelta(days=int(value))
-            return result.strftime("%Y-%m-%d")
-        except (ValueError, OverflowError):
-            return None
-
     # String parsing
     if isinstance(value, str):
         value = value.strip()
         if not value:
             return None
 
-        # Try various formats
-        formats = [
-            "%d.%m.%Y",  # 31.12.2025
-            "%Y-%m-%d",  # 2025-12-31
-            "%m/%d/%Y",  # 12/31/2025
-            "%d/%m/%Y",  # 31/12/2025
-            "%Y/%m/%d",  # 2025/12/31
-        ]
-
-        for fmt in formats:
-            try:
-                return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
-            except ValueError:
-                continue
-
-        print(f"    Warning: Could not parse date: {value}")
-        return None
+        result = parse_date_string(value)
+        if result is None:
+            print(f"    Warning: Could not parse date: {value}")
+        return result
 
     return None
 
 
 def parse_number(value: Any) -> Optional[float]:
     """Parse numeric values, handling various formats."""
+    # pyxlsb returns every numeric cell as a float
+    if type(value) is float:
+        return value
+
     if value is None:
         return None
 
@@ -190,14 +307,8 @@ def parse_number(value: Any) -> Optional[float]:
         return float(value)
 
     if isinstance(value, str):
-        # Remove common formatting
-        cleaned = value.strip()
-        cleaned = cleaned.replace(",", "")  # Remove commas
-        cleaned = cleaned.replace(" ", "")  # Remove spaces
-        cleaned = cleaned.replace("\u00a0", "")  # Remove non-breaking spaces
-        cleaned = cleaned.replace("$", "")
-        cleaned = cleaned.replace("€", "")
-        cleaned = cleaned.replace("%", "")
+        # Remove common formatting in one pass
+        cleaned = value.strip().translate(_NUMBER_NOISE)
 
         if not cleaned or cleaned == "-":
             return None
@@ -210,8 +321,12 @@ def parse_number(value: Any) -> Optional[float]:
     return None
 
 
+@lru_cache(maxsize=64)
 def parse_structure(value: Any) -> str:
-    """Parse structure column: '%' -> PROPORTIONAL, 'XL' -> NON_PROPORTIONAL."""
+    """Parse structure column: '%' -> PROPORTIONAL, 'XL' -> NON_PROPORTIONAL.
+
+    Cached per raw cell value; the column only holds a few distinct values.
+    """
     if value is None:
         return "PROPORTIONAL"
 
@@ -223,8 +338,9 @@ def parse_structure(value: Any) -> str:
     return "PROPORTIONAL"
 
 
+@lru_cache(maxsize=256)
 def determine_origin(territory: Optional[str], currency: Optional[str]) -> str:
-    """Determine origin based on territory/country and currency."""
+    """Determine origin based on territory/country and currency (cached per pair)."""
     if territory:
         territory_lower = territory.lower()
         if "uzbek" in territory_lower or territory_lower == "uz":
@@ -237,111 +353,248 @@ def determine_origin(territory: Optional[str], currency: Optional[str]) -> str:
     return "FOREIGN"
 
 
-def get_cell_value(row: List, col_idx: int) -> Any:
-    """Safely get cell value from row."""
-    if col_idx < len(row):
-        cell = row[col_idx]
-        return cell.v if hasattr(cell, 'v') else cell
-    return None
-
+def _clean_text(value: Any) -> Optional[str]:
+    """Strip a text cell; empty or falsy cells become None."""
+    return str(value).strip() if value else None
+
+
+def _build_column_reader():
+    """Generate a straight-line function reading the mapped columns of a row.
+
+    The column mappings are fixed at import time, so instead of looping over
+    them per row the reader is compiled once as a single list literal, e.g.
+    ``[parse_date(row[25]), ...]``, with the values in FIELD_ORDER order.
+    Text cells are the most common, so _clean_text is inlined for them
+    rather than called. Rows are padded to ROW_WIDTH, so every mapped column
+    can be indexed.
+    """
+    columns: Dict[str, Tuple[int, str]] = {}
+    for mapping, parser in (
+        (TEXT_COLUMNS, "_clean_text"),
+        (DATE_COLUMNS, "parse_date"),
+        (NUMERIC_COLUMNS, "parse_number"),
+    ):
+        for col_idx, field_name in mapping.items():
+            columns[field_name] = (col_idx, parser)
+
+    lines = ["def _read_columns(row):", "    return ["]
+    for field_name in FIELD_ORDER:
+        if field_name in columns:
+            col_idx, parser = columns[field_name]
+            if parser == "_clean_text":
+                cell = f"row[{col_idx}]"
+                lines.append(f"        str({cell}).strip() if {cell} else None,  # {field_name}")
+            else:
+                lines.append(f"        {parser}(row[{col_idx}]),  # {field_name}")
+    lines.append("    ]")
+
+    namespace: Dict[str, Any] = {}
+    exec(compile("\n".join(lines), "<column reader>", "exec"), globals(), namespace)
+    return namespace["_read_columns"]
+
+
+def parse_row(row: List, row_number: int) -> Optional[List[Any]]:
+    """Parse a single Excel row (plain cell values padded to ROW_WIDTH) into
+    an inward_reinsurance record.
+
+    The record is a list of values in FIELD_ORDER; to_record() turns it into
+    a dict when it is sent.
+    """
+    # Skip empty rows before running any of the column parsers
+    if not any(_clean_text(row[col]) for col in KEY_COLUMNS):
+        return None
 
-def parse_row(row: List, row_number: int) -> Optional[Dict[str, Any]]:
-    """Parse a single Excel row into an inward_reinsurance record."""
-    record: Dict[str, Any] = {}
     warnings: List[str] = []
 
-    # Text columns
-    for col_idx, field_name in TEXT_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        record[field_name] = str(value).strip() if value else None
-
-    # Date columns
-    for col_idx, field_name in DATE_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        record[field_name] = parse_date(value)
-
-    # Numeric columns
-    for col_idx, field_name in NUMERIC_COLUMNS.items():
-        value = get_cell_value(row, col_idx)
-        record[field_name] = parse_number(value)
+    # Text, date and numeric columns
+    (original_insured_name, broker_name, cedant_name, contract_number,
+     type_of_cover, class_of_cover, risk_description, industry, territory,
+     currency, inception_date, expiry_date, limit_of_liability, deductible,
+     our_share, gross_premium, commission_percent, net_premium) = read_columns(row)
 
     # Structure
-    structure_value = get_cell_value(row, STRUCTURE_COLUMN)
-    record['structure'] = parse_structure(structure_value)
+    structure = parse_structure(row[STRUCTURE_COLUMN])
 
     # Concatenate notes columns
-    notes_parts = []
-    for col_idx in NOTES_COLUMNS:
-        value = get_cell_value(row, col_idx)
-        if value:
-            notes_parts.append(str(value).strip())
-    record['notes'] = " | ".join(notes_parts) if notes_parts else None
-
-    # Skip empty rows
-    if not record.get('cedant_name') and not record.get('contract_number') and not record.get('original_insured_name'):
-        return None
+    notes_parts = [str(row[col_idx]).strip() for col_idx in NOTES_COLUMNS if row[col_idx]]
+    notes = " | ".join(notes_parts) if notes_parts else None
 
     # Derived fields
-    record['origin'] = determine_origin(record.get('territory'), record.get('currency'))
-    record['type'] = 'FAC'  # Always FAC for imported data
-    record['status'] = 'ACTIVE'
-    record['cedant_country'] = record.get('territory')
+    origin = determine_origin(territory, currency)
 
     # Extract UW year from inception date
-    if record.get('inception_date'):
+    uw_year = DEFAULT_UW_YEAR
+    if inception_date:
         try:
-            year = int(record['inception_date'][:4])
-            record['uw_year'] = year
+            uw_year = int(inception_date[:4])
         except (ValueError, TypeError):
-            record['uw_year'] = datetime.now().year
-    else:
-        record['uw_year'] = datetime.now().year
+            pass
 
     # Required field fallbacks with warnings
-    if not record.get('contract_number'):
-        record['contract_number'] = f"IMPORT-{row_number}"
+    if not contract_number:
+        contract_number = f"IMPORT-{row_number}"
         warnings.append(f"Row {row_number}: Missing contract_number, using IMPORT-{row_number}")
 
-    if not record.get('cedant_name'):
-        record['cedant_name'] = "Unknown Cedant"
+    if not cedant_name:
+        cedant_name = "Unknown Cedant"
         warnings.append(f"Row {row_number}: Missing cedant_name, using 'Unknown Cedant'")
 
-    if not record.get('type_of_cover'):
-        record['type_of_cover'] = "Property"
+    if not type_of_cover:
+        type_of_cover = "Property"
         warnings.append(f"Row {row_number}: Missing type_of_cover, using 'Property'")
 
-    if not record.get('class_of_cover'):
-        record['class_of_cover'] = "All Risks"
+    if not class_of_cover:
+        class_of_cover = "All Risks"
         warnings.append(f"Row {row_number}: Missing class_of_cover, using 'All Risks'")
 
-    today = datetime.now().strftime("%Y-%m-%d")
-    next_year = (datetime.now() + timedelta(days=365)).strftime("%Y-%m-%d")
-
-    if not record.get('inception_date'):
-        record['inception_date'] = today
+    if not inception_date:
+        inception_date = DEFAULT_INCEPTION
         warnings.append(f"Row {row_number}: Missing inception_date, using today")
 
-    if not record.get('expiry_date'):
-        record['expiry_date'] = next_year
+    if not expiry_date:
+        expiry_date = DEFAULT_EXPIRY
         warnings.append(f"Row {row_number}: Missing expiry_date, using today+365")
 
     # Default currency
-    if not record.get('currency'):
-        record['currency'] = 'USD'
+    if not currency:
+        currency = 'USD'
 
     # Default numeric fields
-    if record.get('limit_of_liability') is None:
-        record['limit_of_liability'] = 0
-    if record.get('gross_premium') is None:
-        record['gross_premium'] = 0
-    if record.get('our_share') is None:
-        record['our_share'] = 100
+    if limit_of_liability is None:
+        limit_of_liability = 0
+    if gross_premium is None:
+        gross_premium = 0
+    if our_share is None:
+        our_share = 100
 
     # Print warnings
     for warning in warnings:
         print(f"    {warning}")
 
-    return record
+    return [
+        original_insured_name, broker_name, cedant_name, contract_number,
+        type_of_cover, class_of_cover, risk_description, industry, territory,
+        currency, inception_date, expiry_date, limit_of_liability, deductible,
+        our_share, gross_premium, commission_percent, net_premium,
+        structure, notes, origin,
+        'FAC',  # type: always FAC for imported data
+        'ACTIVE',  # status
+        territory,  # cedant_country
+        uw_year,
+    ]
+
+
+def to_record(values: List[Any]) -> Dict[str, Any]:
+    """Turn a parsed row (values in FIELD_ORDER) into an inward_reinsurance dict."""
+    return dict(zip(FIELD_ORDER, values))
+
+
+read_columns = _build_column_reader()
+
+
+def cell_values(row: List[Any]) -> List[Any]:
+    """Unwrap a pyxlsb row to its cell values, padded with None to ROW_WIDTH."""
+    values = [cell.v for cell in row]
+    if len(values) < ROW_WIDTH:
+        values.extend([None] * (ROW_WIDTH - len(values)))
+    return values
+
+
+def parse_chunk(chunk: List[Tuple[int, List[Any]]]) -> Tuple[List[List[Any]], int, str]:
+    """Parse (row number, cell values) pairs; runs in a worker process.
+
+    Warnings are captured and returned so the parent can print them in row
+    order. Returns (records, skipped_count, log).
+    """
+    records: List[List[Any]] = []
+    skipped = 0
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        for row_number, values in chunk:
+            record = parse_row(values, row_number)
+            if record:
+                records.append(record)
+            else:
+                skipped += 1
+    return records, skipped, log.getvalue()
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield lists of up to ``size`` consecutive items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def map_in_order(executor: Executor, fn: Callable, items: Iterable[Any], window: int) -> Iterator[Any]:
+    """Like executor.map, but submits at most ``window`` items ahead of the
+    results consumed, so a streamed input is never held in memory all at once."""
+    in_flight: Deque[Future] = deque()
+    for item in items:
+        in_flight.append(executor.submit(fn, item))
+        if len(in_flight) >= window:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+# ==============================================================================
+# Database Loading
+# ==============================================================================
+
+def insert_batch(supabase: Client, rows: List[List[Any]]) -> Tuple[int, List[Dict[str, str]], List[str]]:
+    """Insert one batch, retrying row by row to isolate bad records if it fails.
+
+    Runs on a worker thread, so log lines are returned rather than printed.
+    Returns (inserted_count, error_records, messages).
+    """
+    batch = [to_record(values) for values in rows]
+    try:
+        supabase.table("inward_reinsurance").insert(batch).execute()
+        return len(batch), [], [f"OK ({len(batch)} records)"]
+    except Exception as e:
+        messages = ["FAILED", f"    Error: {e}", "    Retrying row-by-row..."]
+
+    inserted_count = 0
+    error_records: List[Dict[str, str]] = []
+    for record in batch:
+        try:
+            supabase.table("inward_reinsurance").insert(record).execute()
+            inserted_count += 1
+        except Exception as row_error:
+            error_records.append({
+                "contract_number": record.get("contract_number"),
+                "error": str(row_error)[:200]
+            })
+            messages.append(f"      Failed: {record.get('contract_number')} - {str(row_error)[:100]}")
+
+    return inserted_count, error_records, messages
+
+
+def copy_records(rows: List[List[Any]]) -> int:
+    """Load parsed rows with COPY FROM STDIN in a single transaction.
+
+    Rows are already in FIELD_ORDER, so they are written as-is. Any failure
+    rolls back the whole load. Returns the number of rows copied.
+    """
+    try:
+        import psycopg
+    except ImportError as e:
+        raise RuntimeError("DATABASE_URL is set but psycopg is missing: pip install 'psycopg[binary]'") from e
+
+    column_list = ", ".join(f'"{field}"' for field in FIELD_ORDER)
+
+    # The connection block commits on success and rolls back on any error
+    with psycopg.connect(DATABASE_URL) as conn:
+        with conn.cursor() as cur:
+            with cur.copy(f'COPY "inward_reinsurance" ({column_list}) FROM STDIN') as copy:
+                for values in rows:
+                    copy.write_row(values)
+
+    return len(rows)
 
 
 # ==============================================================================
@@ -371,7 +624,7 @@ def main():
     # Step 1: Decrypt Excel file
     print("Step 1: Decrypting Excel file...")
     try:
-        decrypted_path = decrypt_xlsb(EXCEL_FILE, EXCEL_PASSWORD)
+        workbook_source = decrypt_xlsb(EXCEL_FILE, EXCEL_PASSWORD)
     except Exception as e:
         print(f"ERROR: Failed to decrypt file: {e}")
         sys.exit(1)
@@ -379,7 +632,7 @@ def main():
     # Step 2: Open workbook and find sheet
     print("\nStep 2: Opening workbook...")
     try:
-        wb = open_workbook(decrypted_path)
+        wb = open_workbook(workbook_source)
         sheet, sheet_name = find_sheet(wb)
     except Exception as e:
         print(f"ERROR: Failed to open workbook: {e}")
@@ -387,26 +640,37 @@ def main():
 
     # Step 3: Find header row
     print("\nStep 3: Finding header row...")
-    rows = list(sheet.rows())
-    header_row_idx = find_header_row(sheet)
+    # Stream the sheet: only the leading rows are buffered for the header search
+    rows = iter(sheet.rows())
+    head = list(islice(rows, HEADER_SCAN_ROWS))
+    header_row_idx = find_header_row(head)
 
     # Step 4: Parse all rows
     print("\nStep 4: Parsing rows...")
-    parsed_records: List[Dict[str, Any]] = []
+    parsed_records: List[List[Any]] = []
     skipped_count = 0
 
-    for row_idx, row in enumerate(rows):
-        # Skip header and rows before it
-        if row_idx <= header_row_idx:
-            continue
-
-        row_number = row_idx + 1  # 1-indexed for display
-        record = parse_row(row, row_number)
-
-        if record:
-            parsed_records.append(record)
+    # Rows after the header as (1-indexed row number, plain cell values);
+    # unwrapping the pyxlsb cells makes the rows picklable for the workers
+    data_rows = (
+        (row_idx + 1, cell_values(row))
+        for row_idx, row in enumerate(chain(head, rows))
+        if row_idx > header_row_idx
+    )
+    chunks = chunked(data_rows, PARSE_CHUNK_ROWS)
+
+    with contextlib.ExitStack() as stack:
+        if PARSE_WORKERS > 1:
+            print(f"  Parsing in {PARSE_WORKERS} processes")
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=PARSE_WORKERS))
+            results = map_in_order(executor, parse_chunk, chunks, window=2 * PARSE_WORKERS)
         else:
-            skipped_count += 1
+            results = map(parse_chunk, chunks)
+
+        for records, skipped, log in results:
+            print(log, end="")
+            parsed_records.extend(records)
+            skipped_count += skipped
 
     print(f"\n  Parsed: {len(parsed_records)} records")
     print(f"  Skipped (empty): {skipped_count} rows")
@@ -417,61 +681,63 @@ def main():
         print("DRY RUN MODE - Saving preview to import_preview.json")
         print("=" * 60)
 
-        preview_data = parsed_records[:PREVIEW_ROWS]
-        with open("import_preview.json", "w", encoding="utf-8") as f:
-            json.dump(preview_data, f, indent=2, ensure_ascii=False, default=str)
+        preview_data = [to_record(values) for values in parsed_records[:PREVIEW_ROWS]]
+        if orjson is not None:
+            data = orjson.dumps(preview_data, option=orjson.OPT_INDENT_2, default=str)
+        else:
+            data = json.dumps(preview_data, indent=2, ensure_ascii=False, default=str).encode("utf-8")
+
+        with open("import_preview.json", "wb") as f:
+            f.write(data)
 
         print(f"\nPreview saved: {len(preview_data)} records")
         print("Review import_preview.json, then set DRY_RUN=false to import")
-
-        # Clean up decrypted file if different from original
-        if decrypted_path != EXCEL_FILE and os.path.exists(decrypted_path):
-            os.remove(decrypted_path)
-
         return
 
-    # Step 5: Connect to Supabase
-    print("\nStep 5: Connecting to Supabase...")
-    try:
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-    except Exception as e:
-        print(f"ERROR: Failed to connect to Supabase: {e}")
-        sys.exit(1)
-
-    # Step 6: Batch insert
-    print(f"\nStep 6: Inserting records in batches of {BATCH_SIZE}...")
     inserted_count = 0
-    error_count = 0
     error_records: List[Dict] = []
+    loaded = False
 
-    for batch_start in range(0, len(parsed_records), BATCH_SIZE):
-        batch_end = min(batch_start + BATCH_SIZE, len(parsed_records))
-        batch = parsed_records[batch_start:batch_end]
-        batch_num = (batch_start // BATCH_SIZE) + 1
-
-        print(f"  Batch {batch_num}: rows {batch_start + 1} - {batch_end}...", end=" ")
+    if DATABASE_URL:
+        # Step 5: Load directly into Postgres
+        print("\nStep 5: Loading records with COPY (DATABASE_URL)...")
+        try:
+            inserted_count = copy_records(parsed_records)
+            print(f"  Copied {inserted_count} records")
+            loaded = True
+        except Exception as e:
+            print(f"  COPY failed, nothing loaded: {str(e)[:200]}")
+            print(f"  Falling back to PostgREST inserts...")
 
+    if not loaded:
+        # Step 5: Connect to Supabase
+        print("\nStep 5: Connecting to Supabase...")
         try:
-            result = supabase.table("inward_reinsurance").insert(batch).execute()
-            inserted_count += len(batch)
-            print(f"OK ({len(batch)} records)")
+            supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
         except Exception as e:
-            print(f"FAILED")
-            print(f"    Error: {e}")
-
-            # Retry row by row to isolate bad records
-            print(f"    Retrying row-by-row...")
-            for record in batch:
-                try:
-                    supabase.table("inward_reinsurance").insert(record).execute()
-                    inserted_count += 1
-                except Exception as row_error:
-                    error_count += 1
-                    error_records.append({
-                        "contract_number": record.get("contract_number"),
-                        "error": str(row_error)[:200]
-                    })
-                    print(f"      Failed: {record.get('contract_number')} - {str(row_error)[:100]}")
+            print(f"ERROR: Failed to connect to Supabase: {e}")
+            sys.exit(1)
+
+        # Step 6: Batch insert
+        print(f"\nStep 6: Inserting records in batches of {BATCH_SIZE}...")
+        batch_starts = range(0, len(parsed_records), BATCH_SIZE)
+
+        # Up to INSERT_CONCURRENCY batches are in flight; results print in batch order
+        with ThreadPoolExecutor(max_workers=INSERT_CONCURRENCY) as executor:
+            results = executor.map(
+                lambda batch_start: insert_batch(supabase, parsed_records[batch_start:batch_start + BATCH_SIZE]),
+                batch_starts
+            )
+            for batch_start, (inserted, batch_errors, messages) in zip(batch_starts, results):
+                batch_end = min(batch_start + BATCH_SIZE, len(parsed_records))
+                batch_num = (batch_start // BATCH_SIZE) + 1
+                print(f"  Batch {batch_num}: rows {batch_start + 1} - {batch_end}... {messages[0]}")
+                for message in messages[1:]:
+                    print(message)
+                inserted_count += inserted
+                error_records.extend(batch_errors)
+
+    error_count = len(error_records)
 
     # Summary
     print("\n" + "=" * 60)
@@ -489,10 +755,6 @@ def main():
         if len(error_records) > 10:
             print(f"  ... and {len(error_records) - 10} more")
 
-    # Clean up
-    if decrypted_path != EXCEL_FILE and os.path.exists(decrypted_path):
-        os.remove(decrypted_path)
-
 
 if __name__ == "__main__":
     main()
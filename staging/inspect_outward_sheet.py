@@ -9,14 +9,13 @@ Usage:
 
 import os
 import sys
-import tempfile
 
 from dotenv import load_dotenv
 load_dotenv()
 
 try:
-    import msoffcrypto
     from pyxlsb import open_workbook
+    from _xlsb_utils import decrypt_xlsb
 except ImportError as e:
     print(f"Missing required package: {e}")
     print("Install with: pip install pyxlsb msoffcrypto-tool python-dotenv")
@@ -27,30 +26,15 @@ EXCEL_FILE = sys.argv[1] if len(sys.argv) > 1 else os.getenv("EXCEL_FILE", "Rein
 EXCEL_PASSWORD = os.getenv("EXCEL_PASSWORD", "0110")
 
 
-def decrypt_xlsb(file_path: str, password: str = "") -> str:
-    """Decrypt an encrypted .xlsb file."""
-    decrypted_path = tempfile.mktemp(suffix=".xlsb")
-
-    with open(file_path, "rb") as f:
-        file = msoffcrypto.OfficeFile(f)
-        if not file.is_encrypted():
-            return file_path
-        file.load_key(password=password)
-        with open(decrypted_path, "wb") as out:
-            file.decrypt(out)
-
-    return decrypted_path
-
-
 def main():
     if not os.path.exists(EXCEL_FILE):
         print(f"ERROR: Excel file not found: {EXCEL_FILE}")
         sys.exit(1)
 
     print(f"Opening: {EXCEL_FILE}")
-    decrypted_path = decrypt_xlsb(EXCEL_FILE, EXCEL_PASSWORD)
+    workbook_source = decrypt_xlsb(EXCEL_FILE, EXCEL_PASSWORD)
 
-    wb = open_workbook(decrypted_path)
+    wb = open_workbook(workbook_source)
     print(f"Available sheets: {wb.sheets}")
 
     # Find Outward sheet
@@ -138,10 +122,6 @@ def main():
                 val_repr = repr(val)[:50]
                 print(f"  Col {col_idx:2d}{header_name}: {val_repr}")
 
-    # Cleanup
-    if decrypted_path != EXCEL_FILE and os.path.exists(decrypted_path):
-        os.remove(decrypted_path)
-
     print(f"\n\n{'='*80}")
     print("Use the column indices above to build the correct mapping.")
     print(f"{'='*80}\n")
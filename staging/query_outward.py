@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 """Query OUTWARD records from database to see incorrectly imported data."""
 
+import http.client
 import json
 import os
-import urllib.request
+from urllib.parse import urlencode, urlsplit
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -11,15 +12,44 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL", "https://jwauzanxuwmwvvkojwmx.supabase.co")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
 
-url = f"{SUPABASE_URL}/rest/v1/policies?recordType=eq.OUTWARD&limit=3"
+FIELDS = ["policyNumber", "insuredName", "brokerName", "currency", "territory",
+          "classOfInsurance", "typeOfInsurance", "slipNumber", "reinsurerName",
+          "accountingCode", "secondaryPolicyNumber",
+          "sumInsured", "grossPremium", "cededShare"]
 
-req = urllib.request.Request(url)
-req.add_header("apikey", SUPABASE_SERVICE_KEY)
-req.add_header("Authorization", f"Bearer {SUPABASE_SERVICE_KEY}")
-req.add_header("Content-Type", "application/json")
+HEADERS = {
+    "apikey": SUPABASE_SERVICE_KEY,
+    "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
+    "Content-Type": "application/json",
+}
 
-with urllib.request.urlopen(req) as response:
-    data = json.loads(response.read().decode())
+
+def get_json(conn: http.client.HTTPConnection, table: str, params: dict):
+    """GET a PostgREST table query on an open connection and decode the JSON body.
+
+    The connection is kept alive, so further queries skip the TLS handshake.
+    """
+    conn.request("GET", f"/rest/v1/{table}?{urlencode(params)}", headers=HEADERS)
+    response = conn.getresponse()
+    body = response.read()
+    if response.status >= 400:
+        raise RuntimeError(f"HTTP {response.status}: {body.decode()[:200]}")
+    return json.loads(body)
+
+
+parts = urlsplit(SUPABASE_URL)
+connection_class = http.client.HTTPConnection if parts.scheme == "http" else http.client.HTTPSConnection
+conn = connection_class(parts.netloc)
+
+try:
+    # Only the printed columns are selected
+    data = get_json(conn, "policies", {
+        "select": ",".join(FIELDS),
+        "recordType": "eq.OUTWARD",
+        "limit": 3,
+    })
+finally:
+    conn.close()
 
 if not data:
     print("No OUTWARD records found in database")
@@ -27,10 +57,7 @@ else:
     print(f"Found {len(data)} sample OUTWARD records:\n")
     for i, rec in enumerate(data):
         print(f"Record {i+1}:")
-        for key in ["policyNumber", "insuredName", "brokerName", "currency", "territory",
-                    "classOfInsurance", "typeOfInsurance", "slipNumber", "reinsurerName",
-                    "accountingCode", "secondaryPolicyNumber",
-                    "sumInsured", "grossPremium", "cededShare"]:
+        for key in FIELDS:
             val = rec.get(key)
             if val is not None and val != "":
                 print(f"  {key}: {repr(val)[:80]}")
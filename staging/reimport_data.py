@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Mosaic ERP: Data Re-Import Script
-Reads the password-protected XLSB workbook and generates SQL INSERT files.
+Reads the password-protected XLSB workbook and generates SQL files that load
+each sheet with COPY ... FROM STDIN (run them with psql -f).
 
 Usage:
     python3 reimport_data.py
@@ -14,10 +15,13 @@ Output files (in same directory as this script):
 """
 
 import msoffcrypto
-import io
 import os
+import re
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pyxlsb import open_workbook
 
 # ── Configuration ──
@@ -25,6 +29,8 @@ from pyxlsb import open_workbook
 XLSB_PATH = '/home/user/InsurTech/staging/Reinsurance_Portfolio_-2021-2026.xlsb'
 PASSWORD = '0110'
 OUTPUT_DIR = '/mnt/user-data/outputs'
+ROW_COUNT_WIDTH = 10  # characters reserved for the row count in each file header
+WRITE_BUFFER_SIZE = 1 << 17  # bytes buffered per output file between writes to disk
 
 # Sheet names (note: Slıp uses Turkish dotless-ı and №)
 SHEET_DIRECT = 'Insurance Contracts'
@@ -41,9 +47,19 @@ DOMESTIC_KEYWORDS = [
     'SAGDIANA', 'TEMIRYOL', 'AGROMIR',
 ]
 
+# All keywords as one alternation, searched in a single pass over the
+# upper-cased name
+_DOMESTIC_RE = re.compile("|".join(re.escape(kw) for kw in DOMESTIC_KEYWORDS))
+
 
 # ── Helpers ──
 
+@lru_cache(maxsize=8192)
+def _serial_to_date(s):
+    """Format an in-range Excel serial as YYYY-MM-DD (cached; dates repeat a lot)."""
+    return (datetime(1899, 12, 30) + timedelta(days=s)).strftime('%Y-%m-%d')
+
+
 def excel_date(serial):
     """Convert Excel serial number to YYYY-MM-DD string."""
     if serial is None or serial == '' or serial == 0:
@@ -52,7 +68,7 @@ def excel_date(serial):
         s = float(serial)
         if s < 1 or s > 100000:
             return None
-        return (datetime(1899, 12, 30) + timedelta(days=s)).strftime('%Y-%m-%d')
+        return _serial_to_date(s)
     except (ValueError, TypeError, OverflowError):
         return None
 
@@ -70,6 +86,16 @@ def safe_num(val):
 
 def safe_int(val):
     """Convert value to int, return None if not numeric."""
+    # pyxlsb reads every number as a float; truncate it directly
+    if type(val) is float:
+        return int(val)
+    if isinstance(val, int) and not isinstance(val, bool):
+        return val
+    if isinstance(val, str):
+        try:
+            return int(val)
+        except ValueError:
+            pass
     n = safe_num(val)
     if n is None:
         return None
@@ -86,84 +112,140 @@ def safe_str(val):
     return s
 
 
-def sql_str(val):
-    """Format a value for SQL: 'escaped_string' or NULL."""
+_TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+_TSV_SPECIAL_RE = re.compile(r'[\\\t\n\r]')
+
+
+def tsv_str(val):
+    """Format a value as a COPY text field: escaped string or \\N."""
     s = safe_str(val)
     if s is None:
-        return 'NULL'
-    # Escape single quotes
-    s = s.replace("'", "''")
-    return f"'{s}'"
+        return '\\N'
+    # Most cells need no escaping; a regex scan is cheaper than translate()
+    if _TSV_SPECIAL_RE.search(s) is None:
+        return s
+    return s.translate(_TSV_ESCAPES)
+
+
+@lru_cache(maxsize=4096, typed=True)
+def tsv_label(val):
+    """tsv_str() for low-cardinality columns (currency, broker, cedant, class...).
 
+    Cached on the raw cell value, typed so that 1 and 1.0 stay distinct.
+    """
+    return tsv_str(val)
 
-def sql_num(val):
-    """Format a numeric value for SQL: number or NULL."""
+
+def tsv_num(val):
+    """Format a numeric value as a COPY text field: number or \\N."""
     n = safe_num(val)
     if n is None:
-        return 'NULL'
+        return '\\N'
     return str(n)
 
 
-def sql_int(val):
-    """Format an integer value for SQL: int or NULL."""
+def tsv_int(val):
+    """Format an integer value as a COPY text field: int or \\N."""
     n = safe_int(val)
     if n is None:
-        return 'NULL'
+        return '\\N'
     return str(n)
 
 
-def sql_date(serial):
-    """Convert Excel serial to SQL date literal or NULL."""
+def tsv_date(serial):
+    """Convert Excel serial to a COPY date field or \\N."""
     d = excel_date(serial)
     if d is None:
-        return 'NULL'
-    return f"'{d}'"
-
-
-def sql_bool(val):
-    """Format a boolean for SQL."""
-    if val is None:
-        return 'false'
-    return 'true' if val else 'false'
+        return '\\N'
+    return d
 
 
 def is_domestic_cedant(cedant_name):
     """Check if a cedant name matches domestic insurance companies."""
     if not cedant_name:
         return False
-    upper = cedant_name.upper()
-    return any(kw in upper for kw in DOMESTIC_KEYWORDS)
+    return _DOMESTIC_RE.search(cedant_name.upper()) is not None
 
 
-def col(row, idx):
-    """Safely get column value from a row by index."""
-    if idx < len(row):
-        return row[idx]
-    return None
 
+def decrypt_workbook(path, password, dest_path):
+    """Decrypt password-protected XLSB into the file at dest_path.
 
-def decrypt_workbook(path, password):
-    """Decrypt password-protected XLSB and return BytesIO."""
+    Writing to disk rather than a BytesIO keeps the decrypted workbook out of
+    process memory; pyxlsb reads it back through the OS page cache.
+    """
     print(f"Decrypting {path}...")
-    with open(path, 'rb') as f:
-        decrypted = io.BytesIO()
+    with open(path, 'rb') as f, open(dest_path, 'wb') as decrypted:
         ms = msoffcrypto.OfficeFile(f)
         ms.load_key(password=password)
         ms.decrypt(decrypted)
     print("  Decrypted successfully.")
-    return decrypted
 
 
-def read_sheet(wb, sheet_name, skip_rows=2):
-    """Read all data rows from a sheet (skipping header rows)."""
-    rows = []
+def read_sheet(wb, sheet_name, width, key_col=1, skip_rows=2):
+    """Yield the data rows of a sheet (skipping header rows) as cell values.
+
+    Short rows are right-padded with None to width, so callers can index any
+    column below width directly. Rows missing from the file are not filled in
+    by pyxlsb (sparse=True), so header rows are skipped by their row number.
+    Rows with an empty key_col cell are yielded as None without building
+    their value list; callers count them as skipped.
+    """
     with wb.get_sheet(sheet_name) as sheet:
-        for i, row in enumerate(sheet.rows()):
-            if i < skip_rows:
+        for row in sheet.rows(sparse=True):
+            if row[0].r < skip_rows:
+                continue
+            if len(row) <= key_col or row[key_col].v is None or row[key_col].v == '':
+                yield None
                 continue
             vals = [c.v for c in row]
-            rows.append(vals)
-    return rows
+            if len(vals) < width:
+                vals.extend([None] * (width - len(vals)))
+            yield vals
+
+
+def spec_width(spec):
+    """Row width needed to index every cell a sheet spec reads."""
+    return max(idx for _, idx, _ in spec if idx is not None) + 1
+
+
+def row_fields(row, spec):
+    """Format one sheet row as COPY fields, following a sheet spec.
+
+    Rows must be padded to spec_width(spec) by read_sheet(). Spec entries
+    are (column name, cell index, formatter) for a single cell,
+    (column name, None, formatter) for a formatter that reads the whole row,
+    and (column name, None, 'text') for a constant field.
+    """
+    fields = []
+    for _, idx, fmt in spec:
+        if idx is not None:
+            fields.append(fmt(row[idx]))
+        elif fmt.__class__ is str:
+            fields.append(fmt)
+        else:
+            fields.append(fmt(row))
+    return fields
+
+
+def copy_start(out, table, spec):
+    """Open a COPY block for the spec's columns of table.
+
+    COPY data can't call gen_random_uuid() or NOW(), so rows are copied into
+    a column-only temp table and inserted from there by copy_end().
+    """
+    columns = ", ".join(name for name, _, _ in spec)
+    out.write(f"CREATE TEMP TABLE _import_{table} ON COMMIT DROP AS\n")
+    out.write(f"SELECT {columns}\nFROM {table} WITH NO DATA;\n\n")
+    out.write(f"COPY _import_{table} ({columns}) FROM STDIN;\n")
+
+
+def copy_end(out, table, spec):
+    """Close a COPY block and insert its rows with fresh ids and timestamps."""
+    columns = ", ".join(name for name, _, _ in spec)
+    out.write("\\.\n\n")
+    out.write(f"INSERT INTO {table} (id, {columns}, created_at, updated_at)\n")
+    out.write(f"SELECT gen_random_uuid(), {columns}, NOW(), NOW()\nFROM _import_{table};\n\n")
 
 
 def find_slip_sheet(wb):
@@ -177,308 +259,372 @@ def find_slip_sheet(wb):
 
 # ── Insurance Contracts → policies (recordType='Direct') ──
 
-def generate_direct_inserts(wb):
-    """Generate INSERT statements for direct insurance contracts."""
+def intermediary_type(broker):
+    """'Broker' when the contract has a broker, otherwise 'Direct'."""
+    return 'Broker' if safe_str(broker) else 'Direct'
+
+
+DIRECT_TABLE = 'policies'
+DIRECT_SPEC = (
+    ('"recordType"', None, 'Direct'),
+    ('channel', None, 'Direct'),
+    ('"intermediaryType"', 3, intermediary_type),
+    ('"insuredName"', 1, tsv_str),
+    ('industry', 2, tsv_label),
+    ('"intermediaryName"', 3, tsv_label),
+    ('"brokerName"', 3, tsv_label),
+    ('"policyNumber"', 4, tsv_str),
+    ('"accountingDate"', 5, tsv_date),
+    ('"classOfInsurance"', 6, tsv_label),
+    ('"typeOfInsurance"', 7, tsv_label),
+    ('"secondaryPolicyNumber"', 8, tsv_str),
+    ('"riskCode"', 9, tsv_label),
+    ('territory', 10, tsv_label),
+    ('city', 11, tsv_label),
+    ('currency', 12, tsv_label),
+    ('"exchangeRate"', 13, tsv_num),
+    ('"sumInsured"', 15, tsv_num),
+    ('"sumInsuredNational"', 16, tsv_num),
+    ('"premiumRate"', 17, tsv_num),
+    ('"grossPremium"', 18, tsv_num),
+    ('"grossPremiumNational"', 19, tsv_num),
+    ('"inceptionDate"', 20, tsv_date),
+    ('"expiryDate"', 21, tsv_date),
+    ('"insuranceDays"', 22, tsv_int),
+    ('"ourShare"', 26, tsv_num),
+    ('"warrantyPeriod"', 23, tsv_int),
+    ('"premiumPaymentDate"', 29, tsv_date),
+    ('"receivedPremiumForeign"', 32, tsv_num),
+    ('"receivedPremiumCurrency"', 33, tsv_label),
+    ('"receivedPremiumExchangeRate"', 34, tsv_num),
+    ('"receivedPremiumNational"', 35, tsv_num),
+    ('"actualPaymentDate"', 36, tsv_date),
+    ('"numberOfSlips"', 64, tsv_int),
+    ('status', None, 'Active'),
+    ('"isDeleted"', None, 'f'),
+    ('"hasOutwardReinsurance"', None, 'f'),
+)
+DIRECT_WIDTH = spec_width(DIRECT_SPEC)
+
+
+def generate_direct_inserts(wb, out):
+    """Write the COPY block for direct insurance contracts to out; returns the row count."""
     print(f"\nReading sheet: {SHEET_DIRECT}")
-    rows = read_sheet(wb, SHEET_DIRECT)
+    rows = read_sheet(wb, SHEET_DIRECT, DIRECT_WIDTH)
 
-    inserts = []
+    copy_start(out, DIRECT_TABLE, DIRECT_SPEC)
+    count = 0
     skipped = 0
 
     for row in rows:
-        insured = safe_str(col(row, 1))
-        if not insured:
+        if row is None or not safe_str(row[1]):
             skipped += 1
             continue
 
-        policy_number = safe_str(col(row, 4))
+        policy_number = safe_str(row[4])
         if not policy_number:
             skipped += 1
             continue
 
-        inserts.append(
-            f"""INSERT INTO policies (
-    id, "recordType", channel, "intermediaryType",
-    "insuredName", industry, "intermediaryName", "brokerName",
-    "policyNumber", "accountingDate", "classOfInsurance", "typeOfInsurance",
-    "secondaryPolicyNumber", "riskCode", territory, city,
-    currency, "exchangeRate",
-    "sumInsured", "sumInsuredNational",
-    "premiumRate", "grossPremium", "grossPremiumNational",
-    "inceptionDate", "expiryDate", "insuranceDays",
-    "ourShare", "warrantyPeriod",
-    "premiumPaymentDate",
-    "receivedPremiumForeign", "receivedPremiumCurrency",
-    "receivedPremiumExchangeRate", "receivedPremiumNational",
-    "actualPaymentDate", "numberOfSlips",
-    status, "isDeleted", "hasOutwardReinsurance",
-    created_at, updated_at
-) VALUES (
-    gen_random_uuid(), 'Direct', 'Direct', {sql_str(safe_str(col(row, 3)) and 'Broker' or 'Direct')},
-    {sql_str(col(row, 1))}, {sql_str(col(row, 2))}, {sql_str(col(row, 3))}, {sql_str(col(row, 3))},
-    {sql_str(col(row, 4))}, {sql_date(col(row, 5))}, {sql_str(col(row, 6))}, {sql_str(col(row, 7))},
-    {sql_str(col(row, 8))}, {sql_str(col(row, 9))}, {sql_str(col(row, 10))}, {sql_str(col(row, 11))},
-    {sql_str(col(row, 12))}, {sql_num(col(row, 13))},
-    {sql_num(col(row, 15))}, {sql_num(col(row, 16))},
-    {sql_num(col(row, 17))}, {sql_num(col(row, 18))}, {sql_num(col(row, 19))},
-    {sql_date(col(row, 20))}, {sql_date(col(row, 21))}, {sql_int(col(row, 22))},
-    {sql_num(col(row, 26))}, {sql_int(col(row, 23))},
-    {sql_date(col(row, 29))},
-    {sql_num(col(row, 32))}, {sql_str(col(row, 33))},
-    {sql_num(col(row, 34))}, {sql_num(col(row, 35))},
-    {sql_date(col(row, 36))}, {sql_int(col(row, 64))},
-    'Active', false, false,
-    NOW(), NOW()
-);"""
-        )
-
-    print(f"  Generated {len(inserts)} inserts, skipped {skipped} empty rows")
-    return inserts
+        out.write("\t".join(row_fields(row, DIRECT_SPEC)))
+        out.write("\n")
+        count += 1
+
+    copy_end(out, DIRECT_TABLE, DIRECT_SPEC)
+
+    print(f"  Generated {count} rows, skipped {skipped} empty rows")
+    return count
 
 
 # ── Outward → policies (recordType='OUTWARD') ──
 
-def generate_outward_inserts(wb):
-    """Generate INSERT statements for outward reinsurance cessions."""
+OUTWARD_TABLE = 'policies'
+OUTWARD_SPEC = (
+    ('"recordType"', None, 'OUTWARD'),
+    ('channel', None, 'Outward'),
+    ('"intermediaryType"', None, 'Broker'),
+    ('"insuredName"', 1, tsv_str),
+    ('"intermediaryName"', 2, tsv_label),
+    ('"brokerName"', 2, tsv_label),
+    ('"reinsurerName"', 3, tsv_label),
+    ('"cedantName"', 4, tsv_label),
+    ('"policyNumber"', 6, tsv_str),
+    ('"dateOfSlip"', 7, tsv_date),
+    ('"accountingDate"', 8, tsv_date),
+    ('"classOfInsurance"', 9, tsv_label),
+    ('"typeOfInsurance"', 10, tsv_label),
+    ('"secondaryPolicyNumber"', 11, tsv_str),
+    ('"riskCode"', 12, tsv_label),
+    ('territory', 15, tsv_label),
+    ('city', 16, tsv_label),
+    ('currency', 17, tsv_label),
+    ('"exchangeRate"', 18, tsv_num),
+    ('"sumInsured"', 21, tsv_num),
+    ('"sumInsuredNational"', 22, tsv_num),
+    ('"premiumRate"', 23, tsv_num),
+    ('"fullPremiumForeign"', 24, tsv_num),
+    ('"fullPremiumNational"', 25, tsv_num),
+    ('"inceptionDate"', 26, tsv_date),
+    ('"expiryDate"', 27, tsv_date),
+    ('"insuranceDays"', 28, tsv_int),
+    ('"reinsuranceInceptionDate"', 29, tsv_date),
+    ('"reinsuranceExpiryDate"', 30, tsv_date),
+    ('"reinsuranceDays"', 31, tsv_int),
+    ('"reinsuranceType"', 32, tsv_label),
+    ('"limitForeignCurrency"', 33, tsv_num),
+    ('"excessForeignCurrency"', 35, tsv_num),
+    ('"cededShare"', 40, tsv_num),
+    ('"grossPremium"', 42, tsv_num),
+    ('"grossPremiumNational"', 43, tsv_num),
+    ('"selfRetention"', 45, tsv_num),
+    ('"sumReinsuredForeign"', 46, tsv_num),
+    ('"sumReinsuredNational"', 47, tsv_num),
+    ('"commissionPercent"', 48, tsv_num),
+    ('"reinsuranceCommission"', 49, tsv_num),
+    ('"commissionNational"', 50, tsv_num),
+    ('"taxPercent"', 51, tsv_num),
+    ('"netPremium"', 54, tsv_num),
+    ('"netPremiumNational"', 55, tsv_num),
+    ('"premiumPaymentDate"', 56, tsv_date),
+    ('"receivedPremiumForeign"', 59, tsv_num),
+    ('"receivedPremiumCurrency"', 60, tsv_label),
+    ('"receivedPremiumExchangeRate"', 61, tsv_num),
+    ('"receivedPremiumNational"', 62, tsv_num),
+    ('"actualPaymentDate"', 63, tsv_date),
+    ('"numberOfSlips"', 64, tsv_int),
+    ('"maxRetentionPerRisk"', 65, tsv_num),
+    ('"slipNumber"', 6, tsv_str),
+    ('status', None, 'Active'),
+    ('"isDeleted"', None, 'f'),
+    ('"hasOutwardReinsurance"', None, 'f'),
+)
+OUTWARD_WIDTH = spec_width(OUTWARD_SPEC)
+
+
+def generate_outward_inserts(wb, out):
+    """Write the COPY block for outward reinsurance cessions to out; returns the row count."""
     print(f"\nReading sheet: {SHEET_OUTWARD}")
-    rows = read_sheet(wb, SHEET_OUTWARD)
+    rows = read_sheet(wb, SHEET_OUTWARD, OUTWARD_WIDTH)
 
-    inserts = []
+    copy_start(out, OUTWARD_TABLE, OUTWARD_SPEC)
+    count = 0
     skipped = 0
 
     for row in rows:
-        insured = safe_str(col(row, 1))
-        if not insured:
+        if row is None or not safe_str(row[1]):
             skipped += 1
             continue
 
-        inserts.append(
-            f"""INSERT INTO policies (
-    id, "recordType", channel, "intermediaryType",
-    "insuredName", "intermediaryName", "brokerName",
-    "reinsurerName", "cedantName",
-    "policyNumber", "dateOfSlip", "accountingDate",
-    "classOfInsurance", "typeOfInsurance",
-    "secondaryPolicyNumber", "riskCode",
-    territory, city,
-    currency, "exchangeRate",
-    "sumInsured", "sumInsuredNational",
-    "premiumRate",
-    "fullPremiumForeign", "fullPremiumNational",
-    "inceptionDate", "expiryDate", "insuranceDays",
-    "reinsuranceInceptionDate", "reinsuranceExpiryDate", "reinsuranceDays",
-    "reinsuranceType",
-    "limitForeignCurrency",
-    "excessForeignCurrency",
-    "cededShare",
-    "grossPremium", "grossPremiumNational",
-    "selfRetention",
-    "sumReinsuredForeign", "sumReinsuredNational",
-    "commissionPercent", "reinsuranceCommission", "commissionNational",
-    "taxPercent",
-    "netPremium", "netPremiumNational",
-    "premiumPaymentDate",
-    "receivedPremiumForeign", "receivedPremiumCurrency",
-    "receivedPremiumExchangeRate", "receivedPremiumNational",
-    "actualPaymentDate",
-    "numberOfSlips", "maxRetentionPerRisk",
-    "slipNumber",
-    status, "isDeleted", "hasOutwardReinsurance",
-    created_at, updated_at
-) VALUES (
-    gen_random_uuid(), 'OUTWARD', 'Outward', 'Broker',
-    {sql_str(col(row, 1))}, {sql_str(col(row, 2))}, {sql_str(col(row, 2))},
-    {sql_str(col(row, 3))}, {sql_str(col(row, 4))},
-    {sql_str(col(row, 6))}, {sql_date(col(row, 7))}, {sql_date(col(row, 8))},
-    {sql_str(col(row, 9))}, {sql_str(col(row, 10))},
-    {sql_str(col(row, 11))}, {sql_str(col(row, 12))},
-    {sql_str(col(row, 15))}, {sql_str(col(row, 16))},
-    {sql_str(col(row, 17))}, {sql_num(col(row, 18))},
-    {sql_num(col(row, 21))}, {sql_num(col(row, 22))},
-    {sql_num(col(row, 23))},
-    {sql_num(col(row, 24))}, {sql_num(col(row, 25))},
-    {sql_date(col(row, 26))}, {sql_date(col(row, 27))}, {sql_int(col(row, 28))},
-    {sql_date(col(row, 29))}, {sql_date(col(row, 30))}, {sql_int(col(row, 31))},
-    {sql_str(col(row, 32))},
-    {sql_num(col(row, 33))},
-    {sql_num(col(row, 35))},
-    {sql_num(col(row, 40))},
-    {sql_num(col(row, 42))}, {sql_num(col(row, 43))},
-    {sql_num(col(row, 45))},
-    {sql_num(col(row, 46))}, {sql_num(col(row, 47))},
-    {sql_num(col(row, 48))}, {sql_num(col(row, 49))}, {sql_num(col(row, 50))},
-    {sql_num(col(row, 51))},
-    {sql_num(col(row, 54))}, {sql_num(col(row, 55))},
-    {sql_date(col(row, 56))},
-    {sql_num(col(row, 59))}, {sql_str(col(row, 60))},
-    {sql_num(col(row, 61))}, {sql_num(col(row, 62))},
-    {sql_date(col(row, 63))},
-    {sql_int(col(row, 64))}, {sql_num(col(row, 65))},
-    {sql_str(col(row, 6))},
-    'Active', false, false,
-    NOW(), NOW()
-);"""
-        )
-
-    print(f"  Generated {len(inserts)} inserts, skipped {skipped} empty rows")
-    return inserts
+        out.write("\t".join(row_fields(row, OUTWARD_SPEC)))
+        out.write("\n")
+        count += 1
+
+    copy_end(out, OUTWARD_TABLE, OUTWARD_SPEC)
+
+    print(f"  Generated {count} rows, skipped {skipped} empty rows")
+    return count
 
 
 # ── Outward RE Slip → slips table ──
 
-def generate_slip_inserts(wb):
-    """Generate INSERT statements for outward RE slips."""
+SLIP_TABLE = 'slips'
+SLIP_SPEC = (
+    ('"slipNumber"', 1, tsv_str),
+    ('date', 2, tsv_date),
+    ('"insuredName"', 3, tsv_str),
+    ('"brokerReinsurer"', 4, tsv_label),
+    ('currency', None, 'USD'),
+    ('"limitOfLiability"', None, '0'),
+    ('status', None, 'Active'),
+    ('"isDeleted"', None, 'f'),
+)
+SLIP_WIDTH = spec_width(SLIP_SPEC)
+
+
+def generate_slip_inserts(wb, out):
+    """Write the COPY block for outward RE slips to out; returns the row count."""
     slip_sheet = find_slip_sheet(wb)
     if not slip_sheet:
         print("\nWARNING: Slip sheet not found!")
-        return []
+        return 0
 
     print(f"\nReading sheet: {slip_sheet}")
-    rows = read_sheet(wb, slip_sheet)
+    rows = read_sheet(wb, slip_sheet, SLIP_WIDTH)
 
-    inserts = []
+    copy_start(out, SLIP_TABLE, SLIP_SPEC)
+    count = 0
     skipped = 0
 
     for row in rows:
-        slip_number = safe_str(col(row, 1))
-        if not slip_number:
+        if row is None or not safe_str(row[1]):
             skipped += 1
             continue
 
-        inserts.append(
-            f"""INSERT INTO slips (
-    id, "slipNumber", date, "insuredName", "brokerReinsurer",
-    currency, "limitOfLiability", status, "isDeleted",
-    created_at, updated_at
-) VALUES (
-    gen_random_uuid(), {sql_str(col(row, 1))}, {sql_date(col(row, 2))}, {sql_str(col(row, 3))}, {sql_str(col(row, 4))},
-    'USD', 0, 'Active', false,
-    NOW(), NOW()
-);"""
-        )
+        out.write("\t".join(row_fields(row, SLIP_SPEC)))
+        out.write("\n")
+        count += 1
+
+    copy_end(out, SLIP_TABLE, SLIP_SPEC)
 
-    print(f"  Generated {len(inserts)} inserts, skipped {skipped} empty rows")
-    return inserts
+    print(f"  Generated {count} rows, skipped {skipped} empty rows")
+    return count
 
 
 # ── Inward → inward_reinsurance ──
 
-def generate_inward_inserts(wb):
-    """Generate INSERT statements for inward reinsurance contracts."""
+@lru_cache(maxsize=1024, typed=True)
+def inward_origin(cedant):
+    """DOMESTIC for domestic cedants, otherwise FOREIGN.
+
+    Cached on the raw cell value: a few hundred cedants recur across every
+    inward contract, so each name is upper-cased and scanned only once.
+    """
+    return 'DOMESTIC' if is_domestic_cedant(safe_str(cedant)) else 'FOREIGN'
+
+
+@lru_cache(maxsize=64)
+def inward_structure(structure_raw):
+    """Determine structure from col 31 (cached; only a few labels are used)."""
+    su = safe_str(structure_raw)
+    if su:
+        su = su.upper().strip()
+        if su in ('XL', 'XOL', 'XS', 'EXCESS') or 'NON' in su or 'EXCESS' in su:
+            return 'NON_PROPORTIONAL'
+    return 'PROPORTIONAL'
+
+
+@lru_cache(maxsize=4096)
+def tsv_pct(val):
+    """Format a share/commission/tax value as a percentage field.
+
+    Decimals are normalized to percentages for storage (the DB field is
+    numeric, app reads it as-is). Cached on the raw cell value, since the
+    same shares and rates recur across most contracts.
+    """
+    n = safe_num(val)
+    if n is None:
+        return '\\N'
+    return str(n if n > 1 else n * 100)
+
+
+def inward_type_of_cover(row):
+    """Combine type_of_cover from cols 11 and 12."""
+    type_part1 = safe_str(row[11])
+    type_part2 = safe_str(row[12])
+    if type_part1 and type_part2:
+        return tsv_str(f"{type_part1} / {type_part2}")
+    return tsv_str(type_part1 or type_part2)
+
+
+INWARD_TABLE = 'inward_reinsurance'
+INWARD_SPEC = (
+    ('original_insured_name', 1, tsv_str),
+    ('borrower', 3, tsv_label),
+    ('broker_name', 4, tsv_label),
+    ('cedant_name', 5, tsv_label),
+    ('retrocedent', 6, tsv_label),
+    ('contract_number', 7, tsv_str),
+    ('reference_link', 8, tsv_str),
+    ('date_of_slip', 9, tsv_date),
+    ('accounting_date', 10, tsv_date),
+    ('type_of_cover', None, inward_type_of_cover),
+    ('class_of_cover', 13, tsv_label),
+    ('risk_description', 14, tsv_str),
+    ('industry', 15, tsv_label),
+    ('territory', 16, tsv_label),
+    ('city', 17, tsv_label),
+    ('agreement_number', 18, tsv_str),
+    ('currency', 19, tsv_label),
+    ('exchange_rate', 20, tsv_num),
+    ('sum_insured_fc', 23, tsv_num),
+    ('sum_insured_uzs', 24, tsv_num),
+    ('inception_date', 25, tsv_date),
+    ('expiry_date', 26, tsv_date),
+    ('insurance_days', 27, tsv_int),
+    ('reinsurance_inception_date', 28, tsv_date),
+    ('reinsurance_expiry_date', 29, tsv_date),
+    ('reinsurance_days', 30, tsv_int),
+    ('structure', 31, inward_structure),
+    ('limit_of_liability', 32, tsv_num),
+    ('excess_point', 35, tsv_num),
+    ('premium_fc', 37, tsv_num),
+    ('premium_nc', 38, tsv_num),
+    ('our_share', 39, tsv_pct),
+    ('gross_premium', 41, tsv_num),
+    ('gross_premium_uzs', 42, tsv_num),
+    ('sum_reinsured_fc', 43, tsv_num),
+    ('sum_reinsured_uzs', 44, tsv_num),
+    ('commission_percent', 45, tsv_pct),
+    ('commission_nc', 46, tsv_num),
+    ('tax_percent', 47, tsv_pct),
+    ('net_premium', 48, tsv_num),
+    ('net_premium_uzs', 49, tsv_num),
+    ('premium_payment_date', 50, tsv_date),
+    ('received_premium_currency', 51, tsv_label),
+    ('equivalent_usd', 55, tsv_num),
+    ('received_premium_uzs', 56, tsv_num),
+    ('actual_payment_date', 57, tsv_date),
+    ('number_of_slips', 58, tsv_int),
+    ('origin', 5, inward_origin),
+    ('type', None, 'FAC'),  # Default; can be refined
+    ('status', None, 'ACTIVE'),
+    ('is_deleted', None, 'f'),
+)
+INWARD_WIDTH = spec_width(INWARD_SPEC)
+
+
+def generate_inward_inserts(wb, out):
+    """Write the COPY block for inward reinsurance contracts to out; returns the row count."""
     print(f"\nReading sheet: {SHEET_INWARD}")
-    rows = read_sheet(wb, SHEET_INWARD)
+    rows = read_sheet(wb, SHEET_INWARD, INWARD_WIDTH)
 
-    inserts = []
+    copy_start(out, INWARD_TABLE, INWARD_SPEC)
+    count = 0
     skipped = 0
 
     for row in rows:
-        insured = safe_str(col(row, 1))
-        if not insured:
+        if row is None or not safe_str(row[1]):
             skipped += 1
             continue
 
-        cedant = safe_str(col(row, 5))
-        is_domestic = is_domestic_cedant(cedant)
-        origin = 'DOMESTIC' if is_domestic else 'FOREIGN'
-        ir_type = 'FAC'  # Default; can be refined
-
-        # Determine structure from col 31
-        structure_raw = safe_str(col(row, 31))
-        if structure_raw:
-            su = structure_raw.upper().strip()
-            if su in ('XL', 'XOL', 'XS', 'EXCESS') or 'NON' in su or 'EXCESS' in su:
-                structure = 'NON_PROPORTIONAL'
-            else:
-                structure = 'PROPORTIONAL'
-        else:
-            structure = 'PROPORTIONAL'
+        out.write("\t".join(row_fields(row, INWARD_SPEC)))
+        out.write("\n")
+        count += 1
 
-        # our_share: normalize decimal to percentage for storage
-        our_share_raw = safe_num(col(row, 39))
-        if our_share_raw is not None:
-            # Store as percentage (the DB field is numeric, app reads it as-is)
-            our_share = our_share_raw if our_share_raw > 1 else our_share_raw * 100
-        else:
-            our_share = None
+    copy_end(out, INWARD_TABLE, INWARD_SPEC)
 
-        # commission_percent: normalize
-        comm_raw = safe_num(col(row, 45))
-        if comm_raw is not None:
-            comm_pct = comm_raw if comm_raw > 1 else comm_raw * 100
-        else:
-            comm_pct = None
+    print(f"  Generated {count} rows, skipped {skipped} empty rows")
+    return count
 
-        # tax_percent: normalize
-        tax_raw = safe_num(col(row, 47))
-        if tax_raw is not None:
-            tax_pct = tax_raw if tax_raw > 1 else tax_raw * 100
-        else:
-            tax_pct = None
 
-        # Combine type_of_cover from cols 11 and 12
-        type_part1 = safe_str(col(row, 11))
-        type_part2 = safe_str(col(row, 12))
-        if type_part1 and type_part2:
-            type_of_cover = f"{type_part1} / {type_part2}"
-        else:
-            type_of_cover = type_part1 or type_part2
-
-        inserts.append(
-            f"""INSERT INTO inward_reinsurance (
-    id, original_insured_name,
-    borrower, broker_name, cedant_name, retrocedent,
-    contract_number, reference_link,
-    date_of_slip, accounting_date,
-    type_of_cover, class_of_cover, risk_description, industry,
-    territory, city, agreement_number,
-    currency, exchange_rate,
-    sum_insured_fc, sum_insured_uzs,
-    inception_date, expiry_date, insurance_days,
-    reinsurance_inception_date, reinsurance_expiry_date, reinsurance_days,
-    structure, limit_of_liability,
-    excess_point,
-    premium_fc, premium_nc,
-    our_share,
-    gross_premium, gross_premium_uzs,
-    sum_reinsured_fc, sum_reinsured_uzs,
-    commission_percent, commission_nc,
-    tax_percent,
-    net_premium, net_premium_uzs,
-    premium_payment_date, received_premium_currency,
-    equivalent_usd, received_premium_uzs,
-    actual_payment_date, number_of_slips,
-    origin, type, status, is_deleted,
-    created_at, updated_at
-) VALUES (
-    gen_random_uuid(), {sql_str(col(row, 1))},
-    {sql_str(col(row, 3))}, {sql_str(col(row, 4))}, {sql_str(col(row, 5))}, {sql_str(col(row, 6))},
-    {sql_str(col(row, 7))}, {sql_str(col(row, 8))},
-    {sql_date(col(row, 9))}, {sql_date(col(row, 10))},
-    {sql_str(type_of_cover)}, {sql_str(col(row, 13))}, {sql_str(col(row, 14))}, {sql_str(col(row, 15))},
-    {sql_str(col(row, 16))}, {sql_str(col(row, 17))}, {sql_str(col(row, 18))},
-    {sql_str(col(row, 19))}, {sql_num(col(row, 20))},
-    {sql_num(col(row, 23))}, {sql_num(col(row, 24))},
-    {sql_date(col(row, 25))}, {sql_date(col(row, 26))}, {sql_int(col(row, 27))},
-    {sql_date(col(row, 28))}, {sql_date(col(row, 29))}, {sql_int(col(row, 30))},
-    {sql_str(structure)}, {sql_num(col(row, 32))},
-    {sql_num(col(row, 35))},
-    {sql_num(col(row, 37))}, {sql_num(col(row, 38))},
-    {sql_num(our_share)},
-    {sql_num(col(row, 41))}, {sql_num(col(row, 42))},
-    {sql_num(col(row, 43))}, {sql_num(col(row, 44))},
-    {sql_num(comm_pct)}, {sql_num(col(row, 46))},
-    {sql_num(tax_pct)},
-    {sql_num(col(row, 48))}, {sql_num(col(row, 49))},
-    {sql_date(col(row, 50))}, {sql_str(col(row, 51))},
-    {sql_num(col(row, 55))}, {sql_num(col(row, 56))},
-    {sql_date(col(row, 57))}, {sql_int(col(row, 58))},
-    '{origin}', '{ir_type}', 'ACTIVE', false,
-    NOW(), NOW()
-);"""
-        )
-
-    print(f"  Generated {len(inserts)} inserts, skipped {skipped} empty rows")
-    return inserts
+# ── Output ──
+
+def write_sql_file(filename, label, write_inserts):
+    """Write one SQL file in a single pass as write_inserts produces its rows.
+
+    The row count is only known at the end, so the header reserves
+    ROW_COUNT_WIDTH characters for it and the count is filled in afterwards.
+    """
+    filepath = os.path.join(OUTPUT_DIR, filename)
+    with open(filepath, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(f"-- {label}\n")
+        f.write(f"-- Generated: {datetime.now().isoformat()}\n")
+        f.write("-- Row count: ")
+        count_pos = f.tell()
+        f.write(" " * ROW_COUNT_WIDTH + "\n\n")
+        f.write("BEGIN;\n\n")
+        count = write_inserts(f)
+        f.write("COMMIT;\n")
+        f.seek(count_pos)
+        f.write(str(count).ljust(ROW_COUNT_WIDTH))
+    print(f"  {filepath}: {count} rows")
+    return count
+
+
+def write_sheet_file(workbook_path, filename, generate, label):
+    """Worker process: open the decrypted workbook and write one sheet's SQL file."""
+    with open_workbook(workbook_path) as wb:
+        return write_sql_file(filename, label, lambda out: generate(wb, out))
 
 
 # ── Main ──
@@ -488,53 +634,40 @@ def main():
     print("Mosaic ERP: Data Re-Import Script")
     print("=" * 60)
 
-    # Decrypt workbook
-    decrypted = decrypt_workbook(XLSB_PATH, PASSWORD)
-
-    with open_workbook(decrypted) as wb:
-        print(f"\nAvailable sheets: {wb.sheets}")
-
-        # Generate all inserts
-        direct_inserts = generate_direct_inserts(wb)
-        outward_inserts = generate_outward_inserts(wb)
-        slip_inserts = generate_slip_inserts(wb)
-        inward_inserts = generate_inward_inserts(wb)
-
-    # Write output files
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
     files = [
-        ('inserts_policies.sql', direct_inserts, 'Direct Insurance Contracts'),
-        ('inserts_outward.sql', outward_inserts, 'Outward Reinsurance Cessions'),
-        ('inserts_slips.sql', slip_inserts, 'Outward RE Slips'),
-        ('inserts_inward.sql', inward_inserts, 'Inward Reinsurance Contracts'),
+        ('inserts_policies.sql', generate_direct_inserts, 'Direct Insurance Contracts'),
+        ('inserts_outward.sql', generate_outward_inserts, 'Outward Reinsurance Cessions'),
+        ('inserts_slips.sql', generate_slip_inserts, 'Outward RE Slips'),
+        ('inserts_inward.sql', generate_inward_inserts, 'Inward Reinsurance Contracts'),
     ]
 
-    print(f"\n{'=' * 60}")
-    print("Writing output files...")
-    print(f"{'=' * 60}")
+    # The workbook is decrypted to a temp file, then each sheet is streamed
+    # into its own output file by a separate worker process.
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        workbook_path = os.path.join(tmp_dir, 'workbook.xlsb')
+        decrypt_workbook(XLSB_PATH, PASSWORD, workbook_path)
+
+        with open_workbook(workbook_path) as wb:
+            print(f"\nAvailable sheets: {wb.sheets}")
+
+        filenames, generators, labels = zip(*files)
+        with ProcessPoolExecutor(max_workers=len(files)) as pool:
+            counts = list(pool.map(write_sheet_file, [workbook_path] * len(files),
+                                   filenames, generators, labels))
 
-    for filename, inserts, label in files:
-        filepath = os.path.join(OUTPUT_DIR, filename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(f"-- {label}\n")
-            f.write(f"-- Generated: {datetime.now().isoformat()}\n")
-            f.write(f"-- Row count: {len(inserts)}\n\n")
-            f.write("BEGIN;\n\n")
-            for stmt in inserts:
-                f.write(stmt + '\n\n')
-            f.write("COMMIT;\n")
-        print(f"  {filepath}: {len(inserts)} rows")
+    direct_count, outward_count, slip_count, inward_count = counts
 
     # Summary
     print(f"\n{'=' * 60}")
     print("SUMMARY")
     print(f"{'=' * 60}")
-    print(f"  Direct policies:     {len(direct_inserts):>6} rows")
-    print(f"  Outward cessions:    {len(outward_inserts):>6} rows")
-    print(f"  RE Slips:            {len(slip_inserts):>6} rows")
-    print(f"  Inward reinsurance:  {len(inward_inserts):>6} rows")
-    print(f"  TOTAL:               {sum(len(x) for _, x, _ in files):>6} rows")
+    print(f"  Direct policies:     {direct_count:>6} rows")
+    print(f"  Outward cessions:    {outward_count:>6} rows")
+    print(f"  RE Slips:            {slip_count:>6} rows")
+    print(f"  Inward reinsurance:  {inward_count:>6} rows")
+    print(f"  TOTAL:               {sum(counts):>6} rows")
     print(f"\nOutput directory: {OUTPUT_DIR}")
     print("Done!")
 